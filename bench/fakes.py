@@ -0,0 +1,201 @@
+# 네트워크 없이 봇 핸들러를 돌리기 위한 가짜 디스코드 객체들과 봇(core + 확장) 로더.
+# 핸들러가 실제로 건드리는 속성/메서드만 흉내 낸다. 보낸 메시지는 저장하지 않고 개수만 센다.
+import os
+import sys
+import tempfile
+import importlib
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_ids = count(10**17)
+
+
+def next_id() -> int:
+    return next(_ids)
+
+
+class BotModules:
+    # core 와 불러온 확장들을 예전의 봇 스크립트 모듈 하나처럼 보이게 묶는다.
+    # 읽기는 core → 확장 순서로 찾고, 쓰기는 그 이름을 가진 모듈에 한다.
+    def __init__(self, core):
+        object.__setattr__(self, "_modules", [core] + list(core.bot.extensions.values()))
+
+    def _owner(self, name):
+        for mod in self._modules:
+            if hasattr(mod, name):
+                return mod
+        raise AttributeError(name)
+
+    def __getattr__(self, name):
+        return getattr(self._owner(name), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._owner(name), name, value)
+
+
+async def load_bot(workdir: str = None) -> BotModules:
+    # DB/캐시 파일은 작업 디렉터리에 생기므로 실제 데이터와 섞이지 않게 임시 폴더에서 불러온다
+    workdir = workdir or tempfile.mkdtemp(prefix="bot-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, str(ROOT))
+    core = importlib.import_module("core")
+    await core.load_extensions()
+    return BotModules(core)
+
+
+class FakeRole:
+    def __init__(self, name: str, guild=None, default: bool = False):
+        self.id = next_id()
+        self.name = name
+        self.guild = guild
+        self._default = default
+
+    def is_default(self) -> bool:
+        return self._default
+
+
+class FakeUser:
+    bot = False
+
+    def __init__(self, name: str = None, user_id: int = None):
+        self.id = user_id or next_id()
+        self.name = name or f"user{self.id % 100000}"
+        self.display_name = self.name
+        self.mention = f"<@{self.id}>"
+        self.created_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        self.display_avatar = SimpleNamespace(url="https://example.invalid/avatar.png")
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeMember(FakeUser):
+    def __init__(self, guild: "FakeGuild", name: str = None, user_id: int = None):
+        super().__init__(name, user_id)
+        self.guild = guild
+        self.joined_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.roles = [guild.default_role]
+        self.edits = 0
+
+    async def edit(self, *, roles=None, reason=None, **kwargs):
+        self.edits += 1
+        if roles is not None:
+            self.roles = [self.guild.default_role] + list(roles)
+
+    async def add_roles(self, *roles, reason=None):
+        self.roles.extend(r for r in roles if r not in self.roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        self.roles = [r for r in self.roles if r not in roles]
+
+
+class FakeGuild:
+    def __init__(self, name: str = "bench"):
+        self.id = next_id()
+        self.name = name
+        self.default_role = FakeRole("@everyone", self, default=True)
+        self.roles = [self.default_role]
+        self.members = []
+
+    def add_member(self, name: str = None) -> FakeMember:
+        member = FakeMember(self, name)
+        self.members.append(member)
+        return member
+
+    async def create_role(self, *, name: str, **kwargs) -> FakeRole:
+        role = FakeRole(name, self)
+        self.roles.append(role)
+        return role
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", author, content: str = ""):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.attachments = []
+        self.embeds = []
+
+    async def edit(self, **kwargs):
+        return self
+
+    async def delete(self, **kwargs):
+        pass
+
+
+class FakeChannel:
+    def __init__(self, guild: FakeGuild, name: str = "bench"):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs) -> FakeMessage:
+        self.sent += 1
+        return FakeMessage(self, None, content or "")
+
+    def message(self, author, content: str) -> FakeMessage:
+        return FakeMessage(self, author, content)
+
+
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+        self.calls = 0
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, *args, **kwargs):
+        self._done = True
+        self.calls += 1
+
+    send_message = defer = edit_message = send_modal = _respond
+
+
+class FakeFollowup:
+    def __init__(self, channel: FakeChannel):
+        self.channel = channel
+
+    async def send(self, content=None, **kwargs) -> FakeMessage:
+        return await self.channel.send(content, **kwargs)
+
+
+class FakeInteraction:
+    def __init__(self, user: FakeMember, channel: FakeChannel):
+        self.id = next_id()
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild = channel.guild
+        self.guild_id = channel.guild.id
+        self.response = FakeResponse()
+        self.followup = FakeFollowup(channel)
+        self.message = None
+        self.type = None
+        self.command = None
+
+
+class FakeContext:
+    # 접두사 명령어용. interaction 이 None 이면 핸들러는 ctx.send 로만 응답한다.
+    interaction = None
+
+    def __init__(self, author: FakeMember, channel: FakeChannel):
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.message = channel.message(author, "")
+
+    async def send(self, content=None, **kwargs) -> FakeMessage:
+        return await self.channel.send(content, **kwargs)
+
+    reply = send
@@ -0,0 +1,268 @@
+# 오프라인 벤치마크: 가짜 디스코드 객체로 핸들러/DB 헬퍼/이미지 렌더링을 돌려 처리량과 지연을 잰다.
+#
+#   python bench/run_bench.py                         # 전체 실행
+#   python bench/run_bench.py -k rank -k db.          # 이름에 rank 또는 db. 가 들어간 것만
+#   python bench/run_bench.py --save bench/baseline.json
+#   python bench/run_bench.py --compare bench/baseline.json --tolerance 0.2
+#
+# --compare 는 ops/s 가 tolerance 보다 많이 떨어지거나 p99 가 그만큼 늘어난 항목을 표시하고 종료 코드 1 을 돌려준다.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeChannel, FakeContext, FakeGuild, FakeInteraction, FakeUser, load_bot  # noqa: E402
+
+SEED_USERS = 2000
+
+
+class Scenario:
+    def __init__(self, name: str, op, n: int, prepare=None):
+        self.name = name
+        self.op = op
+        self.n = n
+        self.prepare = prepare
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def measure(sc: Scenario, scale: float) -> dict:
+    n = max(10, int(sc.n * scale))
+    for i in range(max(5, n // 20)):  # 캐시/연결 예열
+        if sc.prepare:
+            await sc.prepare(i)
+        await sc.op(i)
+    lat = []
+    busy = 0.0
+    for i in range(n):
+        if sc.prepare:
+            await sc.prepare(i)
+        t0 = time.perf_counter()
+        await sc.op(i)
+        dt = time.perf_counter() - t0
+        lat.append(dt)
+        busy += dt
+    lat.sort()
+    return {
+        "n": n,
+        "ops": n / busy if busy else 0.0,
+        "p50_ms": percentile(lat, 0.50) * 1000,
+        "p99_ms": percentile(lat, 0.99) * 1000,
+    }
+
+
+async def seed(botmod, users):
+    # 랭킹/조회가 실제 규모에서 돌도록 기록을 채워 둔다
+    rng = random.Random(1)
+    names = list(botmod.dungeons)
+    for u in users:
+        uid = str(u.id)
+        await botmod.update_best_time(uid, round(rng.uniform(5, 28), 2))
+        await botmod.update_math_score(uid, rng.choice((10, 20, 30)), rng.random() < 0.8)
+        await botmod.change_user(uid, coins=rng.randint(0, 5000))
+        for _ in range(3):
+            clear = rng.random() < 0.6
+            await botmod.update_dungeon_result(uid, rng.choice(names), clear, rng.randint(50, 300) if clear else 0)
+    await botmod.bot_db.flush()
+
+
+def build_scenarios(botmod, guild, channel, users):
+    rng = random.Random(2)
+    player = users[0]
+    uids = [str(u.id) for u in users]
+    dungeon_name = next(iter(botmod.dungeons))
+    typing_text = botmod.TYPING_TEXTS[0]
+
+    # ---- DB 헬퍼 ----
+    async def get_best_time(i):
+        await botmod.get_best_time(uids[i % len(uids)])
+
+    async def update_best_time(i):
+        await botmod.update_best_time(uids[i % len(uids)], round(rng.uniform(5, 28), 2))
+
+    async def get_math_score(i):
+        await botmod.get_math_score(uids[i % len(uids)])
+
+    async def update_math_score(i):
+        await botmod.update_math_score(uids[i % len(uids)], 10, True)
+
+    async def change_user(i):
+        await botmod.change_user(uids[i % len(uids)], coins=1)
+
+    async def dungeon_ranking(i):
+        await botmod.get_dungeon_ranking(None, "clears", uids[i % len(uids)])
+
+    # ---- 렌더링 ----
+    async def text_to_image_cached(i):
+        botmod.text_to_image(typing_text)
+
+    async def render_png(i):
+        botmod._render_png(typing_text)
+
+    # ---- on_message ----
+    async def on_message_chat(i):
+        await botmod.on_message(channel.message(users[i % len(users)], "안녕하세요"))
+
+    async def prepare_math(i):
+        p = botmod.generate_problem("덧셈", "중간")
+        botmod.active_math_problems[channel.id] = {
+            "problem": p,
+            "user_id": player.id,
+            "timeout": botmod.timers.call_later(30, lambda: None),
+            "unroute": botmod.router.add(channel.id, player.id, botmod.handle_math_answer),
+        }
+
+    async def on_message_math_answer(i):
+        answer = botmod.active_math_problems[channel.id]["problem"]["answer"]
+        await botmod.on_message(channel.message(player, str(answer if i % 4 else answer + 1)))
+
+    # ---- 타자 게임 (혼자 모드 한 판) ----
+    async def typing_round(i):
+        inter = FakeInteraction(player, channel)
+        # 답을 미리 알 수 있도록 문장을 고르는 동안만 후보를 하나로 줄이고 바로 되돌린다
+        texts, botmod.TYPING_TEXTS = botmod.TYPING_TEXTS, [typing_text]
+        try:
+            task = asyncio.ensure_future(botmod.typinggame.callback(inter))
+            while (channel.id, player.id) not in botmod.router._routes:
+                await asyncio.sleep(0)
+        finally:
+            botmod.TYPING_TEXTS = texts
+        await botmod.on_message(channel.message(player, typing_text))
+        await task
+
+    # ---- 던전 버튼 ----
+    grid = {}
+
+    async def prepare_click(i):
+        view = grid.get("view")
+        if view is None or view.finished:
+            view = grid["view"] = botmod.AimGridView(player.id, dungeon_name)
+        grid["button"] = view.children[view.target_index]
+
+    async def dungeon_click(i):
+        await grid["button"].callback(FakeInteraction(player, channel))
+
+    # ---- 랭킹 명령어 ----
+    async def typingrank(i):
+        await botmod.typingrank.callback(FakeInteraction(users[i % len(users)], channel))
+
+    pager = {}
+
+    async def prepare_pager(i):
+        if i % 10 == 0:
+            pager["view"] = botmod.RankPager(page=0, page_size=10, user_id=player.id)
+
+    async def rank_pager_next(i):
+        view = pager["view"]
+        await view.children[1].callback(FakeInteraction(player, channel))
+
+    async def math_ranking(i):
+        await botmod.math_ranking.callback(FakeInteraction(users[i % len(users)], channel))
+
+    async def dungeon_ranking_cmd(i):
+        ctx = FakeContext(users[i % len(users)], channel)
+        await botmod.전평시던전랭킹.callback(ctx, "전체", "클리어" if i % 2 else "코인")
+
+    return [
+        Scenario("db.get_best_time", get_best_time, 5000),
+        Scenario("db.update_best_time", update_best_time, 5000),
+        Scenario("db.get_math_score", get_math_score, 5000),
+        Scenario("db.update_math_score", update_math_score, 5000),
+        Scenario("db.change_user", change_user, 5000),
+        Scenario("db.get_dungeon_ranking", dungeon_ranking, 1000),
+        Scenario("render.text_to_image_cached", text_to_image_cached, 5000),
+        Scenario("render.render_png", render_png, 200),
+        Scenario("on_message.chat", on_message_chat, 20000),
+        Scenario("on_message.math_answer", on_message_math_answer, 3000, prepare_math),
+        Scenario("typing.solo_round", typing_round, 1000),
+        Scenario("dungeon.click", dungeon_click, 3000, prepare_click),
+        Scenario("rank.typingrank", typingrank, 2000),
+        Scenario("rank.pager_next", rank_pager_next, 2000, prepare_pager),
+        Scenario("rank.math", math_ranking, 2000),
+        Scenario("rank.dungeon", dungeon_ranking_cmd, 1000),
+    ]
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    ok = True
+    print(f"\n{'scenario':32} {'ops/s':>12} {'base':>12} {'Δ':>8} {'p99 ms':>9} {'base':>9} {'Δ':>8}")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            print(f"{name:32} {r['ops']:12.1f} {'-':>12}")
+            continue
+        d_ops = r["ops"] / b["ops"] - 1 if b["ops"] else 0.0
+        d_p99 = r["p99_ms"] / b["p99_ms"] - 1 if b["p99_ms"] else 0.0
+        regressed = d_ops < -tolerance or d_p99 > tolerance
+        ok = ok and not regressed
+        print(f"{name:32} {r['ops']:12.1f} {b['ops']:12.1f} {d_ops:+8.1%} "
+              f"{r['p99_ms']:9.3f} {b['p99_ms']:9.3f} {d_p99:+8.1%}{'  ← 회귀' if regressed else ''}")
+    return ok
+
+
+async def main(args) -> int:
+    botmod = await load_bot()
+    guild = FakeGuild()
+    channel = FakeChannel(guild)
+    users = [guild.add_member() for _ in range(args.users)]
+    by_id = {u.id: u for u in users}
+
+    async def fetch_user(user_id):
+        return by_id.get(user_id) or FakeUser(user_id=user_id)
+    botmod.bot.fetch_user = fetch_user  # 이름 조회가 REST 로 나가지 않도록
+
+    await botmod.init_db()
+    await botmod.load_leaderboards()
+    flush_task = asyncio.ensure_future(botmod.flush_loop())
+    await seed(botmod, users)
+
+    scenarios = build_scenarios(botmod, guild, channel, users)
+    if args.k:
+        scenarios = [sc for sc in scenarios if any(k in sc.name for k in args.k)]
+
+    results = {}
+    print(f"{'scenario':32} {'n':>7} {'ops/s':>12} {'p50 ms':>9} {'p99 ms':>9}")
+    for sc in scenarios:
+        r = results[sc.name] = await measure(sc, args.scale)
+        print(f"{sc.name:32} {r['n']:7d} {r['ops']:12.1f} {r['p50_ms']:9.3f} {r['p99_ms']:9.3f}")
+
+    flush_task.cancel()
+    await botmod.bot_db.flush()
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if not compare(results, baseline, args.tolerance):
+            status = 1
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "users": args.users, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n기준값 저장: {args.save}")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="오프라인 봇 벤치마크")
+    parser.add_argument("-k", action="append", help="이름에 이 문자열이 들어간 시나리오만 실행 (여러 번 지정 가능)")
+    parser.add_argument("--scale", type=float, default=1.0, help="시나리오별 반복 횟수 배율")
+    parser.add_argument("--users", type=int, default=SEED_USERS, help="미리 채워 둘 유저 수")
+    parser.add_argument("--save", help="결과를 기준값 JSON 으로 저장")
+    parser.add_argument("--compare", help="기준값 JSON 과 비교")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 볼 변화 비율 (기본 0.2)")
+    args = parser.parse_args()
+    # 파일 경로 인자는 load_bot 이 작업 디렉터리를 바꾸기 전에 절대 경로로
+    args.save = os.path.abspath(args.save) if args.save else None
+    args.compare = os.path.abspath(args.compare) if args.compare else None
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,222 @@
+# 경제: 출석, 상점, 낚시, 던전(에임 게임)과 랭킹
+import asyncio
+import random
+from datetime import datetime
+from typing import Optional
+
+import discord
+from discord import ButtonStyle, Embed, ui
+from discord.ext import commands
+
+from core import (
+    TimerHandle, buy_item, change_user, get_dungeon_ranking, get_inventory, get_power, get_user_data,
+    record_dungeon_clear, register_commands, resolve_user_names, shop_items, timed, timers, update_dungeon_result,
+    user_cache,
+)
+
+# ================= 출석 체크 =================
+@commands.command()
+@timed("출석")
+async def 출석(ctx):
+    uid = str(ctx.author.id)
+    user = await get_user_data(uid)
+    today = datetime.now().date()
+    if user["last_attendance"]:
+        last = datetime.fromisoformat(user["last_attendance"]).date()
+        if last == today:
+            return await ctx.send(f"{ctx.author.mention}, 오늘은 이미 출석을 했습니다!")
+
+    reward = 250
+    user_cache.change(uid, user, coins=reward, last_attendance=str(datetime.now()))
+    await ctx.send(f"✅ {ctx.author.mention}, 출석 완료! {reward} 코인을 획득했습니다.")
+
+@commands.command()
+@timed("전평시상점")
+async def 전평시상점(ctx):
+    embed = Embed(title="🛒 상점", description="`!전평시 구매 <아이템>` 으로 구매 가능!", color=0xFFD700)
+    for item, info in shop_items.items():
+        embed.add_field(name=item, value=f"가격: {info['가격']}코인 | 전투력 +{info['능력치']}", inline=False)
+    await ctx.send(embed=embed)
+
+# ================= 낚시 =================
+@commands.command()
+@timed("전평시낚시")
+async def 전평시낚시(ctx):
+    uid = str(ctx.author.id)
+    reward = random.randint(20, 50)
+    await change_user(uid, coins=reward)
+    await ctx.send(f"🎣 {ctx.author.mention}, 낚시 성공! {reward} 코인을 획득했습니다.")
+
+# ================= 던전 설정 =================
+dungeons = {
+    "초보던전": {"req": 0, "multiplier": 1.0, "drops": ["나무 검"], "drop_rate": 0.10, "target_need": 15, "time_limit": 25},
+    "슬라임던전": {"req": 20, "multiplier": 1.5, "drops": ["나무 검", "돌 검"], "drop_rate": 0.20, "target_need": 20, "time_limit": 22},
+    "중수던전": {"req": 50, "multiplier": 2.0, "drops": ["돌 검", "철 검"], "drop_rate": 0.30, "target_need": 30, "time_limit": 20},
+    "중고수던전": {"req": 100, "multiplier": 3.0, "drops": ["철 검", "금 검"], "drop_rate": 0.40, "target_need": 35, "time_limit": 18},
+    "고수던전": {"req": 200, "multiplier": 5.0, "drops": ["금 검"], "drop_rate": 0.50, "target_need": 40, "time_limit": 15}
+}
+
+# ================= 던전 에임 테스트 =================
+AIM_GRID_SIZE = 5
+
+class AimButton(ui.Button):
+    def __init__(self, index:int, view_ref:"AimGridView"):
+        super().__init__(label="\u200b", style=ButtonStyle.secondary, row=index // AIM_GRID_SIZE)
+        self.index = index
+        self.view_ref = view_ref
+
+    @timed("AimButton.callback")
+    async def callback(self, interaction: discord.Interaction):
+        if interaction.user.id != self.view_ref.user_id:
+            return await interaction.response.send_message("이 게임 참가자만 버튼을 누를 수 있어요.", ephemeral=True)
+        if self.view_ref.finished:
+            return
+        if self.index == self.view_ref.target_index:
+            self.view_ref.correct_count += 1
+            # 마지막 정답은 on_success 가 응답한다 (상호작용 응답은 한 번만 가능)
+            if self.view_ref.correct_count >= self.view_ref.target_need:
+                return await self.view_ref.on_success(interaction)
+            self.view_ref.next_target()
+            embed = Embed(title=f"🎯 던전: {self.view_ref.dungeon_name}",
+                          description=f"정답 {self.view_ref.correct_count}/{self.view_ref.target_need}", color=0x00cc66)
+            await interaction.response.edit_message(embed=embed, view=self.view_ref)
+        else:
+            await self.view_ref.on_failure(interaction, "오답!")
+
+class AimGridView(ui.View):
+    def __init__(self, user_id:int, dungeon_name:str):
+        super().__init__(timeout=None)
+        self.user_id = user_id
+        self.dungeon_name = dungeon_name
+        self.correct_count = 0
+        self.finished = False
+        self.message = None
+        self.timer: Optional[TimerHandle] = None
+        dungeon = dungeons[dungeon_name]
+        self.target_need = dungeon["target_need"]
+        self.end_time = asyncio.get_event_loop().time() + dungeon["time_limit"]
+        for i in range(AIM_GRID_SIZE * AIM_GRID_SIZE):
+            self.add_item(AimButton(i, self))
+        self.next_target()
+
+    def next_target(self):
+        self.target_index = random.randrange(AIM_GRID_SIZE * AIM_GRID_SIZE)
+        for child in self.children:
+            if isinstance(child, AimButton):
+                if child.index == self.target_index:
+                    child.style = ButtonStyle.success
+                    child.label = "◈"
+                else:
+                    child.style = ButtonStyle.secondary
+                    child.label = "\u200b"
+
+    def start_timer(self, ctx):
+        remain = self.end_time - asyncio.get_event_loop().time()
+        self.timer = timers.call_later(remain, self.on_failure_context, ctx.channel, "시간 초과!")
+
+    def _finish(self):
+        self.finished = True
+        if self.timer:
+            self.timer.cancel()
+
+    async def on_success(self, interaction: discord.Interaction):
+        self._finish()
+        for c in self.children:
+            c.disabled = True
+        await interaction.response.edit_message(embed=Embed(title="✅ 던전 클리어!", color=0x00ff66), view=self)
+        await handle_dungeon_success(str(self.user_id), self.dungeon_name, interaction.channel, interaction.user)
+
+    async def on_failure(self, interaction: discord.Interaction, reason:str):
+        self._finish()
+        for c in self.children:
+            c.disabled = True
+        await interaction.response.edit_message(content=f"❌ 던전 실패: {reason}", view=None)
+        await update_dungeon_result(str(self.user_id), self.dungeon_name, False, 0)
+
+    async def on_failure_context(self, channel, reason:str):
+        if self.finished:
+            return
+        self._finish()
+        for c in self.children:
+            c.disabled = True
+        await channel.send(f"❌ 던전 실패: {reason}")
+        await update_dungeon_result(str(self.user_id), self.dungeon_name, False, 0)
+
+async def handle_dungeon_success(user_id:str, dungeon_name:str, channel, user_member:discord.Member):
+    dungeon = dungeons[dungeon_name]
+    base_reward = random.randint(50, 100)
+    total = int(base_reward * dungeon["multiplier"])
+    drop_item = None
+    if random.random() < dungeon["drop_rate"]:
+        drop_item = random.choice(dungeon["drops"])
+    await record_dungeon_clear(user_id, dungeon_name, total, drop_item)
+    desc = f"{user_member.mention} {dungeon_name} 클리어!\n💰 {total}코인 획득"
+    if drop_item:
+        desc += f"\n🎁 드랍 아이템: {drop_item}"
+    await channel.send(embed=Embed(title="던전 보상", description=desc, color=0x00ff88))
+
+# ================= 던전 명령어 =================
+@commands.command()
+@timed("전평시")
+async def 전평시(ctx, arg1=None, arg2=None):
+    uid = str(ctx.author.id)
+    if arg1 == "구매" and arg2:
+        if arg2 not in shop_items:
+            return await ctx.send("그런 아이템은 없어!")
+        if not await buy_item(uid, arg2, shop_items[arg2]["가격"]):
+            return await ctx.send("코인이 부족합니다!")
+        return await ctx.send(f"{ctx.author.mention} → {arg2} 구매 완료!")
+    elif arg1 == "인벤토리":
+        items = await get_inventory(uid)
+        text = ", ".join(item if qty == 1 else f"{item} x{qty}" for item, qty in items) if items else "없음"
+        embed = Embed(title=f"{ctx.author.name}님의 인벤토리", color=0x00ccff)
+        embed.add_field(name="보유 아이템", value=text, inline=False)
+        embed.add_field(name="총 전투력", value=str(await get_power(uid)))
+        return await ctx.send(embed=embed)
+    elif arg1 == "던전가기" and arg2:
+        if arg2 not in dungeons:
+            return await ctx.send("그런 던전은 없어요!")
+        power = await get_power(uid)
+        req = dungeons[arg2]["req"]
+        if power < req:
+            return await ctx.send(f"⚔️ 전투력이 부족합니다! 필요 {req}, 현재 {power}")
+        dungeon = dungeons[arg2]
+        embed = Embed(title=f"{arg2} 입장!", description=f"정답 {dungeon['target_need']}회 / 제한 {dungeon['time_limit']}초", color=0x3366ff)
+        view = AimGridView(ctx.author.id, arg2)
+        msg = await ctx.send(embed=embed, view=view)
+        view.message = msg
+        view.start_timer(ctx)
+        return
+
+# ================= 랭킹 명령어 =================
+@commands.command()
+@timed("전평시던전랭킹")
+async def 전평시던전랭킹(ctx, dungeon_name:str=None, 기준:str="클리어"):
+    if dungeon_name is None:
+        return await ctx.send("사용법: `!전평시던전랭킹 <던전이름|전체> [클리어|코인]`")
+    order_by = "clears" if 기준 == "클리어" else "coins"
+    uid = str(ctx.author.id)
+    if dungeon_name == "전체":
+        title, color = f"전체 던전 랭킹 ({기준}순)", 0xff9900
+        rows, mine = await get_dungeon_ranking(None, order_by, uid)
+    elif dungeon_name in dungeons:
+        title, color = f"{dungeon_name} 랭킹 ({기준}순)", 0xffcc00
+        rows, mine = await get_dungeon_ranking(dungeon_name, order_by, uid)
+    else:
+        return await ctx.send("존재하지 않는 던전이에요.")
+    if not rows:
+        return await ctx.send("기록이 없습니다.")
+    embed = Embed(title=title, color=color)
+    names = await resolve_user_names([int(r[1]) for r in rows])
+    for rank, user_id, clears, fails, coins in rows:
+        embed.add_field(name=f"{rank}위 - {names[int(user_id)]}",
+                        value=f"클리어 {clears} | 실패 {fails} | 코인 {coins}", inline=False)
+    if mine:
+        rank, _, clears, fails, coins = mine
+        embed.add_field(name=f"👉 내 순위 ({ctx.author.name})",
+                        value=f"{rank}위 | 클리어 {clears} | 실패 {fails} | 코인 {coins}", inline=False)
+    await ctx.send(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    register_commands(bot, globals())
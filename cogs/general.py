@@ -0,0 +1,71 @@
+# 기본 명령어: 핑, 주사위, 동전, 도움말, 캐시 상태
+import random
+
+import discord
+from discord.ext import commands
+
+from core import bot, register_commands, timed, user_cache
+
+@commands.hybrid_command(name="ping", description="봇의 핑(지연시간)을 확인합니다.")
+@timed("ping")
+async def ping(ctx: commands.Context):
+    await ctx.send(f"🏓 Pong! {round(bot.latency * 1000)}ms")
+
+@commands.hybrid_command(name="cache-stats", description="유저 캐시 상태를 확인합니다 (관리자 전용)")
+@commands.has_permissions(administrator=True)
+@timed("cache-stats")
+async def cache_stats(ctx: commands.Context):
+    st = user_cache.stats()
+    await ctx.send(
+        f"🗃️ 유저 캐시 {st['size']}/{st['maxsize']}개 | 적중 {st['hits']} | 실패 {st['misses']} "
+        f"| 적중률 {st['hit_rate'] * 100:.1f}% | 제거 {st['evictions']}"
+    )
+
+@commands.hybrid_command(name="dice", description="주사위를 굴립니다.")
+@timed("dice")
+async def dice(ctx: commands.Context, max_number: int = 6):
+    await ctx.send(f"🎲 결과: **{random.randint(1, max_number)}** (1~{max_number})")
+
+@commands.hybrid_command(name="coin", description="동전을 던집니다.")
+@timed("coin")
+async def coin(ctx: commands.Context):
+    await ctx.send(f"🪙 결과: **{random.choice(['앞면','뒷면'])}**")
+
+
+@commands.hybrid_command(name="도움말-help", description="모든 명령어를 확인합니다.")
+@timed("도움말-help")
+async def help_command(ctx: commands.Context):
+    lines = [
+        "/ping — 봇 지연시간 확인",
+        "/cache-stats — 유저 캐시 적중률 확인 (관리자)",
+        "/ban — 유저 차단 (관리자)",
+        "/kick — 유저 추방 (관리자)",
+        "/say — 봇이 대신 말함 (관리자, 이미지 URL 지원)",
+        "/ticket — 티켓 채널 생성",
+        "/dice — 주사위 굴리기",
+        "/coin — 동전 던지기",
+        "/warn-warn — 경고 부여 (3회시 경고 역할 지급 5회시 추방)",
+        "/warn-remove — 경고 차감",
+        "/warnings — 경고 수 확인",
+        "/rock-paper-scissors — 가위바위보 대결 신청 (버튼 UI)",
+        "/typinggame — 타자게임 (혼자 또는 상대 지목 대결)",
+        "/typingrank — 타자게임 랭킹",
+        "/set-role-buttons — 역할 버튼 메뉴 생성 (관리자)",
+        "/video-challenge — 비디오 챌린지를 실행합니다.",
+        "/end-challenge — 관리자가 강제로 비디오 챌린지를 완료합니다.",
+        "/challenge-status — 현재 비디오 챌린지를 확인합니다.",
+        "/수학-난이도 — 수학 문제 난이도 설정",
+        "/수학-문제 — 수학 문제 생성",
+        "/수학-점수 — 수학 점수 확인",
+        "/수학-통계 — 수학 문제 통계 확인",
+        "/수학-랭킹 — 수학 서버 리더보드 확인"
+    ]
+    embed = discord.Embed(title="📖 도움말", color=discord.Color.blurple())
+    for line in lines:
+        cmd, desc = line.split(" — ", 1)
+        embed.add_field(name=cmd, value=desc, inline=False)
+    await ctx.send(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    register_commands(bot, globals())
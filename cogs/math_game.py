@@ -0,0 +1,258 @@
+# 수학 문제: 난이도, 점수/통계, 서버 랭킹, 등급 역할
+import random
+from typing import Callable, Dict
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import (
+    bot_db, deadline_of, get_math_score, math_board, register_commands, remaining_until, router, shared_state,
+    state_journal, timed, timers, update_math_score,
+)
+
+# ================= 수학 게임 =================
+# 등급
+grades = [
+    {'name':'🌱 수학 초보자','min':0,'max':49},
+    {'name':'✏️ 수학 학습자','min':50,'max':99},
+    {'name':'📚 수학 전문가','min':100,'max':249},
+    {'name':'🥉 수학 마스터','min':250,'max':499},
+    {'name':'🥈 수학 박사','min':500,'max':999},
+    {'name':'🥇 수학 천재','min':1000,'max':999999}
+]
+
+# 난이도 저장 (math_difficulty 테이블)
+async def get_difficulty(user_id: str) -> str:
+    row = await bot_db.fetchone("SELECT difficulty FROM math_difficulty WHERE user_id=?", (user_id,))
+    return row[0] if row else '중간'
+
+async def set_difficulty(user_id: str, difficulty: str):
+    await bot_db.execute('''
+    INSERT INTO math_difficulty(user_id, difficulty) VALUES (?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET difficulty = excluded.difficulty
+    ''', (user_id, difficulty))
+
+# 활성 문제 (채널 -> 문제). 재시작해도 이어지도록 상태 저널에도 적는다
+active_math_problems = shared_state("math.active_problems")
+
+# 등급 계산
+def get_grade(score):
+    for g in grades:
+        if g['min'] <= score <= g['max']:
+            return g['name']
+    return grades[0]['name']
+
+# 문제 생성
+def generate_problem(op_type, difficulty):
+    if difficulty == '쉬움':
+        limits = {'덧셈':20,'뺄셈':20,'곱셈':5,'나눗셈':12}
+    elif difficulty == '중간':
+        limits = {'덧셈':50,'뺄셈':50,'곱셈':10,'나눗셈':12}
+    else:
+        limits = {'덧셈':100,'뺄셈':100,'곱셈':12,'나눗셈':12}
+
+    if op_type == '덧셈':
+        a = random.randint(1, limits['덧셈'])
+        b = random.randint(1, limits['덧셈'])
+        ans = a + b
+        symbol = '+'
+    elif op_type == '뺄셈':
+        a = random.randint(10, limits['뺄셈'])
+        b = random.randint(0, a)
+        ans = a - b
+        symbol = '-'
+    elif op_type == '곱셈':
+        a = random.randint(1, limits['곱셈'])
+        b = random.randint(1, limits['곱셈'])
+        ans = a * b
+        symbol = '×'
+    else:  # 나눗셈
+        b = random.randint(1, limits['나눗셈'])
+        ans = random.randint(1, limits['나눗셈'])
+        a = b * ans
+        symbol = '÷'
+    return {'num1':a, 'num2':b, 'answer':ans, 'symbol':symbol, 'operation':op_type}
+
+# 문제 점수
+def problem_score(problem):
+    a, b = problem['num1'], problem['num2']
+    op = problem['operation']
+    if op in ['덧셈', '뺄셈']:
+        return 10 if a <= 20 and b <= 20 else 20
+    elif op == '곱셈':
+        return 20 if a <= 10 and b <= 10 else 30
+    else:
+        return 30
+
+# 등급 역할 인덱스: 길드별 이름 -> 역할. 역할이 생기거나 지워지거나 바뀌면 그 길드만 다시 만든다
+GRADE_NAMES = frozenset(g['name'] for g in grades)
+_grade_roles: Dict[int, Dict[str, discord.Role]] = {}
+
+def _grade_role_index(guild: discord.Guild) -> Dict[str, discord.Role]:
+    index = _grade_roles.get(guild.id)
+    if index is None:
+        index = {r.name: r for r in guild.roles if r.name in GRADE_NAMES}
+        _grade_roles[guild.id] = index
+    return index
+
+async def _invalidate_grade_roles(role: discord.Role, after: discord.Role = None):
+    _grade_roles.pop(role.guild.id, None)
+
+
+# 역할 부여: 등급이 바뀐 경우에만 member.edit 한 번으로 역할 목록을 맞춘다
+async def assign_role(member, grade_name):
+    current = [r for r in member.roles if r.name in GRADE_NAMES]
+    if len(current) == 1 and current[0].name == grade_name:
+        return
+    guild = member.guild
+    index = _grade_role_index(guild)
+    role = index.get(grade_name)
+    if role is None:
+        role = await guild.create_role(name=grade_name, color=discord.Color.random(), reason='수학 등급 역할 생성')
+        index[grade_name] = role
+    roles = [r for r in member.roles if r.name not in GRADE_NAMES and not r.is_default()]
+    roles.append(role)
+    await member.edit(roles=roles, reason='수학 등급 변경')
+
+@app_commands.command(name='수학-난이도', description='수학 문제 난이도 설정')
+@app_commands.describe(난이도='쉬움, 중간, 어려움')
+@timed("수학-난이도")
+async def math_difficulty(interaction: discord.Interaction, 난이도: str):
+    if 난이도 not in ['쉬움', '중간', '어려움']:
+        await interaction.response.send_message('❌ 유효한 난이도: 쉬움, 중간, 어려움', ephemeral=True)
+        return
+    await set_difficulty(str(interaction.user.id), 난이도)
+    await interaction.response.send_message(f'✅ 난이도가 **{난이도}** 으로 설정되었습니다!', ephemeral=True)
+
+@app_commands.command(name='수학-점수', description='수학 점수 확인')
+@timed("수학-점수")
+async def math_score(interaction: discord.Interaction):
+    data = await get_math_score(str(interaction.user.id))
+    grade = get_grade(data['score'])
+    embed = discord.Embed(title='📊 내 점수', color=discord.Color.green())
+    embed.add_field(name='점수', value=str(data['score']), inline=True)
+    embed.add_field(name='등급', value=grade, inline=True)
+    await interaction.response.send_message(embed=embed)
+
+@app_commands.command(name='수학-통계', description='수학 문제 통계 확인')
+@timed("수학-통계")
+async def math_stats(interaction: discord.Interaction):
+    data = await get_math_score(str(interaction.user.id))
+    correct_rate = round(data['correct_count']/data['total_count']*100, 2) if data['total_count'] > 0 else 0
+    embed = discord.Embed(title='📈 나의 통계', color=discord.Color.blue())
+    embed.add_field(name='총 문제 수', value=data['total_count'], inline=True)
+    embed.add_field(name='정답 수', value=data['correct_count'], inline=True)
+    embed.add_field(name='정답률', value=f'{correct_rate}%', inline=True)
+    embed.add_field(name='최고 연속 정답', value=data['max_consecutive'], inline=True)
+    embed.add_field(name='현재 점수', value=data['score'], inline=True)
+    await interaction.response.send_message(embed=embed)
+
+@app_commands.command(name='수학-랭킹', description='수학 서버 리더보드 확인')
+@timed("수학-랭킹")
+async def math_ranking(interaction: discord.Interaction):
+    rows = math_board.page(0, 10)
+    text = ''
+    for i, r in enumerate(rows):
+        text += f"{i+1}. <@{r[0]}> - {r[1]}점\n"
+    embed = discord.Embed(title='🏆 서버 리더보드', description=text, color=discord.Color.gold())
+    my_rank = math_board.rank(str(interaction.user.id))
+    if my_rank:
+        embed.set_footer(text=f"내 순위: {my_rank}위 / {len(math_board)}명")
+    await interaction.response.send_message(embed=embed)
+
+async def handle_math_answer(message: discord.Message) -> bool:
+    problem_data = active_math_problems.get(message.channel.id)
+    if not problem_data or message.author.id != problem_data['user_id']:
+        return False
+    try:
+        user_answer = int(message.content.strip())
+    except ValueError:
+        return False
+
+    # 채점 중 들어온 두 번째 답은 무시되도록 먼저 내려놓는다
+    del active_math_problems[message.channel.id]
+    problem_data['timeout'].cancel()
+    problem_data['unroute']()
+    state_journal.delete("math", message.channel.id)
+
+    correct = user_answer == problem_data['problem']['answer']
+    earned = problem_score(problem_data['problem']) if correct else 0
+    data = await update_math_score(str(message.author.id), earned, correct)
+    grade = get_grade(data['score'])
+
+    if correct:
+        await assign_role(message.author, grade)
+        embed = discord.Embed(title='🎉 정답!', color=discord.Color.green())
+        embed.add_field(name='정답', value=str(problem_data['problem']['answer']), inline=True)
+        embed.add_field(name='🏆 획득', value=f"+{earned}점", inline=True)
+        embed.add_field(name='📊 현재 점수', value=f"{data['score']}점", inline=True)
+        embed.add_field(name='⭐ 등급', value=grade, inline=True)
+        embed.add_field(name='🔥 연속 정답', value=data['consecutive'], inline=True)
+    else:
+        embed = discord.Embed(title='❌ 오답!', color=discord.Color.red())
+        embed.add_field(name='정답', value=str(problem_data['problem']['answer']), inline=True)
+        embed.add_field(name='선택한 답', value=str(user_answer), inline=True)
+        embed.add_field(name='📊 현재 점수', value=f"{data['score']}점", inline=True)
+        embed.add_field(name='⭐ 등급', value=grade, inline=True)
+
+    await message.channel.send(embed=embed)
+    return True
+
+@app_commands.command(name='수학-문제', description='수학 문제 생성')
+@app_commands.describe(연산='덧셈, 뺄셈, 곱셈, 나눗셈')
+@timed("수학-문제")
+async def math_problem(interaction: discord.Interaction, 연산: str):
+    if 연산 not in ['덧셈', '뺄셈', '곱셈', '나눗셈']:
+        await interaction.response.send_message('❌ 올바른 연산을 선택해주세요', ephemeral=True)
+        return
+    
+    # 확인과 등록 사이에 await 가 없도록 난이도를 먼저 읽는다
+    diff = await get_difficulty(str(interaction.user.id))
+    if interaction.channel.id in active_math_problems:
+        await interaction.response.send_message('❌ 이미 진행 중인 문제가 있습니다. 답을 입력하거나 시간이 지나면 새 문제를 낼 수 있습니다.', ephemeral=True)
+        return
+    
+    p = generate_problem(연산, diff)
+
+    embed = discord.Embed(
+        title='🔢 수학 문제!', 
+        description=f"**문제: {p['num1']} {p['symbol']} {p['num2']} = ?**", 
+        color=discord.Color.gold()
+    )
+    embed.set_footer(text=f"{interaction.user.name}님의 {p['operation']} 문제 (30초 제한)")
+    
+    start_problem(interaction.channel.id, interaction.user.id, p, 30, interaction.followup.send)
+    await interaction.response.send_message(embed=embed)
+
+def start_problem(channel_id: int, user_id: int, p: dict, delay: float, send: Callable):
+    active_math_problems[channel_id] = {
+        'problem': p,
+        'user_id': user_id,
+        'timeout': None,
+        'unroute': router.add(channel_id, user_id, handle_math_answer),
+    }
+
+    # 타이머 (정답/오답 처리 시 취소됨)
+    async def on_timeout():
+        if channel_id in active_math_problems:
+            active_math_problems.pop(channel_id)['unroute']()
+            state_journal.delete("math", channel_id)
+            data = await get_math_score(str(user_id))
+            grade = get_grade(data['score'])
+            await send(f"⏰ 시간 초과! 정답: {p['answer']}\n현재 점수: {data['score']}\n등급: {grade}")
+
+    timeout = active_math_problems[channel_id]['timeout'] = timers.call_later(delay, on_timeout)
+    state_journal.put("math", channel_id, {"problem": p, "user_id": user_id, "deadline": deadline_of(timeout)})
+
+
+async def setup(bot: commands.Bot):
+    register_commands(bot, globals())
+    # 이전 프로세스에서 풀던 문제는 남은 시간만큼 이어서 받는다 (시간 초과 안내는 채널로)
+    for channel_id, s in state_journal.take("math").items():
+        if channel_id not in active_math_problems:
+            start_problem(channel_id, s["user_id"], s["problem"], remaining_until(s["deadline"]),
+                          bot.get_partial_messageable(channel_id).send)
+    bot.add_listener(_invalidate_grade_roles, 'on_guild_role_create')
+    bot.add_listener(_invalidate_grade_roles, 'on_guild_role_delete')
+    bot.add_listener(_invalidate_grade_roles, 'on_guild_role_update')
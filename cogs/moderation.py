@@ -0,0 +1,377 @@
+# 관리: 서버별 설정, 입장/퇴장 알림, 차단/추방, 티켓, 경고, 역할 버튼
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import (
+    TimerHandle, add_warning, bot, get_warnings, guild_settings, register_commands, remove_warning, timed, timers,
+)
+
+LEAVE_IMAGE_URL = "https://cdn.discordapp.com/attachments/1400443921531928678/1414186240823263425/IMG_8823-removebg-preview.png?ex=68bea712&is=68bd5592&hm=ae9862e6f849b6c58f7305581a4e7c3902213e27fa70daab766ca2ff1aff5c26&"
+KST = ZoneInfo("Asia/Seoul")
+
+GUILD_SETTING_LABELS = {
+    "welcome_channel_id": "입장 알림 채널",
+    "leave_channel_id": "퇴장 알림 채널",
+    "ticket_category_id": "티켓 카테고리",
+    "ticket_role_id": "티켓 담당 역할",
+    "warning_role_name": "경고 역할 이름",
+}
+
+async def _set_guild_setting(ctx: commands.Context, key: str, value, shown: Optional[str]):
+    await guild_settings.set(ctx.guild.id, key, value)
+    await ctx.send(f"✅ {GUILD_SETTING_LABELS[key]}: {shown if value is not None else '기본값으로 되돌림'}")
+
+@commands.hybrid_command(name="설정-보기", description="이 서버의 봇 설정을 확인합니다 (관리자 전용)")
+@commands.has_permissions(administrator=True)
+@timed("설정-보기")
+async def settings_show(ctx: commands.Context):
+    settings = await guild_settings.get(ctx.guild.id)
+    embed = discord.Embed(title=f"⚙️ {ctx.guild.name} 설정", color=discord.Color.blurple())
+    for key, label in GUILD_SETTING_LABELS.items():
+        value = settings[key]
+        if key.endswith("_channel_id") or key == "ticket_category_id":
+            ch = ctx.guild.get_channel(value)
+            shown = ch.mention if ch else "❌ 없음"
+        elif key == "ticket_role_id":
+            role = ctx.guild.get_role(value)
+            shown = role.mention if role else "❌ 없음"
+        else:
+            shown = value
+        embed.add_field(name=label, value=shown, inline=False)
+    await ctx.send(embed=embed)
+
+@commands.hybrid_command(name="설정-입장채널", description="입장 알림 채널을 정합니다. 비우면 기본값 (관리자 전용)")
+@commands.has_permissions(administrator=True)
+@timed("설정-입장채널")
+async def settings_welcome(ctx: commands.Context, channel: Optional[discord.TextChannel] = None):
+    await _set_guild_setting(ctx, "welcome_channel_id", channel and channel.id, channel and channel.mention)
+
+@commands.hybrid_command(name="설정-퇴장채널", description="퇴장 알림 채널을 정합니다. 비우면 기본값 (관리자 전용)")
+@commands.has_permissions(administrator=True)
+@timed("설정-퇴장채널")
+async def settings_leave(ctx: commands.Context, channel: Optional[discord.TextChannel] = None):
+    await _set_guild_setting(ctx, "leave_channel_id", channel and channel.id, channel and channel.mention)
+
+@commands.hybrid_command(name="설정-티켓카테고리", description="티켓 채널을 만들 카테고리를 정합니다. 비우면 기본값 (관리자 전용)")
+@commands.has_permissions(administrator=True)
+@timed("설정-티켓카테고리")
+async def settings_ticket_category(ctx: commands.Context, category: Optional[discord.CategoryChannel] = None):
+    await _set_guild_setting(ctx, "ticket_category_id", category and category.id, category and category.name)
+
+@commands.hybrid_command(name="설정-티켓역할", description="티켓을 볼 수 있는 담당 역할을 정합니다. 비우면 기본값 (관리자 전용)")
+@commands.has_permissions(administrator=True)
+@timed("설정-티켓역할")
+async def settings_ticket_role(ctx: commands.Context, role: Optional[discord.Role] = None):
+    await _set_guild_setting(ctx, "ticket_role_id", role and role.id, role and role.mention)
+
+@commands.hybrid_command(name="설정-경고역할", description="경고 3회 시 부여할 역할 이름을 정합니다. 비우면 기본값 (관리자 전용)")
+@commands.has_permissions(administrator=True)
+@timed("설정-경고역할")
+async def settings_warning_role(ctx: commands.Context, *, name: Optional[str] = None):
+    await _set_guild_setting(ctx, "warning_role_name", name, name)
+
+
+# ================= 입장/퇴장 알림 =================
+# 평소에는 한 명당 임베드 하나를 보낸다. 최근 ANNOUNCE_WINDOW 초 동안 이벤트가 임계값을 넘으면
+# (레이드/대량 초대) 멤버를 모아 두었다가 ANNOUNCE_DIGEST_DELAY 마다 요약 임베드로 묶어 보낸다.
+# 속도 계산과 모아 두기는 서버마다 따로 하고, 보낼 채널은 서버별 설정에서 찾는다.
+# 요약이 다 나가고 이벤트 수가 다시 임계값 아래로 내려오면 한 명씩 보내는 방식으로 돌아간다.
+ANNOUNCE_WINDOW = 10.0
+ANNOUNCE_RAID_THRESHOLD = 5
+ANNOUNCE_DIGEST_DELAY = 5.0
+ANNOUNCE_DIGEST_LINES = 40  # 요약 임베드 하나에 넣을 멤버 수 (설명 4096자 제한)
+# 요약 임베드는 메시지 하나에 최대 10개, 임베드 글자 수 합계 6000자까지 묶어 보낸다 (디스코드 제한)
+ANNOUNCE_EMBEDS_PER_MESSAGE = 10
+ANNOUNCE_MESSAGE_CHARS = 6000
+
+def _welcome_embed(member: discord.Member) -> discord.Embed:
+    embed = discord.Embed(
+        title="👋 새로운 유저 입장!",
+        description=f"{member.mention} 님이 서버에 들어왔습니다!",
+        color=discord.Color.green(),
+    )
+    embed.add_field(
+        name="디스코드 가입일",
+        value=member.created_at.astimezone(KST).strftime("%Y-%m-%d %H:%M:%S"),
+        inline=True,
+    )
+    embed.add_field(
+        name="서버 가입일",
+        value=(member.joined_at or discord.utils.utcnow()).astimezone(KST).strftime("%Y-%m-%d %H:%M:%S"),
+        inline=True,
+    )
+    embed.set_thumbnail(url=member.display_avatar.url)
+    embed.set_image(url=LEAVE_IMAGE_URL)
+    return embed
+
+def _welcome_digest(members: List[discord.Member]) -> discord.Embed:
+    lines = [f"{m.mention} (디스코드 가입 {m.created_at.astimezone(KST).strftime('%Y-%m-%d')})" for m in members]
+    return discord.Embed(
+        title=f"👋 새로운 유저 {len(members)}명 입장!",
+        description="\n".join(lines),
+        color=discord.Color.green(),
+    )
+
+def _leave_embed(member: discord.Member) -> discord.Embed:
+    embed = discord.Embed(
+        title="😢 유저 퇴장",
+        description=f"{member.name} 님이 서버를 떠났습니다.",
+        color=discord.Color.red(),
+    )
+    embed.set_thumbnail(url=member.display_avatar.url)
+    embed.set_image(url=LEAVE_IMAGE_URL)
+    return embed
+
+def _leave_digest(members: List[discord.Member]) -> discord.Embed:
+    return discord.Embed(
+        title=f"😢 유저 {len(members)}명 퇴장",
+        description="\n".join(m.name for m in members),
+        color=discord.Color.red(),
+    )
+
+class MemberAnnouncer:
+    def __init__(self, setting: str, single: Callable, digest: Callable):
+        self.setting = setting  # guild_settings 에서 채널 ID 를 꺼낼 키
+        self.single = single
+        self.digest = digest
+        self._recent: Dict[int, deque] = {}  # guild_id -> 최근 이벤트 시각 (monotonic)
+        self._pending: Dict[int, List[discord.Member]] = {}
+        self._timers: Dict[int, TimerHandle] = {}
+        self.sent_single = 0
+        self.sent_digest = 0
+
+    def _rate(self, guild_id: int, now: float) -> int:
+        recent = self._recent[guild_id]
+        while recent and now - recent[0] > ANNOUNCE_WINDOW:
+            recent.popleft()
+        return len(recent)
+
+    async def _channel(self, guild: Optional[discord.Guild]):
+        if guild is None:
+            return None
+        settings = await guild_settings.get(guild.id)
+        return guild.get_channel(settings[self.setting])
+
+    async def push(self, member: discord.Member):
+        gid = member.guild.id
+        now = time.monotonic()
+        self._recent.setdefault(gid, deque()).append(now)
+        if gid not in self._pending and self._rate(gid, now) <= ANNOUNCE_RAID_THRESHOLD:
+            ch = await self._channel(member.guild)
+            if ch:
+                await ch.send(embed=self.single(member))
+                self.sent_single += 1
+            return
+        self._pending.setdefault(gid, []).append(member)
+        if gid not in self._timers:
+            self._timers[gid] = timers.call_later(ANNOUNCE_DIGEST_DELAY, self._flush, gid)
+
+    async def _flush(self, guild_id: int):
+        del self._timers[guild_id]
+        members = self._pending.pop(guild_id, [])
+        ch = await self._channel(bot.get_guild(guild_id))
+        if not ch:
+            return
+        batch, chars = [], 0
+        for i in range(0, len(members), ANNOUNCE_DIGEST_LINES):
+            embed = self.digest(members[i:i + ANNOUNCE_DIGEST_LINES])
+            if batch and (len(batch) >= ANNOUNCE_EMBEDS_PER_MESSAGE or chars + len(embed) > ANNOUNCE_MESSAGE_CHARS):
+                await ch.send(embeds=batch)
+                self.sent_digest += 1
+                batch, chars = [], 0
+            batch.append(embed)
+            chars += len(embed)
+        if batch:
+            await ch.send(embeds=batch)
+            self.sent_digest += 1
+
+welcome_announcer = MemberAnnouncer("welcome_channel_id", _welcome_embed, _welcome_digest)
+leave_announcer = MemberAnnouncer("leave_channel_id", _leave_embed, _leave_digest)
+
+async def on_member_join(member: discord.Member):
+    await welcome_announcer.push(member)
+
+async def on_member_remove(member: discord.Member):
+    await leave_announcer.push(member)
+
+@commands.hybrid_command(name="ban", description="유저를 서버에서 차단합니다.")
+@commands.has_permissions(administrator=True)
+@timed("ban")
+async def ban(ctx: commands.Context, member: discord.Member, *, reason: Optional[str] = None):
+    await member.ban(reason=reason)
+    await ctx.send(f"{member.name} 님이 밴 되었습니다.")
+
+@commands.hybrid_command(name="kick", description="유저를 서버에서 추방합니다.")
+@commands.has_permissions(administrator=True)
+@timed("kick")
+async def kick(ctx: commands.Context, member: discord.Member, *, reason: Optional[str] = None):
+    await member.kick(reason=reason)
+    await ctx.send(f"{member.name} 님이 킥 되었습니다.")
+
+@app_commands.command(name="say", description="봇이 메시지를 보냅니다 (관리자 전용)")
+@app_commands.checks.has_permissions(administrator=True)
+@timed("say")
+async def say(interaction: discord.Interaction, message: str, image_url: Optional[str] = None):
+    if image_url:
+        embed = discord.Embed(description=message)
+        embed.set_image(url=image_url)
+        await interaction.channel.send(embed=embed)
+    else:
+        await interaction.channel.send(message)
+    await interaction.response.send_message("✅ 메시지를 보냈습니다!", ephemeral=True)
+
+@commands.hybrid_command(name="ticket", description="티켓을 생성합니다.")
+@timed("ticket")
+async def ticket(ctx: commands.Context):
+    if ctx.guild is None:
+        return await ctx.send("❌ 서버에서만 사용할 수 있습니다.")
+    settings = await guild_settings.get(ctx.guild.id)
+    category = ctx.guild.get_channel(settings["ticket_category_id"])
+    if not isinstance(category, discord.CategoryChannel):
+        return await ctx.send("❌ 티켓 카테고리를 찾을 수 없습니다.")
+    overwrites = {
+        ctx.guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        ctx.author: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+    }
+    staff = ctx.guild.get_role(settings["ticket_role_id"])
+    if staff:
+        overwrites[staff] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+    channel = await ctx.guild.create_text_channel(
+        name=f"ticket-{ctx.author.name}",
+        category=category,
+        overwrites=overwrites,
+    )
+    await ctx.send(f"✅ 티켓 생성됨: {channel.mention}")
+    await channel.send(
+        embed=discord.Embed(
+            title="🎫 티켓 생성됨",
+            description="궁금한 점을 자유롭게 질문해주세요!",
+            color=discord.Color.blue(),
+        )
+    )
+
+@app_commands.command(name="warn-warn", description="유저에게 경고를 부여합니다 (5회 누적 시 자동 킥)")
+@app_commands.describe(user="경고를 줄 유저", reason="사유 (선택)")
+@timed("warn-warn")
+async def warn(interaction: discord.Interaction, user: discord.Member, reason: str = "사유 없음"):
+    if not interaction.user.guild_permissions.administrator:
+        return await interaction.response.send_message("❌ 관리자만 사용 가능합니다.", ephemeral=True)
+    uid = str(user.id)
+    count = await add_warning(uid, 1)
+
+    role_name = (await guild_settings.get(interaction.guild.id))["warning_role_name"]
+    role = discord.utils.get(interaction.guild.roles, name=role_name)
+    if not role:
+        role = await interaction.guild.create_role(name=role_name, colour=discord.Colour.orange())
+
+    if count >= 3 and role not in user.roles:
+        await user.add_roles(role)
+        await interaction.channel.send(f"⚠️ {user.mention} 경고 역할 부여됨.")
+
+    if count >= 5:
+        await user.kick(reason="경고 5회 누적")
+        await interaction.channel.send(f"⛔ {user.mention} 경고 5회 누적으로 추방됨.")
+    else:
+        await interaction.response.send_message(f"⚠️ {user.mention} 경고 {count}회 (사유: {reason})")
+
+@app_commands.command(name="warn-remove", description="유저의 경고를 취소합니다")
+@app_commands.describe(user="경고를 줄일 유저", amount="차감할 횟수 (기본 1)")
+@timed("warn-remove")
+async def warn_remove(interaction: discord.Interaction, user: discord.Member, amount: int = 1):
+    if not interaction.user.guild_permissions.administrator:
+        return await interaction.response.send_message("❌ 관리자만 사용 가능합니다.", ephemeral=True)
+    uid = str(user.id)
+    count = await remove_warning(uid, amount)
+    await interaction.response.send_message(f"✅ {user.mention} 경고 {amount}회 취소됨 (현재 {count}회)")
+
+@app_commands.command(name="warnings", description="유저의 경고 수를 확인합니다")
+@app_commands.describe(user="확인할 유저")
+@timed("warnings")
+async def warnings_cmd(interaction: discord.Interaction, user: discord.Member):
+    cnt = await get_warnings(str(user.id))
+    await interaction.response.send_message(f"📋 {user.mention} 경고: **{cnt}회**")
+
+# ================= 역할 버튼 기능 =================
+class RoleButton(discord.ui.View):
+    def __init__(self, roles: list[Tuple[str, int]]):
+        super().__init__(timeout=None)
+        for label, role_id in roles:
+            self.add_item(self.RoleBtn(label, role_id))
+
+    class RoleBtn(discord.ui.Button):
+        def __init__(self, label: str, role_id: int):
+            super().__init__(label=label, style=discord.ButtonStyle.primary)
+            self.role_id = role_id
+
+        @timed("RoleButton.RoleBtn.callback")
+        async def callback(self, interaction: discord.Interaction):
+            role = interaction.guild.get_role(self.role_id)
+            if not role:
+                return await interaction.response.send_message("❌ 역할을 찾을 수 없습니다.", ephemeral=True)
+
+            if role in interaction.user.roles:
+                await interaction.user.remove_roles(role)
+                await interaction.response.send_message(f"❌ 역할 제거됨: {role.name}", ephemeral=True)
+            else:
+                await interaction.user.add_roles(role)
+                await interaction.response.send_message(f"✅ 역할 지급됨: {role.name}", ephemeral=True)
+
+
+@app_commands.command(name="set-role-buttons", description="버튼으로 역할 지급 메뉴 생성")
+@app_commands.describe(
+    title="메시지 제목",
+    description="메시지 설명",
+    role1="1번 버튼 (이름:역할ID)",
+    role2="2번 버튼 (선택)",
+    role3="3번 버튼 (선택)",
+    role4="4번 버튼 (선택)",
+    role5="5번 버튼 (선택)",
+    role6="6번 버튼 (선택)",
+    role7="7번 버튼 (선택)",
+)
+@timed("set-role-buttons")
+async def set_role_buttons(
+    interaction: discord.Interaction,
+    title: str,
+    description: str,
+    role1: str,
+    role2: str = None,
+    role3: str = None,
+    role4: str = None,
+    role5: str = None,
+    role6: str = None,
+    role7: str = None,
+):
+    if not interaction.user.guild_permissions.administrator:
+        return await interaction.response.send_message("❌ 관리자만 사용 가능합니다.", ephemeral=True)
+
+    role_inputs = [role1, role2, role3, role4, role5, role6, role7]
+    roles = []
+    for r in role_inputs:
+        if r:
+            try:
+                label, rid = r.split(":")
+                rid = int(rid.strip())
+                roles.append((label.strip(), rid))
+            except:
+                return await interaction.response.send_message("❌ 형식은 `버튼이름:역할ID` 로 입력해주세요.", ephemeral=True)
+
+    if not roles:
+        return await interaction.response.send_message("❌ 최소 1개 이상의 버튼을 입력해야 합니다.", ephemeral=True)
+
+    embed = discord.Embed(title=title, description=description, color=discord.Color.green())
+    view = RoleButton(roles)
+    await interaction.channel.send(embed=embed, view=view)
+    await interaction.response.send_message("✅ 역할 버튼 메뉴가 생성되었습니다.", ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    register_commands(bot, globals())
+    bot.add_listener(on_member_join)
+    bot.add_listener(on_member_remove)
@@ -0,0 +1,128 @@
+# 가위바위보 대결
+from typing import Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import register_commands, timed
+
+RPS_CHOICES = ("가위", "바위", "보")
+
+def rps_winner(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    wins = {("가위", "보"), ("바위", "가위"), ("보", "바위")}
+    return 1 if (a, b) in wins else -1
+
+class ReplayButtons(discord.ui.View):
+    def __init__(self, p1: discord.Member, p2: discord.Member):
+        super().__init__(timeout=60)
+        self.p1 = p1
+        self.p2 = p2
+
+    @discord.ui.button(label="🔄 재대결", style=discord.ButtonStyle.success)
+    @timed("ReplayButtons.replay")
+    async def replay(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user not in [self.p1, self.p2]:
+            return await interaction.response.send_message("이 대결의 참가자가 아닙니다.", ephemeral=True)
+        view = RPSButtons(self.p1, self.p2)
+        msg = await interaction.channel.send(
+            f"🎮 {self.p1.mention} vs {self.p2.mention} — 다시 한 번!", view=view
+        )
+        view.message = msg
+        await interaction.response.defer()
+
+    @discord.ui.button(label="🛑 종료", style=discord.ButtonStyle.danger)
+    @timed("ReplayButtons.end")
+    async def end(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user not in [self.p1, self.p2]:
+            return await interaction.response.send_message("이 대결의 참가자가 아닙니다.", ephemeral=True)
+        for c in self.children:
+            c.disabled = True
+        await interaction.response.edit_message(view=self)
+
+class RPSButtons(discord.ui.View):
+    def __init__(self, p1: discord.Member, p2: discord.Member):
+        super().__init__(timeout=60)
+        self.p1 = p1
+        self.p2 = p2
+        self.choices = {}
+        self.message: Optional[discord.Message] = None
+
+    async def _choose(self, interaction: discord.Interaction, pick: str):
+        if interaction.user not in [self.p1, self.p2]:
+            return await interaction.response.send_message("이 대결 참가자가 아닙니다.", ephemeral=True)
+        self.choices[interaction.user] = pick
+        await interaction.response.send_message(f"선택 완료: **{pick}**", ephemeral=True)
+
+        if len(self.choices) == 2:
+            a = self.choices[self.p1]
+            b = self.choices[self.p2]
+            result = rps_winner(a, b)
+            if result == 0:
+                msg = f"🟡 {self.p1.display_name}({a}) vs {self.p2.display_name}({b}) → **무승부!**"
+            elif result > 0:
+                msg = f"🟡 {self.p1.display_name}({a}) vs {self.p2.display_name}({b}) → **{self.p1.display_name} 승리!**"
+            else:
+                msg = f"🟡 {self.p1.display_name}({a}) vs {self.p2.display_name}({b}) → **{self.p2.display_name} 승리!**"
+
+            for c in self.children:
+                c.disabled = True
+            await self.message.edit(view=self)
+            await self.message.channel.send(msg, view=ReplayButtons(self.p1, self.p2))
+
+    @discord.ui.button(label="✌ 가위", style=discord.ButtonStyle.primary)
+    @timed("RPSButtons.s")
+    async def s(self, i: discord.Interaction, b: discord.ui.Button):
+        await self._choose(i, "가위")
+
+    @discord.ui.button(label="✊ 바위", style=discord.ButtonStyle.primary)
+    @timed("RPSButtons.r")
+    async def r(self, i: discord.Interaction, b: discord.ui.Button):
+        await self._choose(i, "바위")
+
+    @discord.ui.button(label="🖐 보", style=discord.ButtonStyle.primary)
+    @timed("RPSButtons.p")
+    async def p(self, i: discord.Interaction, b: discord.ui.Button):
+        await self._choose(i, "보")
+
+class AcceptDeclineRPS(discord.ui.View):
+    def __init__(self, challenger: discord.Member, opponent: discord.Member):
+        super().__init__(timeout=60)
+        self.challenger = challenger
+        self.opponent = opponent
+
+    @discord.ui.button(label="✅ 수락", style=discord.ButtonStyle.success)
+    @timed("AcceptDeclineRPS.accept")
+    async def accept(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user != self.opponent:
+            return await interaction.response.send_message("대결 대상만 수락할 수 있습니다.", ephemeral=True)
+        view = RPSButtons(self.challenger, self.opponent)
+        msg = await interaction.channel.send(
+            f"🎮 {self.challenger.mention} vs {self.opponent.mention} — 선택하세요!", view=view
+        )
+        view.message = msg
+        await interaction.response.edit_message(content="대결이 시작되었습니다!", view=None)
+
+    @discord.ui.button(label="❌ 거절", style=discord.ButtonStyle.danger)
+    @timed("AcceptDeclineRPS.decline")
+    async def decline(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user != self.opponent:
+            return await interaction.response.send_message("대결 대상만 거절할 수 있습니다.", ephemeral=True)
+        await interaction.response.edit_message(content="대결이 거절되었습니다.", view=None)
+
+@app_commands.command(name="rock-paper-scissors", description="가위바위보 대결을 신청합니다.")
+@app_commands.describe(user="대결을 신청할 유저")
+@timed("rock-paper-scissors")
+async def rps(interaction: discord.Interaction, user: discord.Member):
+    if user == interaction.user:
+        return await interaction.response.send_message("자기 자신과는 대결할 수 없어요!", ephemeral=True)
+    view = AcceptDeclineRPS(interaction.user, user)
+    await interaction.response.send_message(
+        f"🎮 {interaction.user.mention} → {user.mention} 가위바위보 대결 신청!", view=view
+    )
+
+
+async def setup(bot: commands.Bot):
+    register_commands(bot, globals())
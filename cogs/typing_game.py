@@ -0,0 +1,258 @@
+# 타자 게임: 문장 이미지 렌더링, 혼자/대결 모드, 랭킹
+import asyncio
+import functools
+import io
+import os
+import random
+import time
+from typing import List, Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import (
+    get_ranking, get_ranking_count, register_commands, router, timed, typing_board, update_best_time,
+)
+
+# ================= 타자 게임 =================
+TYPING_TEXTS = [
+    "무궁화 삼천리 화려 강산 대한 사람, 대한으로 길이 보전하세.",
+    "남산 위에 저 소나무, 철갑을 두른 듯 바람 서리 불변함은 우리 기상일세.",
+    "가을 하늘 공활한데 높고 구름 없이 밝은 달은 우리 가슴 일편단심일세.",
+    "이 기상과 이 맘으로 충성을 다하여 괴로우나 즐거우나 나라 사랑하세.",
+    "빠르게 정확하게 입력하는 연습은 생각보다 재미있어요!",
+    "하루에 한 번씩 도전하면 기록이 눈에 뜨게 좋아집니다."
+]
+
+FONT_CANDIDATES = [
+    "C:\\Windows\\Fonts\\malgun.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/AppleSDGothicNeo.ttc",
+]
+
+# Pillow 는 불러오는 데 시간이 꽤 걸려 봇 시작이 아니라 처음 그릴 때 불러온다
+def _pil():
+    from PIL import Image, ImageDraw, ImageFont
+    return Image, ImageDraw, ImageFont
+
+# 폰트 파일 탐색과 TrueType 로딩은 한 번만
+@functools.lru_cache(maxsize=None)
+def _pick_font():
+    ImageFont = _pil()[2]
+    for p in FONT_CANDIDATES:
+        if os.path.exists(p):
+            try:
+                return ImageFont.truetype(p, 32)
+            except:
+                pass
+    return ImageFont.load_default()
+
+def _render_png(text: str) -> bytes:
+    Image, ImageDraw, _ = _pil()
+    font = _pick_font()
+    w = max(800, 28 * len(text))
+    img = Image.new("RGB", (min(w, 1600), 120), "white")
+    draw = ImageDraw.Draw(img)
+    draw.text((20, 40), text, font=font, fill="black")
+    bio = io.BytesIO()
+    img.save(bio, "PNG")
+    return bio.getvalue()
+
+# (문장, 폰트) -> PNG 바이트. 시작할 때 TYPING_TEXTS 를 미리 그려 둔다.
+PNG_CACHE_MAX = 128
+_png_cache = {}
+
+def _png_key(text: str):
+    return text, getattr(_pick_font(), "path", "default")
+
+def _store_png(key, png: bytes):
+    if len(_png_cache) >= PNG_CACHE_MAX:
+        _png_cache.pop(next(iter(_png_cache)))
+    _png_cache[key] = png
+
+def text_to_image(text: str) -> discord.File:
+    key = _png_key(text)
+    png = _png_cache.get(key)
+    if png is None:
+        png = _render_png(text)
+        _store_png(key, png)
+    return discord.File(io.BytesIO(png), filename="typing.png")
+
+async def text_to_image_async(text: str) -> discord.File:
+    # 캐시에 없으면 렌더링/PNG 인코딩을 스레드 풀에서 처리해 이벤트 루프를 막지 않는다
+    loop = asyncio.get_running_loop()
+    if _pick_font.cache_info().currsize == 0:
+        await loop.run_in_executor(None, _pick_font)
+    key = _png_key(text)
+    png = _png_cache.get(key)
+    if png is None:
+        png = await loop.run_in_executor(None, _render_png, text)
+        _store_png(key, png)
+    return discord.File(io.BytesIO(png), filename="typing.png")
+
+async def warm_typing_images():
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, _pick_font)
+    for text in TYPING_TEXTS:
+        key = _png_key(text)
+        if key not in _png_cache:
+            _store_png(key, await loop.run_in_executor(None, _render_png, text))
+
+async def _typing_round_send(interaction: discord.Interaction, text: str):
+    file = await text_to_image_async(text)
+    embed = discord.Embed(
+        title="⌨️ 타자 속도 게임",
+        description="🕔 28초 안에 아래 문장을 **정확히** 입력하세요!",
+        color=discord.Color.blue(),
+    )
+    embed.set_image(url="attachment://typing.png")
+    await interaction.followup.send(embed=embed, file=file)
+
+async def _wait_correct_message(channel: discord.abc.Messageable, players: List[discord.Member], target: str):
+    # 참가자마다 (채널, 유저) 로 등록하고 먼저 들어온 메시지 하나를 받는다
+    fut = asyncio.get_running_loop().create_future()
+
+    async def on_reply(m: discord.Message) -> bool:
+        if not fut.done():
+            fut.set_result(m)
+        return False
+
+    removers = [router.add(channel.id, p.id, on_reply) for p in players]
+    t0 = time.time()
+    try:
+        msg = await asyncio.wait_for(fut, timeout=28.0)
+    except asyncio.TimeoutError:
+        return None, None
+    finally:
+        for remove in removers:
+            remove()
+    if msg.content == target:
+        return msg.author, round(time.time() - t0, 2)
+    return "wrong", None
+
+class AcceptDeclineTyping(discord.ui.View):
+    def __init__(self, challenger: discord.Member, opponent: discord.Member):
+        super().__init__(timeout=60)
+        self.challenger = challenger
+        self.opponent = opponent
+
+    @discord.ui.button(label="✅ 수락(대결 시작)", style=discord.ButtonStyle.success)
+    @timed("AcceptDeclineTyping.accept")
+    async def accept(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user != self.opponent:
+            return await interaction.response.send_message("대결 대상만 수락할 수 있습니다.", ephemeral=True)
+        await interaction.response.edit_message(content="대결을 시작합니다!", view=None)
+        text = random.choice(TYPING_TEXTS)
+        await interaction.followup.send("문장을 곧 전송합니다…")
+        await _typing_round_send(interaction, text)
+        winner, elapsed = await _wait_correct_message(interaction.channel, [self.challenger, self.opponent], text)
+        if winner is None:
+            return await interaction.followup.send("⏰ 시간 초과! 아무도 성공하지 못했습니다.")
+        if winner == "wrong":
+            return await interaction.followup.send("❌ 오답이 입력되었습니다. 다시 시도하세요.")
+        uid = str(winner.id)
+        improved, best = await update_best_time(uid, elapsed)
+        if improved:
+            await interaction.followup.send(f"🎉 {winner.mention} 승리! **{elapsed}초** (개인 최고 기록 갱신)")
+        else:
+            await interaction.followup.send(f"✅ {winner.mention} 승리! **{elapsed}초** (개인 최고: {best}초)")
+
+    @discord.ui.button(label="❌ 거절", style=discord.ButtonStyle.danger)
+    @timed("AcceptDeclineTyping.decline")
+    async def decline(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user != self.opponent:
+            return await interaction.response.send_message("대결 대상만 거절할 수 있습니다.", ephemeral=True)
+        await interaction.response.edit_message(content="대결이 거절되었습니다.", view=None)
+
+@app_commands.command(name="typinggame", description="타자게임: 혼자 또는 유저를 지목해 대결")
+@app_commands.describe(opponent="대결할 유저 (생략 시 혼자 모드)")
+@timed("typinggame")
+async def typinggame(interaction: discord.Interaction, opponent: Optional[discord.Member] = None):
+    await interaction.response.send_message("⌨️ 준비 중…", ephemeral=True)
+
+    if opponent and opponent != interaction.user:
+        view = AcceptDeclineTyping(interaction.user, opponent)
+        await interaction.followup.send(
+            f"⌨️ {interaction.user.mention} → {opponent.mention} 타자 대결 신청!", view=view
+        )
+        return
+
+    # 혼자 모드
+    text = random.choice(TYPING_TEXTS)
+    await _typing_round_send(interaction, text)
+    who, elapsed = await _wait_correct_message(interaction.channel, [interaction.user], text)
+    if who is None:
+        return await interaction.followup.send("⏰ 시간 초과! 다시 시도하세요.")
+    if who == "wrong":
+        return await interaction.followup.send("❌ 오답이에요. 다시 시도!")
+    uid = str(interaction.user.id)
+    improved, best = await update_best_time(uid, elapsed)
+    if improved:
+        await interaction.followup.send(f"🎉 {interaction.user.mention} 성공! **{elapsed}초** (개인 최고 기록 갱신)")
+    else:
+        await interaction.followup.send(f"✅ {interaction.user.mention} 성공! **{elapsed}초** (개인 최고: {best}초)")
+
+
+class RankPager(discord.ui.View):
+    def __init__(self, page: int = 0, page_size: int = 10, user_id: Optional[int] = None):
+        super().__init__(timeout=120)
+        self.page = page
+        self.page_size = page_size
+        self.user_id = user_id
+        self.total = get_ranking_count()
+
+    def _make_embed(self):
+        offset = self.page * self.page_size
+        rows = get_ranking(offset=offset, limit=self.page_size)
+        embed = discord.Embed(title="🏆 타자게임 랭킹", color=discord.Color.gold())
+        if not rows:
+            embed.description = "기록이 없습니다."
+            return embed
+        for idx, (uid, score) in enumerate(rows, start=offset + 1):
+            name = f"<@{uid}>"
+            embed.add_field(name=f"{idx}위", value=f"{name} : {score}초", inline=False)
+        footer = f"페이지 {self.page+1} / {max(1, (self.total + self.page_size - 1)//self.page_size)}"
+        my_rank = typing_board.rank(str(self.user_id)) if self.user_id else None
+        if my_rank:
+            footer += f" | 내 순위 {my_rank}위"
+        embed.set_footer(text=footer)
+        return embed
+
+    async def send(self, interaction: discord.Interaction):
+        await interaction.response.send_message(embed=self._make_embed(), view=self)
+
+    @discord.ui.button(label="◀ 이전", style=discord.ButtonStyle.secondary)
+    @timed("RankPager.prev")
+    async def prev(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page <= 0:
+            return await interaction.response.send_message("첫 페이지입니다.", ephemeral=True)
+        self.page -= 1
+        await interaction.response.edit_message(embed=self._make_embed(), view=self)
+
+    @discord.ui.button(label="다음 ▶", style=discord.ButtonStyle.secondary)
+    @timed("RankPager.next")
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        max_page = max(0, (self.total - 1) // self.page_size)
+        if self.page >= max_page:
+            return await interaction.response.send_message("마지막 페이지입니다.", ephemeral=True)
+        self.page += 1
+        await interaction.response.edit_message(embed=self._make_embed(), view=self)
+
+@app_commands.command(name="typingrank", description="타자게임 랭킹 보기(페이지 이동 지원)")
+@timed("typingrank")
+async def typingrank(interaction: discord.Interaction):
+    pager = RankPager(page=0, page_size=10, user_id=interaction.user.id)
+    await pager.send(interaction)
+
+
+async def setup(bot: commands.Bot):
+    register_commands(bot, globals())
+    # 문장 이미지는 로그인 뒤에 미리 그려 둔다 (!reload 로 다시 불릴 때는 바로)
+    if bot.is_ready():
+        asyncio.get_running_loop().create_task(warm_typing_images())
+    else:
+        async def _warm_once():
+            bot.remove_listener(_warm_once, "on_ready")
+            await warm_typing_images()
+        bot.add_listener(_warm_once, "on_ready")
@@ -0,0 +1,428 @@
+# 비디오 챌린지: 영상 공유 채널 챌린지 진행과 완료 판정
+import asyncio
+import hashlib
+import io
+import json
+import os
+import random
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import (
+    TimerHandle, bot, deadline_of, register_commands, remaining_until, router, shared_state, state_journal, timed,
+    timers,
+)
+
+# 활성 챌린지를 저장할 딕셔너리. 재시작해도 이어지도록 상태 저널에도 적는다
+active_challenges = shared_state("video.active_challenges")
+
+# 🎬 영상 파일 고정 설정 (관리자가 업로드해도 안바뀜)
+VIDEO_FILE_PATH = "challenge_video.mp4"  # 항상 이 파일만 사용
+VIDEO_TITLE = "고정 챌린지 영상"
+
+
+
+# ================= 비디오 챌린지 =================
+class ChallengeView(discord.ui.View):
+    def __init__(self, user_id, channel_id):
+        super().__init__(timeout=None)
+        self.user_id = user_id
+        self.channel_id = channel_id
+    
+    @discord.ui.button(label='포기', style=discord.ButtonStyle.red, emoji='❌')
+    @timed("ChallengeView.give_up")
+    async def give_up(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("본인만 포기할 수 있습니다.", ephemeral=True)
+            return
+        
+        if self.channel_id in active_challenges:
+            challenge_data = active_challenges[self.channel_id]
+            challenge_data['status'] = 'given_up'
+            
+            challenge_data['challenge'].stop()
+        
+        embed = discord.Embed(
+            title="🔴 챌린지 포기",
+            description=f"{interaction.user.mention}님이 챌린지를 포기했습니다.",
+            color=0xff0000
+        )
+        
+        await interaction.response.edit_message(embed=embed, view=None)
+        
+        if self.channel_id in active_challenges:
+            del active_challenges[self.channel_id]
+
+
+# ================= 챌린지 영상 재사용 =================
+# 처음 업로드한 첨부파일(CDN)을 파일 내용 해시로 기억해 두고, 이후 챌린지는 그 링크를 보낸다.
+# 파일이 바뀌면(크기/수정 시각이 다르고 해시도 다르면) 다시 업로드한다.
+# CDN 링크는 만료(ex=)되므로 만료가 가까우면 원래 메시지를 다시 조회해 새 링크를 받는다.
+VIDEO_CACHE_FILE = "video_cache.json"
+VIDEO_URL_MIN_LIFETIME = 600  # 초, 이보다 적게 남은 링크는 갱신
+
+def _load_video_cache() -> dict:
+    try:
+        with open(VIDEO_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_video_cache(data: dict):
+    with open(VIDEO_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+_video_cache = _load_video_cache()
+_video_lock = asyncio.Lock()
+
+def _video_file_state(path: str) -> Optional[dict]:
+    # 스레드 풀에서 실행. 크기/수정 시각이 그대로면 해시를 다시 계산하지 않는다.
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    cached = _video_cache
+    if cached.get("path") == path and cached.get("size") == st.st_size and cached.get("mtime_ns") == st.st_mtime_ns:
+        digest = cached["sha256"]
+    else:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+    return {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def _url_expires_at(url: str) -> Optional[int]:
+    ex = parse_qs(urlparse(url).query).get("ex")
+    try:
+        return int(ex[0], 16) if ex else None
+    except ValueError:
+        return None
+
+async def _cached_video_url(state: dict) -> Optional[str]:
+    cached = _video_cache
+    if cached.get("sha256") != state["sha256"] or not cached.get("url"):
+        return None
+    expires = _url_expires_at(cached["url"])
+    if expires is None or expires - time.time() > VIDEO_URL_MIN_LIFETIME:
+        return cached["url"]
+    try:
+        channel = bot.get_channel(cached["channel_id"]) or await bot.fetch_channel(cached["channel_id"])
+        message = await channel.fetch_message(cached["message_id"])
+    except (discord.HTTPException, KeyError):
+        return None
+    if not message.attachments:
+        return None
+    cached["url"] = message.attachments[0].url
+    await asyncio.get_running_loop().run_in_executor(None, _save_video_cache, dict(cached))
+    return cached["url"]
+
+async def send_challenge_video(channel, state: dict, **kwargs) -> discord.Message:
+    global _video_cache
+    async with _video_lock:
+        url = await _cached_video_url(state)
+        if url:
+            return await channel.send(content=url, **kwargs)
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, _read_file, state["path"])
+        file = discord.File(io.BytesIO(data), filename=os.path.basename(state["path"]))
+        message = await channel.send(file=file, **kwargs)
+        if message.attachments:
+            _video_cache = dict(state, url=message.attachments[0].url, channel_id=channel.id, message_id=message.id)
+            await loop.run_in_executor(None, _save_video_cache, dict(_video_cache))
+        return message
+
+
+class VideoChallenge:
+    def __init__(self, user_id, channel, video_file_path=None, completion_role_id=None):
+        self.user_id = user_id
+        self.channel = channel
+        self.video_file_path = video_file_path or VIDEO_FILE_PATH
+        self.video_title = VIDEO_TITLE
+        self.completion_role_id = completion_role_id
+        self.status = 'active'
+        self.current_question = None
+        self.question_start_time = None
+        self.timer: Optional[TimerHandle] = None
+        self.unroute: Optional[Callable[[], None]] = None
+        self.message_id: Optional[int] = None
+        self.give_up_id: Optional[str] = None
+        
+    async def start_challenge(self):
+        loop = asyncio.get_running_loop()
+        state = await loop.run_in_executor(None, _video_file_state, self.video_file_path)
+        if state is None:
+            embed = discord.Embed(
+                title="❌ 파일 오류",
+                description=f"영상 파일을 찾을 수 없습니다: {self.video_file_path}",
+                color=0xff0000
+            )
+            await self.channel.send(embed=embed)
+            return None
+        
+        file_size = state["size"]
+        if file_size > 8 * 1024 * 1024:
+            embed = discord.Embed(
+                title="❌ 파일 크기 초과",
+                description=f"파일 크기가 8MB를 초과합니다.\n현재 크기: {file_size / (1024*1024):.1f}MB",
+                color=0xff0000
+            )
+            await self.channel.send(embed=embed)
+            return None
+        
+        embed = discord.Embed(
+            title="🎬 비디오 챌린지 시작!",
+            description=f"**참가자:** <@{self.user_id}>\n**비디오:** {self.video_title}\n\n3분마다 수학 문제가 출제됩니다.\n1분 이내에 답하지 못하면 자동 탈락됩니다!",
+            color=0x00ff00
+        )
+        embed.add_field(name="📋 규칙", value="• 3분마다 수학 문제 출제\n• 1분 이내 답변 필수\n• 포기 버튼으로 언제든 종료 가능", inline=False)
+        
+        view = ChallengeView(self.user_id, self.channel.id)
+        
+        try:
+            message = await send_challenge_video(self.channel, state, embed=embed, view=view)
+        except Exception as e:
+            embed = discord.Embed(
+                title="❌ 파일 업로드 오류",
+                description=f"파일 업로드 중 오류가 발생했습니다: {str(e)}",
+                color=0xff0000
+            )
+            await self.channel.send(embed=embed)
+            return None
+        
+        self.timer = timers.call_later(180, self.ask_question)  # 3분 뒤 첫 문제
+        self.unroute = router.add(self.channel.id, self.user_id, self.check_answer)
+        active_challenges[self.channel.id] = {
+            'challenge': self,
+            'message': message,
+            'status': 'active'
+        }
+        self.message_id = message.id
+        self.give_up_id = view.give_up.custom_id
+        self._journal()
+        
+        return self.timer
+
+    def _journal(self):
+        # 다음 타이머는 콜백 이름과 마감 시각으로 적어 두고 restore_challenge() 가 다시 건다
+        state_journal.put("video", self.channel.id, {
+            'user_id': self.user_id,
+            'video_file_path': self.video_file_path,
+            'completion_role_id': self.completion_role_id,
+            'current_question': self.current_question,
+            'question_start_time': self.question_start_time.timestamp() if self.question_start_time else None,
+            'timer': self.timer.callback.__name__ if self.timer else None,
+            'deadline': deadline_of(self.timer),
+            'message_id': self.message_id,
+            'give_up_id': self.give_up_id,
+        })
+
+    def stop(self):
+        # 타이머와 답변 등록을 함께 내린다
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        if self.unroute:
+            self.unroute()
+            self.unroute = None
+        state_journal.delete("video", self.channel.id)
+
+    async def _question_deadline(self):
+        self.timer = None
+        if self.status != 'active':
+            return
+        if self.current_question:
+            await self.fail_challenge("시간 초과로 탈락되었습니다.")
+        else:
+            self.timer = timers.call_later(180, self.ask_question)  # 3분 뒤 다음 문제
+            self._journal()
+    
+    async def ask_question(self):
+        self.timer = None
+        if self.status != 'active':
+            return
+        num1 = random.randint(1, 20)
+        num2 = random.randint(1, 20)
+        answer = num1 + num2
+        self.current_question = {
+            'question': f"{num1} + {num2} = ?",
+            'answer': answer
+        }
+        self.question_start_time = datetime.now()
+        embed = discord.Embed(
+            title="🧮 수학 문제!",
+            description=f"**문제:** {self.current_question['question']}\n\n<@{self.user_id}>님, 1분 이내에 답해주세요!",
+            color=0xffff00
+        )
+        embed.add_field(name="⏰ 제한 시간", value="1분", inline=True)
+        await self.channel.send(embed=embed)
+        self.timer = timers.call_later(60, self._question_deadline)  # 1분 대기
+        self._journal()
+    
+    async def check_answer(self, message):
+        if not self.current_question or self.status != 'active':
+            return False
+        if message.author.id != self.user_id:
+            return False
+        try:
+            user_answer = int(message.content.strip())
+            if user_answer == self.current_question['answer']:
+                self.current_question = None
+                self._journal()
+                embed = discord.Embed(
+                    title="✅ 정답!",
+                    description=f"{message.author.mention}님이 정답을 맞혔습니다!",
+                    color=0x00ff00
+                )
+                await self.channel.send(embed=embed)
+                return True
+            else:
+                await self.fail_challenge("오답으로 탈락되었습니다.")
+                return True
+        except ValueError:
+            return False
+    
+    async def fail_challenge(self, reason):
+        self.status = 'failed'
+        self.stop()
+        embed = discord.Embed(
+            title="❌ 챌린지 실패",
+            description=f"<@{self.user_id}>님이 {reason}",
+            color=0xff0000
+        )
+        await self.channel.send(embed=embed)
+        if self.channel.id in active_challenges:
+            del active_challenges[self.channel.id]
+    
+    async def complete_challenge(self):
+        self.status = 'completed'
+        self.stop()
+        embed = discord.Embed(
+            title="🎉 챌린지 완료!",
+            description=f"<@{self.user_id}>님이 비디오 챌린지를 완료했습니다!",
+            color=0x00ff00
+        )
+        mention_text = ""
+        if self.completion_role_id:
+            mention_text = f"\n\n<@&{self.completion_role_id}> 챌린지가 완료되었습니다!"
+        await self.channel.send(embed=embed)
+        if mention_text:
+            await self.channel.send(mention_text)
+        if self.channel.id in active_challenges:
+            del active_challenges[self.channel.id]
+
+
+def restore_challenge(bot: commands.Bot, channel_id: int, s: dict):
+    # 채널 객체는 아직 캐시에 없을 수 있으므로 보내기만 되는 PartialMessageable 로 이어 간다
+    challenge = VideoChallenge(s['user_id'], bot.get_partial_messageable(channel_id), s['video_file_path'], s['completion_role_id'])
+    challenge.current_question = s['current_question']
+    if s['question_start_time']:
+        challenge.question_start_time = datetime.fromtimestamp(s['question_start_time'])
+    challenge.message_id = s['message_id']
+    challenge.give_up_id = s['give_up_id']
+    if s['timer']:
+        challenge.timer = timers.call_later(remaining_until(s['deadline']), getattr(challenge, s['timer']))
+    challenge.unroute = router.add(channel_id, challenge.user_id, challenge.check_answer)
+    active_challenges[channel_id] = {
+        'challenge': challenge,
+        'message': None,
+        'status': 'active'
+    }
+    # 포기 버튼은 같은 custom_id 로 영구 뷰를 다시 붙여 재시작 뒤에도 눌리게 한다
+    if challenge.message_id and challenge.give_up_id:
+        view = ChallengeView(challenge.user_id, channel_id)
+        view.give_up.custom_id = challenge.give_up_id
+        bot.add_view(view, message_id=challenge.message_id)
+
+
+# ================= 비디오 챌린지 명령어 =================
+@app_commands.command(name="video-challenge", description="비디오 챌린지를 시작합니다")
+@app_commands.describe(completion_role="완료 시 멘션할 역할 (선택사항)")
+@timed("video-challenge")
+async def video_challenge(interaction: discord.Interaction, completion_role: discord.Role = None):
+    if interaction.channel.id in active_challenges:
+        embed = discord.Embed(
+            title="⚠️ 이미 활성 챌린지가 있습니다",
+            description="현재 채널에서 진행 중인 챌린지가 있습니다. 완료하거나 포기한 후 다시 시도해주세요.",
+            color=0xff9900
+        )
+        await interaction.response.send_message(embed=embed)
+        return
+    completion_role_id = completion_role.id if completion_role else None
+    challenge = VideoChallenge(interaction.user.id, interaction.channel, completion_role_id=completion_role_id)
+    await interaction.response.send_message("챌린지를 시작합니다...")
+    timer = await challenge.start_challenge()
+    if timer is None:
+        await interaction.edit_original_response(content="챌린지 시작에 실패했습니다.")
+
+@app_commands.command(name="end-challenge", description="현재 진행 중인 챌린지를 강제로 완료합니다 (관리자 전용)")
+@timed("end-challenge")
+async def end_challenge(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        embed = discord.Embed(
+            title="❌ 권한 부족",
+            description="이 명령어는 관리자만 사용할 수 있습니다.",
+            color=0xff0000
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+    if interaction.channel.id not in active_challenges:
+        embed = discord.Embed(
+            title="❌ 활성 챌린지 없음",
+            description="현재 채널에서 진행 중인 챌린지가 없습니다.",
+            color=0xff0000
+        )
+        await interaction.response.send_message(embed=embed)
+        return
+    challenge_data = active_challenges[interaction.channel.id]
+    challenge = challenge_data['challenge']
+    await challenge.complete_challenge()
+    embed = discord.Embed(
+        title="✅ 챌린지 강제 완료",
+        description="관리자에 의해 챌린지가 완료되었습니다.",
+        color=0x00ff00
+    )
+    await interaction.response.send_message(embed=embed)
+
+@app_commands.command(name="challenge-status", description="현재 챌린지 상태를 확인합니다")
+@timed("challenge-status")
+async def challenge_status(interaction: discord.Interaction):
+    if interaction.channel.id not in active_challenges:
+        embed = discord.Embed(
+            title="📊 챌린지 상태",
+            description="현재 채널에서 진행 중인 챌린지가 없습니다.",
+            color=0x999999
+        )
+        await interaction.response.send_message(embed=embed)
+        return
+    challenge_data = active_challenges[interaction.channel.id]
+    challenge = challenge_data['challenge']
+    embed = discord.Embed(
+        title="📊 현재 챌린지 상태",
+        color=0x0099ff
+    )
+    embed.add_field(name="참가자", value=f"<@{challenge.user_id}>", inline=True)
+    embed.add_field(name="상태", value=challenge.status, inline=True)
+    embed.add_field(name="비디오 파일", value=os.path.basename(challenge.video_file_path), inline=False)
+    if challenge.current_question:
+        time_left = 60 - (datetime.now() - challenge.question_start_time).seconds
+        embed.add_field(name="현재 문제", value=challenge.current_question['question'], inline=True)
+        embed.add_field(name="남은 시간", value=f"{max(0, time_left)}초", inline=True)
+    await interaction.response.send_message(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    register_commands(bot, globals())
+    for channel_id, s in state_journal.take("video").items():
+        if channel_id not in active_challenges:
+            restore_challenge(bot, channel_id, s)
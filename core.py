@@ -0,0 +1,1672 @@
+# 공용 기반: 봇 객체, DB/쓰기 지연, 타이머, 메시지 라우터, 계측, 서버별 설정, 상태 HTTP, 확장 로딩.
+# 기능(명령어/게임)은 cogs/ 아래 확장에 있고, 실행은 "import discord RP.py" 로 한다.
+import os
+import sys
+import time
+import json
+import math
+import signal
+import asyncio
+import contextvars
+import functools
+import hashlib
+import sqlite3
+import traceback
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import discord
+import yarl
+from aiohttp import web
+from discord import app_commands
+from discord.ext import commands
+
+intents = discord.Intents.default()
+intents.message_content = True
+intents.members = True
+
+# ================= 샤딩 =================
+# SHARD_COUNT 를 주면 AutoShardedBot 으로 뜬다 (auto 면 디스코드 권장 샤드 수).
+# SHARD_IDS(예: "0,1" 또는 "4-7")로 이 프로세스가 맡을 샤드만 고르면 샤드 묶음을 여러 프로세스로 나눠 띄울 수 있다.
+#   SHARD_COUNT=4 SHARD_IDS=0-1 PORT=8080 python "import discord RP.py"
+#   SHARD_COUNT=4 SHARD_IDS=2-3 PORT=8081 python "import discord RP.py"
+# 한 서버의 이벤트는 항상 같은 샤드로 오므로 채널 단위 게임 상태(active_challenges, active_math_problems,
+# 메시지 라우터)는 프로세스마다 따로 들고 있어도 겹치지 않는다. 여러 서버에 걸치는 유저 단위 상태는 DB 에 둔다.
+def _parse_shard_ids(text: str) -> Optional[List[int]]:
+    ids = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        lo, _, hi = part.partition("-")
+        ids.extend(range(int(lo), int(hi or lo) + 1))
+    return ids or None
+
+_shard_count = os.getenv("SHARD_COUNT", "")
+SHARD_COUNT: Optional[int] = None if _shard_count in ("", "auto") else int(_shard_count)
+SHARD_IDS = _parse_shard_ids(os.getenv("SHARD_IDS", ""))
+# 같은 DB 를 쓰는 다른 프로세스가 있는지. 이때는 메모리 캐시/리더보드를 주기적으로 DB 에서 다시 읽는다
+MULTI_PROCESS = SHARD_IDS is not None and SHARD_COUNT is not None and len(SHARD_IDS) < SHARD_COUNT
+# 전역 슬래시 명령어 동기화(변경됐을 때만)는 0번 샤드를 가진 프로세스 하나만
+SYNC_COMMANDS = SHARD_IDS is None or 0 in SHARD_IDS
+
+if _shard_count or SHARD_IDS:
+    bot = commands.AutoShardedBot(command_prefix="!", intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+else:
+    bot = commands.Bot(command_prefix="!", intents=intents)
+
+# 부하 테스트(loadtest/)의 가짜 디스코드 서버에 붙일 때만 쓰는 주소. 평소에는 설정하지 않는다.
+if os.getenv("DISCORD_API_BASE"):
+    discord.http.Route.BASE = os.getenv("DISCORD_API_BASE")
+if os.getenv("DISCORD_GATEWAY_URL"):
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(os.getenv("DISCORD_GATEWAY_URL"))
+
+
+LEAVE_CHANNEL_ID   = 1389576208269709422
+WELCOME_CHANNEL_ID = 1389575857949114488
+TICKET_CATEGORY_ID = 1396783155331207178
+TICKET_ROLE_ID     = 1397767970461192302
+
+WARNING_ROLE_NAME = "⚠️ 경고"
+
+
+# SQLite DB 파일. 예전에는 기능별로 파일이 3개였고, 남아 있으면 처음 시작할 때 한 번 옮겨 온다 (원본은 그대로 둔다)
+DB_FILE = "bot.db"
+LEGACY_DB_FILES = {"legacy_main": "bot_records.db", "legacy_math": "math_scores.db", "legacy_fish": "fishing_bot.db"}
+
+# ================= DB 접근 계층 =================
+# DB 파일 하나에 장기 연결 1개와 전용 워커 스레드 1개를 둔다.
+# 쿼리는 모두 워커 스레드에서 순서대로 실행되므로 이벤트 루프가 디스크 I/O로 멈추지 않고,
+# 한 번의 run() 호출 안에서 하는 읽기-쓰기는 다른 호출과 섞이지 않는다.
+class Database:
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-{os.path.basename(path)}")
+        self.buffers: List["WriteBehind"] = []
+        self._flush_wanted = False  # 워커 스레드에서 버퍼가 가득 찼다고 알린 경우
+        self._flush_task: Optional[asyncio.Task] = None
+        self.queued = 0  # 워커 스레드에 넘겼지만 아직 끝나지 않은 작업 수
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+        return self._conn
+
+    def _call(self, fn, args):
+        conn = self._connect()
+        try:
+            result = fn(conn, *args)
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        if self._flush_wanted:
+            # 가득 찬 버퍼는 호출한 작업이 커밋된 뒤 따로 기록한다. 실패해도 변경분은 버퍼에 남아 다음 flush 때 다시 시도
+            self._flush_wanted = False
+            try:
+                self._flush(conn)
+            except Exception as e:
+                print(f"⚠️ DB 기록 실패 ({self.path}): {e}")
+        return result
+
+    async def run(self, fn, *args):
+        # fn(conn, *args) 를 워커 스레드에서 한 트랜잭션으로 실행
+        loop = asyncio.get_running_loop()
+        self.queued += 1
+        t0 = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._executor, self._call, fn, args)
+        finally:
+            self.queued -= 1
+            rec = _timing.get()
+            if rec is not None:
+                rec["db"] += time.perf_counter() - t0
+
+    def run_sync(self, fn, *args):
+        # 이벤트 루프가 돌기 전/끝난 뒤에만 사용
+        return self._executor.submit(self._call, fn, args).result()
+
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        return await self.run(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def fetchone(self, sql: str, params: tuple = ()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: tuple = ()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    def pending_count(self) -> int:
+        return sum(len(buf.pending) for buf in self.buffers)
+
+    def _flush(self, conn: sqlite3.Connection):
+        # 모든 버퍼를 한 트랜잭션으로 기록한다. 어느 하나라도 실패하면 트랜잭션 전체가 롤백되므로
+        # 앞서 쓴 버퍼의 변경분까지 모두 되돌려 놓고, 커밋이 끝난 뒤에야 메모리에서 내려놓은 것으로 본다
+        taken = []
+        try:
+            for buf in self.buffers:
+                items = buf.take()
+                if items:
+                    taken.append((buf, items))
+                    buf.write(conn, items)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            for buf, items in taken:
+                buf.requeue(items)
+            raise
+
+    async def flush(self):
+        if self.pending_count():
+            await self.run(self._flush)
+
+    def schedule_flush(self):
+        # 이벤트 루프에서 버퍼가 가득 찼을 때 다음 주기를 기다리지 않고 기록
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    def close(self):
+        if self.pending_count():
+            self.run_sync(self._flush)
+
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._executor.submit(_close).result()
+        self._executor.shutdown(wait=True)
+
+
+# ================= 쓰기 지연(write-behind) =================
+# 게임 이벤트마다 커밋하지 않고, 키(유저)별 변경분을 메모리에서 합쳐 두었다가
+# FLUSH_INTERVAL 마다 또는 FLUSH_MAX_PENDING 개가 쌓이면 한 트랜잭션으로 기록한다.
+# 읽기 함수는 DB 값 위에 아직 기록되지 않은 변경분을 얹어서 돌려준다.
+FLUSH_INTERVAL = 1.0
+FLUSH_MAX_PENDING = 256
+
+class WriteBehind:
+    def __init__(self, db: Database, merge, write):
+        self.db = db
+        self.merge = merge    # merge(old_delta, new_delta) -> delta
+        self.write = write    # write(conn, {key: delta, ...})
+        self.pending = {}
+        self._lock = threading.Lock()
+        db.buffers.append(self)
+
+    def get(self, key):
+        with self._lock:
+            return self.pending.get(key)
+
+    def _merge_in(self, key, delta) -> bool:
+        with self._lock:
+            old = self.pending.get(key)
+            self.pending[key] = delta if old is None else self.merge(old, delta)
+            return len(self.pending) >= FLUSH_MAX_PENDING
+
+    def push(self, conn: sqlite3.Connection, key, delta):
+        # 워커 스레드에서 호출. 가득 차도 여기서 기록하지 않는다 (다른 버퍼의 실패가 이 작업까지 롤백하지 않도록)
+        if self._merge_in(key, delta):
+            self.db._flush_wanted = True
+
+    def add(self, key, delta):
+        # 이벤트 루프에서 호출
+        if self._merge_in(key, delta):
+            self.db.schedule_flush()
+
+    def take(self) -> dict:
+        with self._lock:
+            items, self.pending = self.pending, {}
+        return items
+
+    def requeue(self, items: dict):
+        # 기록하지 못한 변경분은 버리지 않고, 그 사이 새로 쌓인 변경분 앞에 합쳐 다음 flush 때 다시 시도
+        with self._lock:
+            for key, delta in items.items():
+                newer = self.pending.get(key)
+                self.pending[key] = delta if newer is None else self.merge(delta, newer)
+
+def _sum_merge(old: dict, new: dict) -> dict:
+    return {k: old[k] + new[k] for k in new}
+
+async def flush_loop():
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        try:
+            await bot_db.flush()
+        except Exception as e:
+            print(f"⚠️ DB 기록 실패 ({bot_db.path}): {e}")
+
+# ================= 타이머 =================
+# 게임 제한 시간은 모두 이 타이머 휠 하나에 등록한다. 게임마다 잠자는 태스크를 두지 않고,
+# 대기 중인 타이머가 있을 때만 태스크 하나가 TIMER_TICK 마다 깨어나 해당 슬롯만 확인한다.
+# 등록/취소는 O(1) (슬롯 = 만료 tick % 슬롯 수).
+TIMER_TICK = 0.5
+TIMER_SLOTS = 512
+
+class TimerHandle:
+    __slots__ = ("tick", "callback", "args", "cancelled", "_wheel")
+
+    def __init__(self, wheel: "TimerWheel", tick: int, callback, args):
+        self._wheel = wheel
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._wheel._remove(self)
+
+    def remaining(self) -> float:
+        return max(0.0, self.tick * self._wheel.tick_len - asyncio.get_running_loop().time())
+
+class TimerWheel:
+    def __init__(self, tick_len: float = TIMER_TICK, slots: int = TIMER_SLOTS):
+        self.tick_len = tick_len
+        self._slots = [set() for _ in range(slots)]
+        self._last_tick: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = set()  # 실행 중인 코루틴 콜백
+        self.pending = 0
+        self.fired = 0
+        self.cancelled = 0
+
+    def call_later(self, delay: float, callback, *args) -> TimerHandle:
+        # callback 은 일반 함수나 코루틴 함수 모두 가능
+        loop = asyncio.get_running_loop()
+        tick = math.ceil((loop.time() + delay) / self.tick_len)
+        handle = TimerHandle(self, tick, callback, args)
+        self._slots[tick % len(self._slots)].add(handle)
+        self.pending += 1
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._last_tick = math.floor(loop.time() / self.tick_len)
+            self._task = loop.create_task(self._run())
+        self._wakeup.set()
+        return handle
+
+    def _remove(self, handle: TimerHandle):
+        slot = self._slots[handle.tick % len(self._slots)]
+        if handle in slot:
+            slot.discard(handle)
+            self.pending -= 1
+            self.cancelled += 1
+
+    def _fire(self, handle: TimerHandle):
+        self.fired += 1
+        try:
+            result = handle.callback(*handle.args)
+            if asyncio.iscoroutine(result):
+                task = asyncio.get_running_loop().create_task(result)
+                self._running.add(task)
+                task.add_done_callback(self._done)
+        except Exception as e:
+            print(f"⚠️ 타이머 콜백 오류: {e!r}")
+
+    def _done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"⚠️ 타이머 콜백 오류: {task.exception()!r}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                self._last_tick = math.floor(loop.time() / self.tick_len)
+            now_tick = math.floor(loop.time() / self.tick_len)
+            # 오래 멈췄더라도 슬롯은 한 바퀴만 돌면 된다
+            start = max(self._last_tick + 1, now_tick - len(self._slots) + 1)
+            for t in range(start, now_tick + 1):
+                slot = self._slots[t % len(self._slots)]
+                due = [h for h in slot if h.tick <= now_tick]
+                for h in due:
+                    slot.discard(h)
+                    self.pending -= 1
+                    self._fire(h)
+            self._last_tick = now_tick
+            await asyncio.sleep((now_tick + 1) * self.tick_len - loop.time())
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, "fired": self.fired, "cancelled": self.cancelled}
+
+timers = TimerWheel()
+
+# ================= 메시지 라우터 =================
+# 게임이 기다리는 메시지를 (채널, 작성자) 로 등록해 둔다.
+# on_message 는 메시지마다 dict 조회 두 번만 하고, 등록이 없으면 게임 코드를 건드리지 않는다.
+# 리스너는 async (message) -> bool, True 를 돌려주면 메시지를 소비한 것으로 보고 명령어 처리도 건너뛴다.
+ANY_AUTHOR = None
+
+class MessageRouter:
+    def __init__(self):
+        self._routes: Dict[Tuple[int, Optional[int]], list] = {}
+
+    def add(self, channel_id: int, author_id: Optional[int], listener: Callable) -> Callable[[], None]:
+        key = (channel_id, author_id)
+        self._routes.setdefault(key, []).append(listener)
+
+        def remove():
+            listeners = self._routes.get(key)
+            if listeners and listener in listeners:
+                listeners.remove(listener)
+                if not listeners:
+                    del self._routes[key]
+        return remove
+
+    async def dispatch(self, message: discord.Message) -> bool:
+        ch = message.channel.id
+        for key in ((ch, message.author.id), (ch, ANY_AUTHOR)):
+            listeners = self._routes.get(key)
+            if not listeners:
+                continue
+            # 리스너가 처리 도중 스스로 등록을 해제할 수 있으므로 복사본으로 돈다
+            for listener in tuple(listeners):
+                if await listener(message):
+                    return True
+        return False
+
+    def __len__(self):
+        return sum(len(v) for v in self._routes.values())
+
+router = MessageRouter()
+
+# ================= 진행 중 게임 상태 저널 =================
+# 진행 중인 게임(수학 문제, 비디오 챌린지)은 메모리에만 있으므로 상태가 바뀔 때마다 JSON 한 줄씩 append 해 두고,
+# 다시 시작하면 setup_hook 에서 읽어 확장이 이어서 진행한다. 레코드는 {"k": 종류, "id": 키, "v": 값} 이고 v 가 없으면 삭제.
+# 한 줄을 바로 os.write 로 붙이므로 (fsync 없음) 비용은 시스템 콜 한 번이고, 프로세스가 죽어도 쓴 줄은 남는다.
+# 제한 시간은 남은 초가 아니라 벽시계 마감 시각(time.time())으로 적어 두어 꺼져 있던 시간만큼 줄어든 채로 복원된다.
+# 레코드가 살아 있는 항목보다 훨씬 많아지면 현재 상태만 새 파일에 써서 갈아 끼운다.
+# 샤드 묶음별 프로세스는 서로 다른 채널을 맡으므로 파일도 따로 쓴다.
+STATE_JOURNAL_FILE = "state_journal.jsonl" if SHARD_IDS is None else f"state_journal.{SHARD_IDS[0]}-{SHARD_IDS[-1]}.jsonl"
+JOURNAL_COMPACT_MIN = 1000
+
+class StateJournal:
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._live: Dict[Tuple[str, object], dict] = {}
+        self._restored: Dict[str, Dict[object, dict]] = {}
+        self._records = 0
+        self.writes = 0
+
+    def load(self):
+        # 끝 줄이 쓰다 만 채로 남았을 수 있으므로 읽히지 않는 줄은 건너뛴다
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "v" in rec:
+                        self._live[(rec["k"], rec["id"])] = rec["v"]
+                    else:
+                        self._live.pop((rec["k"], rec["id"]), None)
+        except FileNotFoundError:
+            pass
+        for (kind, key), value in self._live.items():
+            self._restored.setdefault(kind, {})[key] = value
+        self._compact()
+        if self._live:
+            print(f"♻️ 진행 중이던 게임 상태 {len(self._live)}개 복원")
+
+    def take(self, kind: str) -> Dict[object, dict]:
+        # 확장의 setup() 에서 한 번만 받아 간다 (!reload 로 다시 불려도 두 번 복원하지 않도록)
+        return self._restored.pop(kind, {})
+
+    def put(self, kind: str, key, value: dict):
+        self._live[(kind, key)] = value
+        self._append({"k": kind, "id": key, "v": value})
+
+    def delete(self, kind: str, key):
+        if self._live.pop((kind, key), None) is not None:
+            self._append({"k": kind, "id": key})
+
+    def _append(self, rec: dict):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        os.write(self._fd, (json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n").encode())
+        self._records += 1
+        self.writes += 1
+        if self._records > max(JOURNAL_COMPACT_MIN, 4 * len(self._live)):
+            self._compact()
+
+    def _compact(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for (kind, key), value in self._live.items():
+                f.write(json.dumps({"k": kind, "id": key, "v": value}, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if self._fd is not None:
+            os.close(self._fd)
+        os.replace(tmp, self.path)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        self._records = len(self._live)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def stats(self) -> dict:
+        return {"live": len(self._live), "records": self._records, "writes": self.writes}
+
+state_journal = StateJournal(STATE_JOURNAL_FILE)
+
+def deadline_of(handle: Optional[TimerHandle]) -> Optional[float]:
+    # 타이머의 만료 시각을 저널에 적을 벽시계 시각으로
+    return time.time() + handle.remaining() if handle and not handle.cancelled else None
+
+def remaining_until(deadline: Optional[float]) -> float:
+    return max(0.0, (deadline or 0.0) - time.time())
+
+# ================= 명령어 계측 =================
+# @timed(이름) 을 붙인 명령어/버튼 콜백마다 세 가지를 히스토그램으로 남긴다.
+#   첫 응답까지 시간(상호작용만. response.* 로 응답이 끝난 시점, 3초 안에 못 하면 outcome="late")
+#   전체 처리 시간, DB 작업 시간 (Database.run 이 현재 기록에 더한다)
+# 디스코드는 상호작용에 3초 안에 응답해야 하므로 ACK_WARN 을 넘으면 로그를 남긴다.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 2.5, 3.0, 5.0, 10.0)
+ACK_WARN = 2.5
+ACK_DEADLINE = 3.0
+ACK_POLL = 0.01         # 응답 여부 확인 간격 (측정 해상도)
+ACK_NAMES_MAX = 1024
+
+def _prom_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}  # 라벨 값 -> [버킷별 개수..., +Inf, 합계]
+
+    def observe(self, labels: tuple, value: float):
+        row = self.series.get(labels)
+        if row is None:
+            row = self.series[labels] = [0] * (len(self.buckets) + 2)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, row in sorted(self.series.items()):
+            base = ",".join(f'{k}="{_prom_label(str(v))}"' for k, v in zip(self.label_names, labels))
+            total = 0
+            for le, n in zip(self.buckets + ("+Inf",), row):
+                total += n
+                lines.append(f'{self.name}_bucket{{{base},le="{le}"}} {total}')
+            lines.append(f"{self.name}_sum{{{base}}} {row[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {total}")
+        return lines
+
+ack_seconds = Histogram("bot_handler_ack_seconds", "Time until the first response", ("handler", "outcome"))
+handler_seconds = Histogram("bot_handler_seconds", "Total handler time", ("handler", "outcome"))
+handler_db_seconds = Histogram("bot_handler_db_seconds", "Time spent waiting on the DB worker", ("handler", "outcome"))
+HISTOGRAMS = (ack_seconds, handler_seconds, handler_db_seconds)
+
+_timing: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("timing", default=None)
+handler_tasks: Dict[asyncio.Task, str] = {}  # 실행 중인 태스크 -> 핸들러 이름 (루프 감시용)
+_ack_names: "OrderedDict[int, str]" = OrderedDict()  # 상호작용 id -> 처리 중인 @timed 핸들러 이름
+
+def _name_interaction(args, name: str):
+    for a in args:
+        if isinstance(a, commands.Context):
+            a = a.interaction
+        if isinstance(a, discord.Interaction):
+            _ack_names[a.id] = name
+            if len(_ack_names) > ACK_NAMES_MAX:
+                _ack_names.popitem(last=False)
+            return
+
+def timed(name: str):
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            rec = {"start": time.perf_counter(), "db": 0.0}
+            _name_interaction(args, name)
+            token = _timing.set(rec)
+            task = asyncio.current_task()
+            handler_tasks[task] = name
+            outcome = "ok"
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                _timing.reset(token)
+                handler_tasks.pop(task, None)
+                labels = (name, outcome)
+                handler_seconds.observe(labels, time.perf_counter() - rec["start"])
+                handler_db_seconds.observe(labels, rec["db"])
+        return wrapper
+    return deco
+
+# 라이브러리 객체는 건드리지 않는다. 상호작용마다 이 리스너가 response.is_done() 을 ACK_POLL 간격으로 확인하고,
+# 응답이 끝난 시점을 디스코드가 상호작용을 만든 시각(interaction.created_at)부터 잰다.
+async def _watch_ack(interaction: discord.Interaction):
+    if interaction.type is discord.InteractionType.autocomplete:
+        return
+
+    def age() -> float:
+        return max(0.0, (discord.utils.utcnow() - interaction.created_at).total_seconds())
+
+    while not interaction.response.is_done() and age() < ACK_DEADLINE:
+        await asyncio.sleep(ACK_POLL)
+    ack = age()
+    name = _ack_names.pop(interaction.id, None)
+    if name is None:
+        name = interaction.command.qualified_name if interaction.command else "component"
+    ack_seconds.observe((name, "ok" if interaction.response.is_done() else "late"), ack)
+    if ack > ACK_WARN:
+        print(f"⚠️ 느린 응답: {name} {ack:.2f}초")
+
+bot.add_listener(_watch_ack, 'on_interaction')
+
+bot_db = Database(DB_FILE)
+
+
+# ================= 스키마 / 마이그레이션 =================
+# schema_version 에 마지막으로 적용한 마이그레이션 번호를 두고, 시작할 때 최신이면 DDL 을 하나도 실행하지 않는다.
+# 스키마를 바꿀 때는 기존 함수를 고치지 말고 MIGRATIONS 끝에 새 함수를 덧붙인다.
+def _m001_create_tables(conn: sqlite3.Connection):
+    conn.execute("""
+    CREATE TABLE typing_records (
+        user_id TEXT PRIMARY KEY,
+        best_time REAL
+    )
+    """)
+    conn.execute("CREATE INDEX idx_typing_best_time ON typing_records (best_time)")
+    conn.execute("""
+    CREATE TABLE warnings (
+        user_id TEXT PRIMARY KEY,
+        count INTEGER
+    )
+    """)
+    # 서버별 설정. NULL 이면 GUILD_SETTING_DEFAULTS 의 기본값
+    conn.execute("""
+    CREATE TABLE guild_settings (
+        guild_id TEXT PRIMARY KEY,
+        welcome_channel_id INTEGER,
+        leave_channel_id INTEGER,
+        ticket_category_id INTEGER,
+        ticket_role_id INTEGER,
+        warning_role_name TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE user_scores (
+        user_id TEXT PRIMARY KEY,
+        score INTEGER,
+        correct_count INTEGER,
+        total_count INTEGER,
+        max_consecutive INTEGER,
+        consecutive INTEGER
+    )
+    """)
+    conn.execute("CREATE INDEX idx_user_scores_score ON user_scores (score DESC)")
+    # 난이도는 서버(샤드 프로세스)를 넘나들어도 같아야 하므로 DB 에 둔다
+    conn.execute("""
+    CREATE TABLE math_difficulty (
+        user_id TEXT PRIMARY KEY,
+        difficulty TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE users (
+        user_id TEXT PRIMARY KEY,
+        coins INTEGER,
+        jji INTEGER,
+        last_attendance TEXT
+    )
+    """)
+    # 인벤토리는 (유저, 아이템)당 한 행, 전투력은 user_power 에 미리 합산
+    conn.execute("""
+    CREATE TABLE inventory (
+        user_id TEXT,
+        item TEXT,
+        quantity INTEGER,
+        PRIMARY KEY (user_id, item)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE user_power (
+        user_id TEXT PRIMARY KEY,
+        power INTEGER
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE dungeon_stats (
+        user_id TEXT,
+        dungeon_name TEXT,
+        clears INTEGER,
+        fails INTEGER,
+        coins INTEGER DEFAULT 0,
+        PRIMARY KEY (user_id, dungeon_name)
+    )
+    """)
+    conn.execute("CREATE INDEX idx_dungeon_stats_clears ON dungeon_stats (dungeon_name, clears DESC)")
+    conn.execute("CREATE INDEX idx_dungeon_stats_coins ON dungeon_stats (dungeon_name, coins DESC)")
+    # 전체 랭킹용 유저별 합계. 기록할 때 dungeon_stats 와 같이 갱신한다
+    conn.execute("""
+    CREATE TABLE dungeon_totals (
+        user_id TEXT PRIMARY KEY,
+        clears INTEGER,
+        fails INTEGER,
+        coins INTEGER
+    )
+    """)
+    conn.execute("CREATE INDEX idx_dungeon_totals_clears ON dungeon_totals (clears DESC)")
+    conn.execute("CREATE INDEX idx_dungeon_totals_coins ON dungeon_totals (coins DESC)")
+
+def _legacy_columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def _m002_import_legacy(conn: sqlite3.Connection):
+    # _migrate 가 붙여 둔(ATTACH) 예전 파일에서 그대로 옮길 수 있는 테이블을 복사한다.
+    # 예전 파일이 예전 형식이어도 되도록 양쪽에 다 있는 컬럼만 옮긴다.
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    tables = {
+        "legacy_main": ("typing_records", "warnings", "guild_settings"),
+        "legacy_math": ("user_scores", "math_difficulty"),
+        "legacy_fish": ("users", "dungeon_stats"),
+    }
+    for schema, names in tables.items():
+        if schema not in attached:
+            continue
+        for table in names:
+            old = set(_legacy_columns(conn, schema, table))
+            cols = ", ".join(c for c in _legacy_columns(conn, "main", table) if c in old)
+            if cols:
+                conn.execute(f"INSERT OR IGNORE INTO main.{table} ({cols}) SELECT {cols} FROM {schema}.{table}")
+    if "legacy_fish" in attached:
+        old = _legacy_columns(conn, "legacy_fish", "inventory")
+        if "quantity" in old:
+            conn.execute("INSERT OR IGNORE INTO main.inventory SELECT user_id, item, quantity FROM legacy_fish.inventory")
+        elif old:
+            # 더 예전 형식(아이템 1개당 1행)
+            conn.execute("""
+                INSERT OR IGNORE INTO main.inventory (user_id, item, quantity)
+                SELECT user_id, item, COUNT(*) FROM legacy_fish.inventory GROUP BY user_id, item
+            """)
+    # 합계 테이블은 옮긴 원본으로 다시 만든다
+    _rebuild_power(conn)
+    conn.execute("DELETE FROM dungeon_totals")
+    conn.execute("""
+        INSERT INTO dungeon_totals (user_id, clears, fails, coins)
+        SELECT user_id, SUM(clears), SUM(fails), SUM(COALESCE(coins, 0)) FROM dungeon_stats GROUP BY user_id
+    """)
+
+def _m003_bot_meta(conn: sqlite3.Connection):
+    # 봇 자체 상태(마지막으로 동기화한 명령어 트리 해시 등)
+    conn.execute("""
+    CREATE TABLE bot_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """)
+
+MIGRATIONS = [
+    _m001_create_tables,
+    _m002_import_legacy,
+    _m003_bot_meta,
+]
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_version'").fetchone():
+        return 0
+    row = conn.execute("SELECT version FROM schema_version").fetchone()
+    return row[0] if row else 0
+
+def _migrate(conn: sqlite3.Connection) -> Tuple[int, int]:
+    # (이전 버전, 현재 버전)
+    version = _schema_version(conn)
+    if version >= len(MIGRATIONS):
+        return version, version
+    # ATTACH 는 트랜잭션 안에서 할 수 없으므로 먼저 붙인다
+    attached = [alias for alias, path in LEGACY_DB_FILES.items() if os.path.exists(path)]
+    for alias in attached:
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (LEGACY_DB_FILES[alias],))
+    try:
+        # 여러 프로세스가 동시에 떠도 한 곳에서만 적용되도록 쓰기 잠금을 잡고 다시 확인
+        conn.execute("BEGIN IMMEDIATE")
+        version = _schema_version(conn)
+        for step in MIGRATIONS[version:]:
+            step(conn)
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        conn.execute("DELETE FROM schema_version")
+        conn.execute("INSERT INTO schema_version (version) VALUES (?)", (len(MIGRATIONS),))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        for alias in attached:
+            conn.execute(f"DETACH DATABASE {alias}")
+    return version, len(MIGRATIONS)
+
+async def init_db():
+    before, after = await bot_db.run(_migrate)
+    if before != after:
+        print(f"🗄️ DB 스키마 {before} → {after}")
+
+
+async def get_warnings(user_id: str) -> int:
+    row = await bot_db.fetchone("SELECT count FROM warnings WHERE user_id=?", (user_id,))
+    return row[0] if row else 0
+
+async def _change_warning(user_id: str, amount: int) -> int:
+    row = await bot_db.fetchone("""
+        INSERT INTO warnings (user_id, count) VALUES (:uid, MAX(0, :amount))
+        ON CONFLICT(user_id) DO UPDATE SET count = MAX(0, count + :amount)
+        RETURNING count
+    """, {"uid": user_id, "amount": amount})
+    return row[0]
+
+async def add_warning(user_id: str, amount: int = 1) -> int:
+    return await _change_warning(user_id, amount)
+
+async def remove_warning(user_id: str, amount: int = 1) -> int:
+    return await _change_warning(user_id, -amount)
+
+async def get_best_time(user_id: str) -> Optional[float]:
+    row = await bot_db.fetchone("SELECT best_time FROM typing_records WHERE user_id=?", (user_id,))
+    return row[0] if row else None
+
+def _update_best_time(conn: sqlite3.Connection, user_id: str, new_time: float) -> Tuple[bool, float]:
+    # 기록을 갱신했으면 (True, 새 기록), 아니면 (False, 기존 기록). 갱신 여부와 관계없이 쿼리 한 번
+    # (기존 기록과 같은 시간이면 갱신으로 본다)
+    best = conn.execute("""
+        INSERT INTO typing_records (user_id, best_time) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET best_time = MIN(COALESCE(best_time, excluded.best_time), excluded.best_time)
+        RETURNING best_time
+    """, (user_id, new_time)).fetchone()[0]
+    return best == new_time, best
+
+async def update_best_time(user_id: str, new_time: float) -> Tuple[bool, float]:
+    improved, best = await bot_db.run(_update_best_time, user_id, new_time)
+    if improved:
+        typing_board.update(user_id, best)
+    return improved, best
+
+def get_ranking(offset: int = 0, limit: int = 10) -> List[Tuple[str, float]]:
+    return typing_board.page(offset, limit)
+
+def get_ranking_count() -> int:
+    return len(typing_board)
+
+
+# ================= 리더보드 =================
+# 시작할 때 테이블에서 한 번 읽어 (정렬키, user_id) 정렬 리스트로 들고 있고, 점수가 바뀔 때마다 갱신한다.
+# 순위/페이지 조회는 이분 탐색(O(log n))이라 테이블을 다시 정렬하지 않는다.
+# 갱신은 삭제+삽입이지만 리스트 이동은 memmove 라 30만 명 기준으로도 수십 μs 수준이다.
+class Leaderboard:
+    def __init__(self, descending: bool = False):
+        self.descending = descending
+        self._entries: List[Tuple[float, str]] = []
+        self._keys = {}
+        self._recent: Optional[dict] = None  # reload() 도중 들어온 갱신
+
+    def _key(self, value) -> float:
+        return -value if self.descending else value
+
+    def _build(self, rows):
+        keys = {uid: self._key(value) for uid, value in rows if value is not None}
+        return keys, sorted((key, uid) for uid, key in keys.items())
+
+    def load(self, rows):
+        self._keys, self._entries = self._build(rows)
+
+    async def reload(self, fetch):
+        # 다른 프로세스가 기록한 값까지 다시 읽는다. 정렬은 스레드에서 하고 교체만 루프에서 하며,
+        # 읽는 동안 이 프로세스에서 들어온 갱신은 새 목록에 다시 적용한다.
+        self._recent = {}
+        try:
+            rows = await fetch()
+            built = await asyncio.get_running_loop().run_in_executor(None, self._build, rows)
+        finally:
+            recent, self._recent = self._recent, None
+        self._keys, self._entries = built
+        for uid, value in recent.items():
+            self.update(uid, value)
+
+    def update(self, user_id: str, value):
+        if self._recent is not None:
+            self._recent[user_id] = value
+        key = self._key(value)
+        old = self._keys.get(user_id)
+        if old == key:
+            return
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (old, user_id))]
+        insort(self._entries, (key, user_id))
+        self._keys[user_id] = key
+
+    def rank(self, user_id: str) -> Optional[int]:
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        return bisect_left(self._entries, (key, user_id)) + 1
+
+    def value(self, user_id: str):
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        return self._key(key)
+
+    def page(self, offset: int = 0, limit: int = 10) -> List[Tuple[str, float]]:
+        return [(uid, self._key(key)) for key, uid in self._entries[offset:offset + limit]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+typing_board = Leaderboard()                  # best_time 오름차순
+math_board = Leaderboard(descending=True)     # score 내림차순
+
+def _typing_board_rows(conn: sqlite3.Connection):
+    bot_db._flush(conn)  # 이 프로세스의 쓰기 지연분도 포함되도록 먼저 기록
+    return conn.execute("SELECT user_id, best_time FROM typing_records").fetchall()
+
+def _math_board_rows(conn: sqlite3.Connection):
+    bot_db._flush(conn)
+    return conn.execute("SELECT user_id, score FROM user_scores").fetchall()
+
+async def load_leaderboards():
+    typing_board.load(await bot_db.run(_typing_board_rows))
+    math_board.load(await bot_db.run(_math_board_rows))
+
+# 여러 프로세스가 같은 DB 를 쓸 때(MULTI_PROCESS)만 돌린다
+LEADERBOARD_REFRESH = float(os.getenv("LEADERBOARD_REFRESH", "30"))  # 초
+
+async def leaderboard_refresh_loop():
+    while True:
+        await asyncio.sleep(LEADERBOARD_REFRESH)
+        try:
+            await typing_board.reload(lambda: bot_db.run(_typing_board_rows))
+            await math_board.reload(lambda: bot_db.run(_math_board_rows))
+        except Exception as e:
+            print(f"⚠️ 리더보드 새로고침 실패: {e}")
+
+
+# Math game functions
+MATH_SCORE_COLUMNS = ['user_id','score','correct_count','total_count','max_consecutive','consecutive']
+
+# 한 문제 풀이 결과를 변경분으로 표현한다. 연속 정답은 단순 합이 아니므로
+# lead(기존 연속에 이어지는 정답 수), reset(중간에 오답 여부), tail(마지막 오답 뒤 정답 수),
+# best(오답 사이 최장 연속)로 나눠 여러 문제를 합칠 수 있게 한다.
+def _math_delta(earned, correct) -> dict:
+    if correct:
+        return {'score': earned, 'correct': 1, 'total': 1, 'lead': 1, 'reset': False, 'tail': 0, 'best': 0}
+    return {'score': 0, 'correct': 0, 'total': 1, 'lead': 0, 'reset': True, 'tail': 0, 'best': 0}
+
+def _merge_math(old: dict, new: dict) -> dict:
+    d = {k: old[k] + new[k] for k in ('score', 'correct', 'total')}
+    if new['reset']:
+        if old['reset']:
+            d.update(lead=old['lead'], best=max(old['best'], old['tail'] + new['lead'], new['best']))
+        else:
+            d.update(lead=old['lead'] + new['lead'], best=new['best'])
+        d.update(reset=True, tail=new['tail'])
+    elif old['reset']:
+        tail = old['tail'] + new['lead']
+        d.update(reset=True, lead=old['lead'], tail=tail, best=max(old['best'], tail))
+    else:
+        d.update(reset=False, lead=old['lead'] + new['lead'], tail=0, best=0)
+    return d
+
+def _apply_math(data: dict, d: dict):
+    data['score'] += d['score']
+    data['correct_count'] += d['correct']
+    data['total_count'] += d['total']
+    if d['reset']:
+        data['max_consecutive'] = max(data['max_consecutive'], data['consecutive'] + d['lead'], d['best'])
+        data['consecutive'] = d['tail']
+    else:
+        data['consecutive'] += d['lead']
+        data['max_consecutive'] = max(data['max_consecutive'], data['consecutive'])
+
+def _load_math_score(conn: sqlite3.Connection, user_id: str) -> dict:
+    row = conn.execute("SELECT * FROM user_scores WHERE user_id=?", (user_id,)).fetchone()
+    if row:
+        return dict(zip(MATH_SCORE_COLUMNS, row))
+    return {'user_id': user_id, 'score': 0, 'correct_count': 0, 'total_count': 0, 'max_consecutive': 0, 'consecutive': 0}
+
+# _apply_math 와 같은 계산을 한 문장의 upsert 로 수행
+def _write_math_scores(conn: sqlite3.Connection, items: dict):
+    conn.executemany('''
+    INSERT INTO user_scores(user_id,score,correct_count,total_count,max_consecutive,consecutive)
+    VALUES (:user_id, :score, :correct, :total, MAX(:lead, :best), CASE WHEN :reset THEN :tail ELSE :lead END)
+    ON CONFLICT(user_id) DO UPDATE SET
+        score = score + :score,
+        correct_count = correct_count + :correct,
+        total_count = total_count + :total,
+        max_consecutive = MAX(max_consecutive, consecutive + :lead, :best),
+        consecutive = CASE WHEN :reset THEN :tail ELSE consecutive + :lead END
+    ''', [dict(d, user_id=uid) for uid, d in items.items()])
+
+math_writes = WriteBehind(bot_db, _merge_math, _write_math_scores)
+
+def _read_math_score(conn: sqlite3.Connection, user_id: str) -> dict:
+    data = _load_math_score(conn, user_id)
+    d = math_writes.get(user_id)
+    if d:
+        _apply_math(data, d)
+    return data
+
+async def get_math_score(user_id):
+    return await bot_db.run(_read_math_score, user_id)
+
+def _update_math_score(conn: sqlite3.Connection, user_id, earned, correct):
+    math_writes.push(conn, user_id, _math_delta(earned, correct))
+    return _read_math_score(conn, user_id)
+
+async def update_math_score(user_id, earned, correct):
+    data = await bot_db.run(_update_math_score, user_id, earned, correct)
+    math_board.update(user_id, data['score'])
+    return data
+
+
+# ================= 서버별 설정 =================
+# 입장/퇴장 채널, 티켓 카테고리/역할, 경고 역할 이름을 서버마다 guild_settings 테이블에 둔다.
+# 서버별로 처음 필요할 때 한 번 읽어 메모리에 두고, 이후 조회는 dict 하나다. 설정 명령어로 바꾸면 캐시에서 지운다.
+# 한 서버의 이벤트/명령어는 항상 같은 샤드 프로세스로 오므로 프로세스끼리 캐시를 맞출 필요는 없다.
+# 채널/역할은 항상 해당 서버 안에서만 찾으므로, 기본값이 다른 서버 것이어도 엉뚱한 곳에 보내지 않는다.
+GUILD_SETTING_DEFAULTS = {
+    "welcome_channel_id": WELCOME_CHANNEL_ID,
+    "leave_channel_id": LEAVE_CHANNEL_ID,
+    "ticket_category_id": TICKET_CATEGORY_ID,
+    "ticket_role_id": TICKET_ROLE_ID,
+    "warning_role_name": WARNING_ROLE_NAME,
+}
+
+class GuildSettings:
+    def __init__(self):
+        self._cache: Dict[int, dict] = {}
+        self._loading: Dict[int, asyncio.Future] = {}
+
+    async def get(self, guild_id: int) -> dict:
+        settings = self._cache.get(guild_id)
+        if settings is not None:
+            return settings
+        # 같은 서버를 동시에 불러오면 DB 조회는 한 번만
+        fut = self._loading.get(guild_id)
+        if fut is None:
+            fut = asyncio.ensure_future(self._load(guild_id))
+            self._loading[guild_id] = fut
+        return await asyncio.shield(fut)
+
+    async def _load(self, guild_id: int) -> dict:
+        try:
+            row = await bot_db.fetchone(
+                f"SELECT {', '.join(GUILD_SETTING_DEFAULTS)} FROM guild_settings WHERE guild_id=?", (str(guild_id),))
+        finally:
+            del self._loading[guild_id]
+        settings = dict(GUILD_SETTING_DEFAULTS)
+        if row:
+            settings.update((k, v) for k, v in zip(GUILD_SETTING_DEFAULTS, row) if v is not None)
+        self._cache[guild_id] = settings
+        return settings
+
+    async def set(self, guild_id: int, key: str, value):
+        # value 가 None 이면 기본값으로 되돌린다
+        if key not in GUILD_SETTING_DEFAULTS:
+            raise KeyError(key)
+        await bot_db.execute(
+            f"INSERT INTO guild_settings (guild_id, {key}) VALUES (?, ?) "
+            f"ON CONFLICT(guild_id) DO UPDATE SET {key} = excluded.{key}", (str(guild_id), value))
+        self.forget(guild_id)
+
+    def forget(self, guild_id: int):
+        self._cache.pop(guild_id, None)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+guild_settings = GuildSettings()
+
+async def _forget_guild_settings(guild: discord.Guild):
+    guild_settings.forget(guild.id)
+
+bot.add_listener(_forget_guild_settings, 'on_guild_remove')
+
+@bot.event
+async def on_message(message):
+    if message.author == bot.user:
+        return
+    
+    # 게임 답변은 라우터에 등록된 (채널, 작성자) 만 확인한다
+    if await router.dispatch(message):
+        return
+
+    # 접두사가 없는 일반 대화는 명령어 파서까지 보내지 않는다
+    if not message.content.startswith(bot.command_prefix):
+        return
+
+    await bot.process_commands(message)
+
+# ================= 유저 데이터 =================
+def _load_user_data(conn: sqlite3.Connection, user_id: str):
+    # 처음 보는 유저는 행을 만들지 않고 기본값만 돌려준다 (첫 기록 때 upsert 로 생성)
+    row = conn.execute("SELECT coins, jji, last_attendance FROM users WHERE user_id=?", (user_id,)).fetchone()
+    if row:
+        coins, jji, last_attendance = row
+    else:
+        coins, jji, last_attendance = 0, 0, None
+    return {"coins": coins, "jji": jji, "last_attendance": last_attendance}
+
+# coins/jji 는 증감량, last_attendance 는 마지막 값만 남긴다
+def _merge_user(old: dict, new: dict) -> dict:
+    return {"coins": old["coins"] + new["coins"], "jji": old["jji"] + new["jji"],
+            "last_attendance": new["last_attendance"] or old["last_attendance"]}
+
+def _apply_user(data: dict, d: dict):
+    data["coins"] += d["coins"]
+    data["jji"] += d["jji"]
+    if d["last_attendance"]:
+        data["last_attendance"] = d["last_attendance"]
+
+def _write_users(conn: sqlite3.Connection, items: dict):
+    conn.executemany("""
+        INSERT INTO users (user_id, coins, jji, last_attendance) VALUES (?,?,?,?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            coins = coins + excluded.coins,
+            jji = jji + excluded.jji,
+            last_attendance = COALESCE(excluded.last_attendance, last_attendance)
+    """, [(uid, d["coins"], d["jji"], d["last_attendance"]) for uid, d in items.items()])
+
+user_writes = WriteBehind(bot_db, _merge_user, _write_users)
+
+def _get_user_data(conn: sqlite3.Connection, user_id: str):
+    data = _load_user_data(conn, user_id)
+    d = user_writes.get(user_id)
+    if d:
+        _apply_user(data, d)
+    return data
+
+# ================= 유저 캐시 =================
+# users 행(coins, jji, last_attendance)을 메모리에 들고 있는 LRU + TTL 캐시.
+# 변경은 캐시된 행과 쓰기 지연 버퍼에 동시에 적용되므로(write-through) DB 와 어긋나지 않는다.
+# 행 하나가 대략 0.5KB 이므로 USER_CACHE_SIZE=20000 이면 10MB 정도를 쓴다.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "5000"))
+# 다른 프로세스가 같은 DB 를 바꿀 수 있으면 오래 들고 있지 않는다 (증감은 DB 에서 합쳐지므로 잔액이 잠깐 늦게 보일 뿐이다)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "5" if MULTI_PROCESS else "600"))  # 초
+
+class UserCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._rows: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, user_id: str) -> dict:
+        entry = self._rows.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            self._rows.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        # 같은 유저를 동시에 불러오면 DB 조회는 한 번만
+        fut = self._loading.get(user_id)
+        if fut is None:
+            fut = asyncio.ensure_future(self._load(user_id))
+            self._loading[user_id] = fut
+        return await asyncio.shield(fut)
+
+    async def _load(self, user_id: str) -> dict:
+        try:
+            row = await bot_db.run(_get_user_data, user_id)
+        finally:
+            del self._loading[user_id]
+        self._rows[user_id] = (time.monotonic() + self.ttl, row)
+        self._rows.move_to_end(user_id)
+        while len(self._rows) > self.maxsize:
+            self._rows.popitem(last=False)
+            self.evictions += 1
+        return row
+
+    def change(self, user_id: str, row: dict, coins: int = 0, jji: int = 0, last_attendance=None):
+        # row 는 get() 으로 받은 행. 확인-변경 사이에 await 가 없으면 원자적으로 처리된다.
+        delta = {"coins": coins, "jji": jji, "last_attendance": last_attendance}
+        _apply_user(row, delta)
+        user_writes.add(user_id, delta)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._rows),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+async def get_user_data(user_id: str):
+    return await user_cache.get(user_id)
+
+async def change_user(user_id: str, coins: int = 0, jji: int = 0, last_attendance=None):
+    user = await user_cache.get(user_id)
+    user_cache.change(user_id, user, coins=coins, jji=jji, last_attendance=last_attendance)
+
+# ================= 상점/인벤토리 =================
+shop_items = {
+    "나무 검": {"가격": 500, "능력치": 10},
+    "돌 검": {"가격": 1000, "능력치": 20},
+    "철 검": {"가격": 1500, "능력치": 30},
+    "금 검": {"가격": 2000, "능력치": 40},
+}
+
+# 인벤토리는 (유저, 아이템)당 한 행에 수량을 저장하고,
+# 전투력은 user_power 에 미리 합산해 두어 구매/드랍 때만 갱신한다.
+def _rebuild_power(conn: sqlite3.Connection):
+    # shop_items 능력치를 바꿨을 때도 이 함수로 다시 계산하면 된다
+    conn.execute("DELETE FROM user_power")
+    conn.executemany("""
+        INSERT INTO user_power (user_id, power)
+        SELECT user_id, SUM(quantity) * ? FROM inventory WHERE item=? GROUP BY user_id
+        ON CONFLICT(user_id) DO UPDATE SET power = power + excluded.power
+    """, [(info["능력치"], item) for item, info in shop_items.items()])
+
+def _add_item_to_inventory(conn: sqlite3.Connection, user_id: str, item: str, quantity: int = 1) -> int:
+    conn.execute("""
+        INSERT INTO inventory (user_id, item, quantity) VALUES (?,?,?)
+        ON CONFLICT(user_id, item) DO UPDATE SET quantity = quantity + excluded.quantity
+    """, (user_id, item, quantity))
+    stat = shop_items[item]["능력치"] if item in shop_items else 0
+    row = conn.execute("""
+        INSERT INTO user_power (user_id, power) VALUES (?,?)
+        ON CONFLICT(user_id) DO UPDATE SET power = power + excluded.power
+        RETURNING power
+    """, (user_id, stat * quantity)).fetchone()
+    return row[0]
+
+async def add_item_to_inventory(user_id: str, item: str, quantity: int = 1) -> int:
+    # 갱신된 전투력을 돌려준다
+    return await bot_db.run(_add_item_to_inventory, user_id, item, quantity)
+
+def _buy_item(conn: sqlite3.Connection, user_id: str, item: str, price: int) -> int:
+    # 코인 차감과 아이템 지급을 한 트랜잭션으로
+    _write_users(conn, {user_id: {"coins": -price, "jji": 0, "last_attendance": None}})
+    return _add_item_to_inventory(conn, user_id, item)
+
+async def buy_item(user_id: str, item: str, price: int) -> bool:
+    # 코인이 부족하면 False. 확인과 차감 사이에 다른 구매가 끼지 않도록 캐시 행은 먼저 줄이고 DB 는 한 번에 기록
+    user = await user_cache.get(user_id)
+    if user["coins"] < price:
+        return False
+    _apply_user(user, {"coins": -price, "jji": 0, "last_attendance": None})
+    try:
+        await bot_db.run(_buy_item, user_id, item, price)
+    except Exception:
+        _apply_user(user, {"coins": price, "jji": 0, "last_attendance": None})
+        raise
+    return True
+
+async def get_inventory(user_id: str) -> List[Tuple[str, int]]:
+    return await bot_db.fetchall("SELECT item, quantity FROM inventory WHERE user_id=? ORDER BY item", (user_id,))
+
+async def get_power(user_id: str) -> int:
+    row = await bot_db.fetchone("SELECT power FROM user_power WHERE user_id=?", (user_id,))
+    return row[0] if row else 0
+
+# ================= 던전 랭킹 DB =================
+def _write_dungeon_results(conn: sqlite3.Connection, items: dict):
+    conn.executemany("""
+        INSERT INTO dungeon_stats (user_id, dungeon_name, clears, fails, coins) VALUES (?,?,?,?,?)
+        ON CONFLICT(user_id, dungeon_name) DO UPDATE SET
+            clears = clears + excluded.clears,
+            fails = fails + excluded.fails,
+            coins = COALESCE(coins, 0) + excluded.coins
+    """, [(uid, name, d["clears"], d["fails"], d["coins"]) for (uid, name), d in items.items()])
+    totals = {}
+    for (uid, _), d in items.items():
+        totals[uid] = _sum_merge(totals[uid], d) if uid in totals else d
+    conn.executemany("""
+        INSERT INTO dungeon_totals (user_id, clears, fails, coins) VALUES (?,?,?,?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            clears = clears + excluded.clears,
+            fails = fails + excluded.fails,
+            coins = coins + excluded.coins
+    """, [(uid, d["clears"], d["fails"], d["coins"]) for uid, d in totals.items()])
+
+dungeon_writes = WriteBehind(bot_db, _sum_merge, _write_dungeon_results)
+
+def _update_dungeon_result(conn: sqlite3.Connection, user_id:str, dungeon_name:str, success:bool, coins:int=0):
+    delta = {"clears": 1, "fails": 0, "coins": coins} if success else {"clears": 0, "fails": 1, "coins": 0}
+    dungeon_writes.push(conn, (user_id, dungeon_name), delta)
+
+async def update_dungeon_result(user_id:str, dungeon_name:str, success:bool, coins:int=0):
+    await bot_db.run(_update_dungeon_result, user_id, dungeon_name, success, coins)
+
+def _record_dungeon_clear(conn: sqlite3.Connection, user_id: str, dungeon_name: str, coins: int, drop_item: Optional[str]):
+    # 보상 코인, 드랍 아이템, 클리어 기록을 한 트랜잭션으로 (중간에 실패하면 셋 다 없던 일)
+    _write_users(conn, {user_id: {"coins": coins, "jji": 0, "last_attendance": None}})
+    if drop_item:
+        _add_item_to_inventory(conn, user_id, drop_item)
+    _write_dungeon_results(conn, {(user_id, dungeon_name): {"clears": 1, "fails": 0, "coins": coins}})
+
+async def record_dungeon_clear(user_id: str, dungeon_name: str, coins: int, drop_item: Optional[str]):
+    user = await user_cache.get(user_id)
+    await bot_db.run(_record_dungeon_clear, user_id, dungeon_name, coins, drop_item)
+    # DB 에는 이미 반영됐으므로 캐시된 행만 맞춘다
+    _apply_user(user, {"coins": coins, "jji": 0, "last_attendance": None})
+
+# 던전 랭킹: 보여줄 페이지와 내 순위만 인덱스로 조회한다.
+# dungeon_name 이 None 이면 전체(dungeon_totals) 랭킹. 순위는 동점자가 같은 순위를 갖는 방식.
+def _dungeon_ranking(conn: sqlite3.Connection, dungeon_name: Optional[str], order_by: str, user_id: str,
+                     offset: int, limit: int):
+    # order_by 는 "clears"/"coins" 중 하나만 들어온다 (SQL 에 그대로 들어감)
+    bot_db._flush(conn)  # 아직 기록되지 않은 결과까지 반영
+    if dungeon_name is None:
+        table, where, params = "dungeon_totals", "1=1", ()
+    else:
+        table, where, params = "dungeon_stats", "dungeon_name=?", (dungeon_name,)
+    rows = conn.execute(
+        f"SELECT user_id, clears, fails, coins FROM {table} WHERE {where} ORDER BY {order_by} DESC LIMIT ? OFFSET ?",
+        params + (limit, offset),
+    ).fetchall()
+
+    def rank_of(value) -> int:
+        return conn.execute(f"SELECT COUNT(*) + 1 FROM {table} WHERE {where} AND {order_by} > ?", params + (value,)).fetchone()[0]
+
+    col = 1 if order_by == "clears" else 3
+    page = []
+    for i, row in enumerate(rows):
+        if i == 0:
+            rank = rank_of(row[col])
+        elif row[col] != rows[i - 1][col]:
+            rank = offset + i + 1
+        page.append((rank,) + tuple(row))
+
+    mine = conn.execute(
+        f"SELECT user_id, clears, fails, coins FROM {table} WHERE {where} AND user_id=?", params + (user_id,)
+    ).fetchone()
+    if mine:
+        mine = (rank_of(mine[col]),) + tuple(mine)
+    return page, mine
+
+async def get_dungeon_ranking(dungeon_name: Optional[str], order_by: str, user_id: str, offset: int = 0, limit: int = 10):
+    return await bot_db.run(_dungeon_ranking, dungeon_name, order_by, user_id, offset, limit)
+
+# ================= 유저 이름 조회 =================
+# 게이트웨이 캐시 → TTL 캐시 → REST 순으로 찾고, REST 조회는 동시에 보내되 개수를 제한한다.
+NAME_CACHE_TTL = 3600        # 초
+NAME_CACHE_MAX = 10000
+NAME_FETCH_CONCURRENCY = 10     # 랭킹 한 페이지(10명)를 한 번에
+
+_name_cache = {}             # user_id -> (만료 시각, 이름)
+_name_fetches = {}           # user_id -> 진행 중인 조회 Task
+_name_fetch_sem = asyncio.Semaphore(NAME_FETCH_CONCURRENCY)
+
+async def _fetch_user_name(user_id: int) -> str:
+    async with _name_fetch_sem:
+        try:
+            name = (await bot.fetch_user(user_id)).name
+        except discord.NotFound:
+            name = f"(탈퇴한 유저 {user_id})"
+        except discord.HTTPException:
+            return str(user_id)  # 일시적 오류는 캐시하지 않음
+    if len(_name_cache) >= NAME_CACHE_MAX:
+        now = time.monotonic()
+        for uid in [uid for uid, (exp, _) in _name_cache.items() if exp <= now]:
+            del _name_cache[uid]
+        if len(_name_cache) >= NAME_CACHE_MAX:
+            _name_cache.clear()
+    _name_cache[user_id] = (time.monotonic() + NAME_CACHE_TTL, name)
+    return name
+
+async def resolve_user_names(user_ids: List[int]) -> dict:
+    names = {}
+    waits = {}
+    now = time.monotonic()
+    for uid in user_ids:
+        user = bot.get_user(uid)
+        if user:
+            names[uid] = user.name
+            continue
+        cached = _name_cache.get(uid)
+        if cached and cached[0] > now:
+            names[uid] = cached[1]
+            continue
+        # 여러 랭킹 명령이 같은 유저를 동시에 찾으면 REST 호출은 한 번만
+        task = _name_fetches.get(uid)
+        if task is None:
+            task = asyncio.ensure_future(_fetch_user_name(uid))
+            _name_fetches[uid] = task
+            task.add_done_callback(lambda _, uid=uid: _name_fetches.pop(uid, None))
+        waits[uid] = task
+    if waits:
+        results = await asyncio.gather(*waits.values())
+        names.update(zip(waits.keys(), results))
+    return names
+
+# ================= 이벤트 루프 감시 =================
+# LOOP_WATCHDOG=1 이면 루프가 WATCHDOG_BEAT 마다 심장박동을 남기고, 별도 스레드가 이를 지켜본다.
+# 박동이 LOOP_BLOCK_THRESHOLD 초 넘게 끊기면 그 순간 루프 스레드의 스택을 떠서
+# 실행 중이던 태스크/명령어 이름과 함께 출력한다. 막힌 구간마다 한 번만 보고한다.
+LOOP_WATCHDOG = os.getenv("LOOP_WATCHDOG", "0") == "1"
+LOOP_BLOCK_THRESHOLD = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.25"))
+WATCHDOG_BEAT = 0.05
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = LOOP_BLOCK_THRESHOLD):
+        self.threshold = threshold
+        self.blocks = 0
+        self.longest = 0.0
+        self._beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._stop = threading.Event()
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        # 루프 스레드에서 호출해야 한다
+        self._loop = loop
+        self._thread_id = threading.get_ident()
+        self._tick()
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _tick(self):
+        self._beat = time.monotonic()
+        if not self._stop.is_set():
+            self._loop.call_later(WATCHDOG_BEAT, self._tick)
+
+    def _where(self) -> str:
+        task = asyncio.current_task(self._loop)
+        if task is None:
+            return "콜백"
+        handler = handler_tasks.get(task)
+        return f"{task.get_name()} / {handler}" if handler else task.get_name()
+
+    def _watch(self):
+        reported = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or reported == beat:
+                continue
+            reported = beat
+            frame = sys._current_frames().get(self._thread_id)
+            where = self._where()
+            stack = "".join(traceback.format_stack(frame)) if frame else "(스택 없음)\n"
+            self.blocks += 1
+            print(f"⚠️ 이벤트 루프가 {stalled:.2f}초 넘게 막힘 [{where}]\n{stack}", end="", file=sys.stderr)
+            # 풀릴 때까지 기다렸다가 실제로 막힌 시간을 남긴다
+            while self._beat == beat and not self._stop.wait(WATCHDOG_BEAT):
+                pass
+            total = self._beat - beat
+            self.longest = max(self.longest, total)
+            print(f"⚠️ 이벤트 루프 막힘 해소: {total:.2f}초 [{where}]", file=sys.stderr)
+
+watchdog = LoopWatchdog()
+
+
+# ================= 상태/메트릭 HTTP =================
+# 봇과 같은 이벤트 루프에서 도는 aiohttp 서버. 별도 스레드 없이 봇 상태를 그대로 읽는다.
+#   /         호스팅 keep-alive 용 ("Bot is running!")
+#   /health   JSON 상태 (준비 전에는 503)
+#   /metrics  Prometheus 텍스트 형식
+HTTP_PORT = int(os.getenv("PORT", "8080"))
+LOOP_LAG_INTERVAL = 1.0
+LOOP_LAG_SAMPLES = 60
+
+started_at = time.time()
+loop_lag = deque(maxlen=LOOP_LAG_SAMPLES)  # 최근 sleep 지연(초)
+command_calls: Dict[str, int] = {}
+command_completions: Dict[str, int] = {}
+
+async def loop_lag_sampler():
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        loop_lag.append(max(0.0, loop.time() - t0 - LOOP_LAG_INTERVAL))
+
+def _count(table: Dict[str, int], name: str):
+    table[name] = table.get(name, 0) + 1
+
+# 접두사 명령어는 on_command, 슬래시(하이브리드 포함)는 상호작용 쪽에서 한 번씩만 센다.
+# on_command_error 리스너를 달면 기본 오류 출력이 꺼지므로 실패 수는 호출-완료 차이로 본다.
+async def _on_command(ctx: commands.Context):
+    if ctx.interaction is None and ctx.command:
+        _count(command_calls, ctx.command.qualified_name)
+
+async def _on_command_completion(ctx: commands.Context):
+    if ctx.interaction is None and ctx.command:
+        _count(command_completions, ctx.command.qualified_name)
+
+async def _on_interaction(interaction: discord.Interaction):
+    if interaction.type is discord.InteractionType.application_command and interaction.command:
+        _count(command_calls, interaction.command.qualified_name)
+
+async def _on_app_command_completion(interaction: discord.Interaction, command):
+    _count(command_completions, command.qualified_name)
+
+bot.add_listener(_on_command, 'on_command')
+bot.add_listener(_on_command_completion, 'on_command_completion')
+bot.add_listener(_on_interaction, 'on_interaction')
+bot.add_listener(_on_app_command_completion, 'on_app_command_completion')
+
+def _latency() -> Optional[float]:
+    return bot.latency if math.isfinite(bot.latency) else None
+
+def _shard_latencies() -> Dict[int, Optional[float]]:
+    if not isinstance(bot, commands.AutoShardedBot):
+        return {}
+    return {sid: lat if math.isfinite(lat) else None for sid, lat in bot.latencies}
+
+def _db_stats() -> dict:
+    return {os.path.basename(bot_db.path): {"queued": bot_db.queued, "pending_writes": bot_db.pending_count()}}
+
+def health_snapshot() -> dict:
+    return {
+        "status": "ok" if bot.is_ready() and not bot.is_closed() else "starting",
+        "uptime": round(time.time() - started_at, 1),
+        "latency": _latency(),
+        "shards": _shard_latencies(),
+        "loop_lag": loop_lag[-1] if loop_lag else None,
+        "loop_lag_max": max(loop_lag) if loop_lag else None,
+        "guilds": len(bot.guilds),
+        "users": len(bot.users),
+        "timers": timers.stats(),
+        "loop_blocks": watchdog.blocks,
+        "db": _db_stats(),
+        "user_cache": user_cache.stats(),
+        "journal": state_journal.stats(),
+    }
+
+def render_metrics() -> str:
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{_prom_label(str(v))}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    latency = _latency()
+    metric("bot_up", "gauge", "1 when the gateway session is ready", [({}, int(bot.is_ready()))])
+    metric("bot_uptime_seconds", "gauge", "Seconds since process start", [({}, round(time.time() - started_at, 1))])
+    metric("bot_gateway_latency_seconds", "gauge", "Gateway heartbeat latency", [({}, latency if latency is not None else "NaN")])
+    metric("bot_shard_latency_seconds", "gauge", "Gateway heartbeat latency per shard",
+           [({"shard": sid}, lat if lat is not None else "NaN") for sid, lat in _shard_latencies().items()])
+    metric("bot_event_loop_lag_seconds", "gauge", "Last event loop lag sample", [({}, loop_lag[-1] if loop_lag else 0)])
+    metric("bot_event_loop_lag_max_seconds", "gauge", f"Max event loop lag over the last {LOOP_LAG_SAMPLES} samples",
+           [({}, max(loop_lag) if loop_lag else 0)])
+    metric("bot_guilds", "gauge", "Guilds in cache", [({}, len(bot.guilds))])
+    metric("bot_users", "gauge", "Users in cache", [({}, len(bot.users))])
+    metric("bot_members", "gauge", "Members in cache per guild", [({"guild": g.id}, len(g.members)) for g in bot.guilds])
+    st = timers.stats()
+    metric("bot_timers_pending", "gauge", "Timers waiting on the timer wheel", [({}, st["pending"])])
+    metric("bot_timers_fired_total", "counter", "Timers fired", [({}, st["fired"])])
+    metric("bot_timers_cancelled_total", "counter", "Timers cancelled", [({}, st["cancelled"])])
+    dbs = _db_stats()
+    metric("bot_db_queue_depth", "gauge", "Jobs queued on the DB worker thread", [({"db": k}, v["queued"]) for k, v in dbs.items()])
+    metric("bot_db_pending_writes", "gauge", "Buffered write-behind rows", [({"db": k}, v["pending_writes"]) for k, v in dbs.items()])
+    uc = user_cache.stats()
+    metric("bot_user_cache_size", "gauge", "Entries in the user cache", [({}, uc["size"])])
+    metric("bot_user_cache_hits_total", "counter", "User cache hits", [({}, uc["hits"])])
+    metric("bot_user_cache_misses_total", "counter", "User cache misses", [({}, uc["misses"])])
+    js = state_journal.stats()
+    metric("bot_journal_live_entries", "gauge", "In-flight game states kept in the state journal", [({}, js["live"])])
+    metric("bot_journal_writes_total", "counter", "Records appended to the state journal", [({}, js["writes"])])
+    metric("bot_loop_blocks_total", "counter", "Event loop stalls caught by the watchdog", [({}, watchdog.blocks)])
+    metric("bot_loop_block_longest_seconds", "gauge", "Longest stall caught by the watchdog", [({}, round(watchdog.longest, 3))])
+    metric("bot_command_calls_total", "counter", "Command invocations", [({"command": k}, v) for k, v in sorted(command_calls.items())])
+    metric("bot_command_completions_total", "counter", "Commands that finished without error",
+           [({"command": k}, v) for k, v in sorted(command_completions.items())])
+    for hist in HISTOGRAMS:
+        lines.extend(hist.render())
+    return "\n".join(lines) + "\n"
+
+async def _http_home(request: web.Request):
+    return web.Response(text="Bot is running!")
+
+async def _http_health(request: web.Request):
+    snap = health_snapshot()
+    return web.json_response(snap, status=200 if snap["status"] == "ok" else 503)
+
+async def _http_metrics(request: web.Request):
+    return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+http_runner: Optional[web.AppRunner] = None
+
+async def start_http_server():
+    global http_runner
+    app = web.Application()
+    app.router.add_get("/", _http_home)
+    app.router.add_get("/health", _http_health)
+    app.router.add_get("/metrics", _http_metrics)
+    http_runner = web.AppRunner(app, access_log=None)
+    await http_runner.setup()
+    await web.TCPSite(http_runner, "0.0.0.0", HTTP_PORT).start()
+
+
+# ---- 슬래시 명령어 동기화 ---
+# 전역 동기화는 느리고 레이트 리밋이 빡빡하므로 명령어 트리를 해시해 두고, 마지막으로 성공한 동기화와 같으면 건너뛴다.
+# 재연결마다 불리는 on_ready 가 아니라 setup_hook 에서 프로세스당 한 번만 확인한다.
+# 디스코드 쪽 명령어를 다른 경로로 바꿨다면 FORCE_COMMAND_SYNC=1 로 한 번 강제로 동기화한다.
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC") == "1"
+
+def command_tree_hash() -> str:
+    payload = sorted((c.to_dict() for c in bot.tree.get_commands()), key=lambda d: (d.get("type", 1), d["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+async def sync_commands(force: bool = False):
+    key = f"command_tree_hash:{bot.application_id}"  # 토큰(앱)이 바뀌면 다시 동기화
+    digest = command_tree_hash()
+    row = await bot_db.fetchone("SELECT value FROM bot_meta WHERE key=?", (key,))
+    if row and row[0] == digest and not force:
+        print("🔄 슬래시 명령어 변경 없음, 동기화 생략")
+        return
+    try:
+        synced = await bot.tree.sync()
+    except Exception as e:
+        print(f"⚠️ 동기화 실패: {e}")
+        return
+    await bot_db.execute(
+        "INSERT INTO bot_meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, digest))
+    print(f"🔄 {len(synced)}개의 슬래시 명령어 동기화됨")
+
+
+# ================= 확장 =================
+# 기능은 cogs/ 아래 확장으로 나눠 setup_hook 에서 불러오고, 무거운 라이브러리(Pillow 등)는 각 확장이 처음 쓸 때 불러온다.
+# 봇 소유자는 !reload <이름|all> 로 프로세스를 재시작하지 않고 확장을 다시 불러올 수 있다 (이 프로세스에만 적용).
+# 떼어 낼 때 명령어/리스너는 discord.py 가 모듈 이름으로 지워 준다. 진행 중인 게임은 이전 모듈의 코드로 끝까지 돌고,
+# 새 모듈과 같이 봐야 하는 상태(채널별 진행 중인 게임 등)는 shared_state() 로 여기에 둔다.
+EXTENSIONS = (
+    "cogs.general",
+    "cogs.moderation",
+    "cogs.rps",
+    "cogs.typing_game",
+    "cogs.math_game",
+    "cogs.video_challenge",
+    "cogs.economy",
+)
+
+_shared_state: Dict[str, object] = {}
+
+def shared_state(key: str, factory: Callable = dict):
+    if key not in _shared_state:
+        _shared_state[key] = factory()
+    return _shared_state[key]
+
+def register_commands(bot: commands.Bot, namespace: dict):
+    # 확장의 setup() 에서 globals() 를 넘기면 그 모듈에 정의된 명령어만 봇/트리에 붙인다
+    module = namespace["__name__"]
+    for obj in list(namespace.values()):
+        if isinstance(obj, commands.Command) and obj.parent is None and obj.module == module:
+            bot.add_command(obj)  # 하이브리드 명령어는 슬래시 쪽도 같이 등록된다
+        elif isinstance(obj, (app_commands.Command, app_commands.Group)) and obj.parent is None and obj.module == module:
+            bot.tree.add_command(obj)
+
+async def load_extensions():
+    for name in EXTENSIONS:
+        await bot.load_extension(name)
+
+@bot.command(name="reload")
+@commands.is_owner()
+@timed("reload")
+async def reload_extensions(ctx: commands.Context, name: str):
+    targets = EXTENSIONS if name == "all" else (name if name.startswith("cogs.") else f"cogs.{name}",)
+    for ext in targets:
+        try:
+            await bot.reload_extension(ext)
+        except commands.ExtensionError as e:
+            return await ctx.send(f"❌ {ext}: {e}")
+    await ctx.send(f"🔁 다시 불러옴: {', '.join(targets)}")
+    if SYNC_COMMANDS:
+        await sync_commands()  # 슬래시 명령어가 바뀐 경우에만 실제로 동기화된다
+
+
+# ---- 실행 ---
+flush_task: Optional[asyncio.Task] = None
+
+@bot.event
+async def setup_hook():
+    global flush_task
+    # 리더보드를 메모리에 올려야 하므로 스키마 준비는 로그인 전에 한 번만
+    await init_db()
+    state_journal.load()  # 확장의 setup() 이 이전 프로세스의 진행 중 게임을 이어받는다
+    await load_extensions()
+    await load_leaderboards()
+    flush_task = bot.loop.create_task(flush_loop())
+    bot.loop.create_task(loop_lag_sampler())
+    if MULTI_PROCESS:
+        bot.loop.create_task(leaderboard_refresh_loop())
+    if LOOP_WATCHDOG:
+        watchdog.start(asyncio.get_running_loop())
+    await start_http_server()
+    if SYNC_COMMANDS:
+        bot.loop.create_task(sync_commands(FORCE_COMMAND_SYNC))
+    # 호스팅 환경의 SIGTERM 에도 close() 를 거쳐 남은 기록을 flush 하도록
+    try:
+        bot.loop.add_signal_handler(signal.SIGTERM, lambda: bot.loop.create_task(bot.close()))
+    except (NotImplementedError, RuntimeError):
+        pass
+
+@bot.event
+async def on_ready():
+    # 재연결 때마다 다시 불리므로 여기서는 API 호출이나 초기화를 하지 않는다
+    print(f"✅ 로그인 완료: {bot.user}" + (f" (샤드 {bot.shard_ids} / {bot.shard_count})" if bot.shard_count else ""))
+
+
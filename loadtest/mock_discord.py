@@ -0,0 +1,442 @@
+# 부하 테스트용 가짜 디스코드. 게이트웨이(zlib-stream 웹소켓)와 봇이 쓰는 REST 엔드포인트만 흉내 낸다.
+# 봇은 DISCORD_API_BASE / DISCORD_GATEWAY_URL 환경변수로 여기에 붙는다.
+#
+# 봇이 보낸 메시지/상호작용 응답은 이벤트로 흘려보낸다. 부하 생성기는 wait_for() 로 채널 또는
+# 상호작용 토큰 단위로 원하는 응답을 기다리며 지연을 재고, listen() 으로 계속 지켜볼 수도 있다.
+# 버튼 클릭에 원본 메시지가 필요하므로 최근 메시지는 메모리에 남겨 둔다.
+# 채널 메시지 전송에는 디스코드처럼 채널별 고정 창 레이트 리밋을 걸 수 있다 (429 + X-RateLimit-* 헤더).
+import asyncio
+import json
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aiohttp import WSMsgType, web
+
+DISCORD_EPOCH = 1420070400000
+API_PREFIX = "/api/v10"
+HEARTBEAT_INTERVAL = 41250
+
+_increment = count()
+
+
+def snowflake() -> str:
+    return str(((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | (next(_increment) & 0x3FFFFF))
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def user_payload(user_id: str, name: str, bot: bool = False) -> dict:
+    return {"id": user_id, "username": name, "global_name": None, "discriminator": "0", "avatar": None, "bot": bot}
+
+
+class MockDiscord:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *,
+                 message_limit: Optional[Tuple[int, float]] = (5, 5.0), rest_latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.message_limit = message_limit  # (횟수, 초) 채널별. None 이면 제한 없음
+        self.rest_latency = rest_latency    # REST 응답마다 더할 지연(초), 실제 왕복 시간 흉내
+
+        self.app_id = snowflake()
+        self.bot_user = user_payload(self.app_id, "bench-bot", bot=True)
+        self.guild_id = snowflake()
+        self.channels: Dict[str, dict] = {}
+        self.roles: Dict[str, dict] = {}
+        self.members: Dict[str, dict] = {}
+        self.messages: Dict[str, dict] = {}
+        self.add_role("@everyone", role_id=self.guild_id)
+
+        self.sessions: List["GatewaySession"] = []
+        self.ready = asyncio.Event()
+        self.seq = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._buckets: Dict[str, List[float]] = {}
+        self._waiters: Dict[tuple, list] = {}
+        self._listeners: Dict[tuple, list] = {}
+        self._token_channel: Dict[str, str] = {}  # 상호작용 토큰 -> 채널 (응답 메시지의 채널을 채우기 위해)
+
+        self.rest_calls: Counter = Counter()
+        self.rate_limited = 0
+        self.events_sent: Counter = Counter()
+
+    # ---- 길드 구성 ----
+    def add_channel(self, name: str, channel_id: str = None) -> str:
+        channel_id = str(channel_id or snowflake())
+        self.channels[channel_id] = {"id": channel_id, "type": 0, "guild_id": self.guild_id, "name": name,
+                                     "position": len(self.channels), "permission_overwrites": [], "nsfw": False}
+        return channel_id
+
+    def add_role(self, name: str, role_id: str = None) -> dict:
+        role_id = str(role_id or snowflake())
+        role = {"id": role_id, "name": name, "color": 0, "hoist": False, "position": len(self.roles),
+                "permissions": "0", "managed": False, "mentionable": False}
+        self.roles[role_id] = role
+        return role
+
+    def new_member(self, name: str = None) -> dict:
+        user_id = snowflake()
+        return {"user": user_payload(user_id, name or f"user{user_id[-6:]}"), "roles": [], "joined_at": now_iso(),
+                "deaf": False, "mute": False, "flags": 0}
+
+    def add_member(self, name: str = None) -> dict:
+        member = self.new_member(name)
+        self.members[member["user"]["id"]] = member
+        return member
+
+    def guild_payload(self) -> dict:
+        me = {"user": self.bot_user, "roles": [], "joined_at": now_iso(), "deaf": False, "mute": False, "flags": 0}
+        return {
+            "id": self.guild_id, "name": "loadtest", "owner_id": self.app_id, "unavailable": False, "large": False,
+            "member_count": len(self.members) + 1, "features": [], "emojis": [], "stickers": [], "threads": [],
+            "voice_states": [], "presences": [], "stage_instances": [], "guild_scheduled_events": [],
+            "premium_tier": 0, "preferred_locale": "ko", "verification_level": 0, "afk_timeout": 300,
+            "roles": list(self.roles.values()), "channels": list(self.channels.values()),
+            "members": [me] + list(self.members.values()), "joined_at": now_iso(),
+        }
+
+    # ---- 서버 수명 ----
+    async def start(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/gateway", self._gateway)
+        app.router.add_route("*", API_PREFIX + "/{path:.*}", self._rest)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        for s in list(self.sessions):
+            await s.ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    @property
+    def api_base(self) -> str:
+        return f"http://{self.host}:{self.port}{API_PREFIX}"
+
+    @property
+    def gateway_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/gateway"
+
+    # ---- 응답 대기 ----
+    def wait_for(self, key: tuple, predicate: Callable[[dict], bool] = None, timeout: float = 30.0):
+        # key: ("channel", channel_id) 또는 ("token", interaction_token)
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append((predicate, fut))
+        return asyncio.wait_for(fut, timeout)
+
+    def listen(self, key: tuple, callback: Callable[[dict], None]) -> Callable[[], None]:
+        self._listeners.setdefault(key, []).append(callback)
+        return lambda: self._listeners[key].remove(callback)
+
+    def _emit(self, keys, event: dict):
+        event["t"] = time.perf_counter()
+        for key in keys:
+            for callback in self._listeners.get(key, ()):
+                callback(event)
+            waiters = self._waiters.get(key)
+            if not waiters:
+                continue
+            for item in list(waiters):
+                predicate, fut = item
+                if fut.done():
+                    waiters.remove(item)
+                elif predicate is None or predicate(event):
+                    waiters.remove(item)
+                    fut.set_result(event)
+            if not waiters:
+                del self._waiters[key]
+
+    # ---- 게이트웨이 ----
+    async def _gateway(self, request: web.Request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        session = GatewaySession(self, ws, request.query.get("compress") == "zlib-stream")
+        await session.run()
+        return ws
+
+    async def dispatch(self, event: str, data: dict):
+        # 길드 이벤트는 guild_id 로 샤드를 골라 보낸다
+        self.seq += 1
+        self.events_sent[event] += 1
+        for s in self.sessions:
+            if s.owns(data.get("guild_id")):
+                await s.send({"op": 0, "t": event, "s": self.seq, "d": data})
+
+    # ---- 이벤트 만들기 ----
+    def message_create(self, member: dict, channel_id: str, content: str) -> dict:
+        data = {
+            "id": snowflake(), "channel_id": channel_id, "guild_id": self.guild_id, "author": member["user"],
+            "member": {k: v for k, v in member.items() if k != "user"}, "content": content, "timestamp": now_iso(),
+            "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+            "attachments": [], "embeds": [], "pinned": False, "type": 0,
+        }
+        return data
+
+    def _interaction(self, itype: int, member: dict, channel_id: str, data: dict, message: dict = None) -> dict:
+        payload = {
+            "id": snowflake(), "application_id": self.app_id, "type": itype, "data": data, "token": snowflake() + "tok",
+            "version": 1, "guild_id": self.guild_id, "channel_id": channel_id,
+            "channel": {"id": channel_id, "type": 0}, "member": dict(member, permissions="8"),
+            "app_permissions": "8", "locale": "ko", "guild_locale": "ko",
+        }
+        self._token_channel[payload["token"]] = channel_id
+        if message is not None:
+            payload["message"] = message
+        return payload
+
+    def slash(self, member: dict, channel_id: str, name: str, options: list = (), resolved: dict = None) -> dict:
+        data = {"id": snowflake(), "name": name, "type": 1, "options": list(options)}
+        if resolved:
+            data["resolved"] = resolved
+        return self._interaction(2, member, channel_id, data)
+
+    def click(self, member: dict, message: dict, custom_id: str) -> dict:
+        data = {"custom_id": custom_id, "component_type": 2}
+        return self._interaction(3, member, message["channel_id"], data, message)
+
+    # ---- REST ----
+    async def _rest(self, request: web.Request):
+        path = request.match_info["path"]
+        parts = path.split("/")
+        route = f"{request.method} {_route_template(parts)}"
+        self.rest_calls[route] += 1
+        if self.rest_latency:
+            await asyncio.sleep(self.rest_latency)
+        body, files = await _read_body(request)
+
+        if request.method == "POST" and len(parts) == 3 and parts[0] == "channels" and parts[2] == "messages":
+            limited = self._take(f"msg:{parts[1]}")
+            if limited:
+                return limited
+            msg = self._store_message(parts[1], body, files)
+            self._emit([("channel", parts[1])], {"kind": "message", "channel_id": parts[1], "message": msg})
+            return self._json(msg, headers=self._bucket_headers(f"msg:{parts[1]}"))
+
+        if parts[0] == "interactions" and parts[-1] == "callback":
+            token = parts[2]
+            message = None
+            if body.get("type") in (4, 7) and body.get("data") is not None:
+                data = body["data"]
+                if body["type"] == 4:
+                    message = self._store_message(self._token_channel.get(token), data, files,
+                                                  interaction={"id": parts[1], "type": 2, "name": "", "user": self.bot_user},
+                                                  token=token)
+                else:
+                    message = self._edit_by_token(token, data)
+            self._emit([("token", token)], {"kind": "callback", "type": body.get("type"), "body": body, "message": message})
+            return web.Response(status=204)
+
+        if parts[0] == "webhooks" and len(parts) >= 3:
+            token = parts[2]
+            if request.method == "POST" and len(parts) == 3:
+                msg = self._store_message(self._token_channel.get(token), body, files, token=token)
+                self._emit([("token", token)], {"kind": "followup", "message": msg})
+                return self._json(msg)
+            if request.method == "PATCH":
+                msg = self._edit_by_token(token, body, parts[-1])
+                self._emit([("token", token)], {"kind": "edit", "message": msg})
+                return self._json(msg)
+            if request.method == "GET":
+                return self._json(self.messages.get(self._token_message(token, parts[-1])) or {})
+            return web.Response(status=204)
+
+        if parts[0] == "channels" and len(parts) == 4 and parts[2] == "messages" and request.method == "PATCH":
+            msg = self.messages.get(parts[3]) or self._store_message(parts[1], {}, [])
+            msg.update({k: v for k, v in body.items() if k in ("content", "embeds", "components")})
+            return self._json(msg)
+
+        if parts[:3] == ["oauth2", "applications", "@me"]:
+            return self._json({"id": self.app_id, "name": "loadtest", "description": "", "icon": None,
+                               "bot_public": False, "bot_require_code_grant": False, "verify_key": "",
+                               "owner": self.bot_user, "flags": 0, "rpc_origins": [], "summary": ""})
+        if parts[:1] == ["users"] and parts[1] == "@me":
+            return self._json(self.bot_user)
+        if parts[:1] == ["users"]:
+            member = self.members.get(parts[1])
+            return self._json(member["user"] if member else user_payload(parts[1], f"user{parts[1][-6:]}"))
+        if parts[0] == "gateway":
+            return self._json({"url": f"ws://{self.host}:{self.port}/gateway", "shards": 1,
+                               "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0,
+                                                       "max_concurrency": 16}})
+        if parts[0] == "applications" and parts[-1] == "commands":
+            cmds = body if isinstance(body, list) else []
+            return self._json([dict(c, id=snowflake(), application_id=self.app_id, version=snowflake()) for c in cmds])
+        if parts[0] == "guilds" and parts[2:3] == ["roles"] and request.method == "POST":
+            return self._json(self.add_role(body.get("name", "role")))
+        if parts[0] == "guilds" and parts[2:3] == ["members"] and len(parts) == 4:
+            member = self.members.get(parts[3]) or self.new_member()
+            if "roles" in body:
+                member["roles"] = [str(r) for r in body["roles"]]
+            return self._json(member)
+        if request.method == "GET":
+            return self._json({})
+        return web.Response(status=204)
+
+    def _json(self, data, headers=None, status=200):
+        # discord.py 는 Content-Type 이 정확히 application/json 일 때만 본문을 JSON 으로 읽는다
+        return web.Response(body=json.dumps(data).encode(), status=status,
+                            headers={**(headers or {}), "Content-Type": "application/json"})
+
+    def _store_message(self, channel_id, body: dict, files: list, interaction: dict = None, token: str = None) -> dict:
+        msg_id = snowflake()
+        msg = {
+            "id": msg_id, "channel_id": channel_id or body.get("channel_id") or "", "guild_id": self.guild_id,
+            "author": self.bot_user, "content": body.get("content") or "", "embeds": body.get("embeds") or [],
+            "components": body.get("components") or [], "timestamp": now_iso(), "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [], "pinned": False, "type": 0,
+            "attachments": [{"id": snowflake(), "filename": f, "size": 0, "url": f"https://cdn.invalid/{msg_id}/{f}",
+                             "proxy_url": f"https://cdn.invalid/{msg_id}/{f}"} for f in files],
+        }
+        if interaction:
+            msg["interaction"] = interaction
+        if token:
+            msg["_token"] = token
+        self.messages[msg_id] = msg
+        if len(self.messages) > 50000:  # 오래된 메시지부터 버린다
+            for key in list(self.messages)[:10000]:
+                del self.messages[key]
+        return msg
+
+    def _token_message(self, token: str, which: str = "@original") -> Optional[str]:
+        if which != "@original":
+            return which
+        for msg_id in reversed(self.messages):
+            if self.messages[msg_id].get("_token") == token and "interaction" in self.messages[msg_id]:
+                return msg_id
+        return None
+
+    def _edit_by_token(self, token: str, body: dict, which: str = "@original") -> dict:
+        msg = self.messages.get(self._token_message(token, which) or "")
+        if msg is None:
+            msg = self._store_message(self._token_channel.get(token), {}, [], token=token)
+        for key in ("content", "embeds", "components"):
+            if key in body and body[key] is not None:
+                msg[key] = body[key]
+        return msg
+
+    # ---- 레이트 리밋 ----
+    def _take(self, bucket: str) -> Optional[web.Response]:
+        if not self.message_limit:
+            return None
+        limit, per = self.message_limit
+        now = time.monotonic()
+        window = self._buckets.get(bucket)
+        if window is None or now >= window[0] + per:
+            window = self._buckets[bucket] = [now, 0]
+        if window[1] >= limit:
+            self.rate_limited += 1
+            retry = round(window[0] + per - now, 3)
+            headers = self._bucket_headers(bucket)
+            headers["Retry-After"] = str(max(1, int(retry + 0.999)))
+            headers["X-RateLimit-Scope"] = "user"
+            return self._json({"message": "You are being rate limited.", "retry_after": retry, "global": False},
+                              headers=headers, status=429)
+        window[1] += 1
+        return None
+
+    def _bucket_headers(self, bucket: str) -> dict:
+        if not self.message_limit:
+            return {}
+        limit, per = self.message_limit
+        start, used = self._buckets.get(bucket, (time.monotonic(), 0))
+        reset_after = max(0.0, start + per - time.monotonic())
+        return {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(max(0, limit - used)),
+                "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}", "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                "X-RateLimit-Bucket": bucket}
+
+
+class GatewaySession:
+    def __init__(self, mock: MockDiscord, ws: web.WebSocketResponse, compress: bool):
+        self.mock = mock
+        self.ws = ws
+        self.shard = (0, 1)
+        self._zlib = zlib.compressobj() if compress else None
+        self._lock = asyncio.Lock()
+
+    def owns(self, guild_id) -> bool:
+        if guild_id is None:
+            return True
+        shard_id, shard_count = self.shard
+        return (int(guild_id) >> 22) % shard_count == shard_id
+
+    async def send(self, payload: dict):
+        data = json.dumps(payload).encode()
+        async with self._lock:  # zlib 스트림은 순서가 섞이면 깨진다
+            if self.ws.closed:
+                return
+            if self._zlib:
+                await self.ws.send_bytes(self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH))
+            else:
+                await self.ws.send_str(data.decode())
+
+    async def run(self):
+        await self.send({"op": 10, "d": {"heartbeat_interval": HEARTBEAT_INTERVAL}})
+        try:
+            async for msg in self.ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                op = payload.get("op")
+                if op == 1:
+                    await self.send({"op": 11})
+                elif op == 2:
+                    await self._identify(payload["d"])
+                elif op == 6:
+                    self.mock.seq += 1
+                    await self.send({"op": 0, "t": "RESUMED", "s": self.mock.seq, "d": {}})
+                elif op == 8:
+                    d = payload["d"]
+                    self.mock.seq += 1
+                    await self.send({"op": 0, "t": "GUILD_MEMBERS_CHUNK", "s": self.mock.seq, "d": {
+                        "guild_id": d["guild_id"], "members": list(self.mock.members.values()),
+                        "chunk_index": 0, "chunk_count": 1, "nonce": d.get("nonce")}})
+        finally:
+            if self in self.mock.sessions:
+                self.mock.sessions.remove(self)
+
+    async def _identify(self, d: dict):
+        mock = self.mock
+        self.shard = tuple(d.get("shard") or (0, 1))
+        mock.sessions.append(self)
+        guilds = [{"id": mock.guild_id, "unavailable": True}] if self.owns(mock.guild_id) else []
+        mock.seq += 1
+        await self.send({"op": 0, "t": "READY", "s": mock.seq, "d": {
+            "v": 10, "user": mock.bot_user, "guilds": guilds, "session_id": snowflake(),
+            "resume_gateway_url": mock.gateway_url, "shard": list(self.shard),
+            "application": {"id": mock.app_id, "flags": 0}}})
+        if guilds:
+            mock.seq += 1
+            await self.send({"op": 0, "t": "GUILD_CREATE", "s": mock.seq, "d": mock.guild_payload()})
+            mock.ready.set()
+
+
+def _route_template(parts: List[str]) -> str:
+    # 숫자 ID 와 토큰은 {id} 로 바꿔 경로별 호출 수를 묶는다
+    return "/" + "/".join("{id}" if p.isdigit() or p.endswith("tok") else p for p in parts)
+
+
+async def _read_body(request: web.Request):
+    files = []
+    if request.content_type.startswith("multipart/"):
+        form = await request.post()
+        body = {}
+        for key, value in form.items():
+            if key == "payload_json":
+                body = json.loads(value)
+            elif hasattr(value, "filename"):
+                files.append(value.filename)
+        return body, files
+    if request.can_read_body:
+        try:
+            return await request.json(), files
+        except ValueError:
+            return {}, files
+    return {}, files
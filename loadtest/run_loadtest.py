@@ -0,0 +1,387 @@
+# 가짜 디스코드(mock_discord.py)를 띄우고 봇을 별도 프로세스로 붙여 시나리오별 트래픽을 흘린다.
+#
+#   python loadtest/run_loadtest.py                           # 전체 시나리오
+#   python loadtest/run_loadtest.py -s math -s dungeon --math-channels 50
+#   python loadtest/run_loadtest.py --no-rate-limit --rest-latency 80
+#   python loadtest/run_loadtest.py --attach                  # 봇은 직접 띄움 (출력된 환경변수 사용)
+#   python loadtest/run_loadtest.py --shards 4 --processes 2  # 샤드 묶음마다 프로세스 하나, DB 는 공유
+#
+# 시나리오
+#   joins    멤버 대량 입장 (GUILD_MEMBER_ADD) → 환영 채널 게시 수/요약 전환/드레인 시간
+#   math     채널마다 /수학-문제 → 답 메시지 반복 → 응답(ack)·채점 지연
+#   typing   두 명씩 /typinggame 대결 → 수락 버튼 → 문장 이미지 → 답 → 결과 지연
+#   dungeon  !전평시 던전가기 → 정답 버튼 연타 → 클릭 응답·보상 지연
+# 결과는 시나리오별 처리량(게이트웨이 이벤트/s, 봇 REST 호출/s), 429 횟수, p50/p95/p99 지연이다.
+import argparse
+import ast
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_discord import MockDiscord  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+BOT_SCRIPT = ROOT / "import discord RP.py"
+# 상수를 읽어 올 소스 (봇 스크립트는 실행 파일일 뿐이고 상수는 core / 확장에 있다)
+CONSTANT_SOURCES = (ROOT / "core.py", ROOT / "cogs" / "typing_game.py")
+SCENARIOS = ("joins", "math", "typing", "dungeon")
+
+
+def read_constants(*names) -> dict:
+    # 봇을 실행하지 않고 리터럴 상수만 읽는다 (채널 ID, 타자 문장 등)
+    found = {}
+    for path in CONSTANT_SOURCES:
+        for node in ast.parse(path.read_text(encoding="utf-8")).body:
+            if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name) and node.targets[0].id in names:
+                try:
+                    found[node.targets[0].id] = ast.literal_eval(node.value)
+                except ValueError:
+                    pass
+    return found
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latency = defaultdict(list)
+        self.timeouts = defaultdict(int)
+
+    def add(self, name: str, seconds: float):
+        self.latency[name].append(seconds)
+
+    async def wait(self, name: str, fut, t0: float):
+        try:
+            ev = await fut
+        except asyncio.TimeoutError:
+            self.timeouts[name] += 1
+            return None
+        self.add(name, ev["t"] - t0)
+        return ev
+
+
+def buttons(message: dict):
+    for row in message.get("components") or []:
+        for comp in row.get("components", []):
+            if comp.get("type") == 2:
+                yield comp
+
+
+def embed_title(ev: dict) -> str:
+    msg = ev.get("message") or (ev.get("body") or {}).get("data") or {}
+    embeds = msg.get("embeds") or []
+    return embeds[0].get("title", "") if embeds else ""
+
+
+def is_kind(kind: str, pred=None):
+    return lambda ev: ev["kind"] == kind and (pred is None or pred(ev))
+
+
+# ================= 시나리오 =================
+async def scenario_joins(mock: MockDiscord, rec: Recorder, args, consts):
+    welcome = str(consts["WELCOME_CHANNEL_ID"])
+    posts = []
+    announced = set()
+
+    def on_post(ev):
+        posts.append(ev["t"])
+        for embed in ev["message"].get("embeds") or []:
+            announced.update(re.findall(r"<@(\d+)>", embed.get("description", "")))
+    stop = mock.listen(("channel", welcome), on_post)
+
+    sent = {}
+    t_start = time.perf_counter()
+    for i in range(args.joins):
+        member = mock.add_member()
+        sent[member["user"]["id"]] = time.perf_counter()
+        await mock.dispatch("GUILD_MEMBER_ADD", dict(member, guild_id=mock.guild_id))
+        if args.join_rate:
+            await asyncio.sleep(max(0.0, t_start + (i + 1) / args.join_rate - time.perf_counter()))
+    t_sent = time.perf_counter()
+
+    # 새 게시가 args.quiet 초 동안 없으면 다 나간 것으로 본다
+    while time.perf_counter() - (posts[-1] if posts else t_sent) < args.quiet:
+        await asyncio.sleep(0.2)
+    stop()
+    # 입장을 다 보내기 전에 게시가 끝났으면 밀린 것이 없으므로 드레인 시간은 남기지 않는다
+    if posts and posts[-1] >= t_sent:
+        rec.add("joins.drain", posts[-1] - t_sent)
+    # 조용해질 때까지 한 번도 소개되지 않은 멤버는 시간 초과로 세어 시나리오를 실패로 만든다
+    missing = len(set(sent) - announced)
+    if missing:
+        rec.timeouts["joins.announced"] += missing
+    return {"joins": args.joins, "welcome_posts": len(posts), "members_announced": len(announced & set(sent)),
+            "join_rate": args.joins / max(1e-9, t_sent - t_start)}
+
+
+async def scenario_math(mock: MockDiscord, rec: Recorder, args, consts):
+    players = [mock.add_member() for _ in range(args.math_channels)]
+    channels = [mock.add_channel(f"math-{i}") for i in range(args.math_channels)]
+    ops = {"+": int.__add__, "-": int.__sub__, "×": int.__mul__, "÷": int.__floordiv__}
+    await resync_guild(mock)
+
+    async def worker(member, ch):
+        for _ in range(args.math_rounds):
+            op = random.choice(["덧셈", "뺄셈", "곱셈", "나눗셈"])
+            inter = mock.slash(member, ch, "수학-문제", [{"name": "연산", "type": 3, "value": op}])
+            fut = mock.wait_for(("token", inter["token"]), is_kind("callback"))
+            t0 = time.perf_counter()
+            await mock.dispatch("INTERACTION_CREATE", inter)
+            ev = await rec.wait("math.ack", fut, t0)
+            if ev is None:
+                continue
+            m = re.search(r"(\d+) (\S) (\d+) = \?", ev["body"]["data"]["embeds"][0]["description"])
+            answer = ops[m.group(2)](int(m.group(1)), int(m.group(3)))
+            if random.random() < 0.2:
+                answer += 1  # 오답 경로도 섞는다
+            fut = mock.wait_for(("channel", ch), is_kind("message", lambda e: embed_title(e) in ("🎉 정답!", "❌ 오답!")))
+            t0 = time.perf_counter()
+            await mock.dispatch("MESSAGE_CREATE", mock.message_create(member, ch, str(answer)))
+            await rec.wait("math.answer", fut, t0)
+
+    await asyncio.gather(*(worker(p, c) for p, c in zip(players, channels)))
+    return {"channels": args.math_channels, "rounds": args.math_rounds}
+
+
+async def scenario_typing(mock: MockDiscord, rec: Recorder, args, consts):
+    texts = consts["TYPING_TEXTS"]
+    pairs = [(mock.add_member(), mock.add_member()) for _ in range(args.typing_pairs)]
+    channels = [mock.add_channel(f"typing-{i}") for i in range(args.typing_pairs)]
+    await resync_guild(mock)
+    results = defaultdict(int)
+
+    async def worker(a, b, ch):
+        b_id = b["user"]["id"]
+        for _ in range(args.typing_rounds):
+            resolved = {"users": {b_id: b["user"]}, "members": {b_id: {k: v for k, v in b.items() if k != "user"}}}
+            inter = mock.slash(a, ch, "typinggame", [{"name": "opponent", "type": 6, "value": b_id}], resolved)
+            ack = mock.wait_for(("token", inter["token"]), is_kind("callback"))
+            invite = mock.wait_for(("token", inter["token"]), is_kind("followup", lambda e: e["message"]["components"]))
+            t0 = time.perf_counter()
+            await mock.dispatch("INTERACTION_CREATE", inter)
+            await rec.wait("typing.ack", ack, t0)
+            ev = await rec.wait("typing.invite", invite, t0)
+            if ev is None:
+                continue
+            accept = next(c for c in buttons(ev["message"]) if c.get("label", "").startswith("✅"))
+            click = mock.click(b, ev["message"], accept["custom_id"])
+            image = mock.wait_for(("token", click["token"]), is_kind("followup", lambda e: e["message"]["attachments"]))
+            t0 = time.perf_counter()
+            await mock.dispatch("INTERACTION_CREATE", click)
+            if await rec.wait("typing.image", image, t0) is None:
+                continue
+            result = mock.wait_for(("token", click["token"]),
+                                   is_kind("followup", lambda e: any(w in e["message"]["content"] for w in ("승리", "오답", "초과"))),
+                                   timeout=40)
+            t0 = time.perf_counter()
+            # 어떤 문장이 나왔는지는 이미지라 알 수 없으므로 두 사람이 각자 후보 하나씩 보낸다
+            await mock.dispatch("MESSAGE_CREATE", mock.message_create(a, ch, random.choice(texts)))
+            await mock.dispatch("MESSAGE_CREATE", mock.message_create(b, ch, random.choice(texts)))
+            ev = await rec.wait("typing.result", result, t0)
+            if ev:
+                results["win" if "승리" in ev["message"]["content"] else "wrong"] += 1
+
+    await asyncio.gather(*(worker(a, b, c) for (a, b), c in zip(pairs, channels)))
+    return {"pairs": args.typing_pairs, "rounds": args.typing_rounds, **results}
+
+
+async def scenario_dungeon(mock: MockDiscord, rec: Recorder, args, consts):
+    players = [mock.add_member() for _ in range(args.dungeon_players)]
+    channels = [mock.add_channel(f"dungeon-{i}") for i in range(args.dungeon_players)]
+    await resync_guild(mock)
+    cleared = 0
+
+    async def worker(member, ch):
+        nonlocal cleared
+        for _ in range(args.dungeon_runs):
+            fut = mock.wait_for(("channel", ch), is_kind("message", lambda e: e["message"]["components"]))
+            t0 = time.perf_counter()
+            await mock.dispatch("MESSAGE_CREATE", mock.message_create(member, ch, "!전평시 던전가기 초보던전"))
+            ev = await rec.wait("dungeon.enter", fut, t0)
+            if ev is None:
+                continue
+            message = ev["message"]
+            for _ in range(100):
+                target = next((c for c in buttons(message) if c.get("style") == 3), None)
+                if target is None:
+                    break
+                click = mock.click(member, message, target["custom_id"])
+                fut = mock.wait_for(("token", click["token"]), is_kind("callback"))
+                t0 = time.perf_counter()
+                await mock.dispatch("INTERACTION_CREATE", click)
+                ev = await rec.wait("dungeon.click", fut, t0)
+                if ev is None or ev["body"].get("type") != 7:
+                    break
+                data = ev["body"]["data"]
+                if (data.get("embeds") or [{}])[0].get("title", "").startswith("✅"):
+                    reward = mock.wait_for(("channel", ch), is_kind("message", lambda e: embed_title(e) == "던전 보상"))
+                    if await rec.wait("dungeon.reward", reward, ev["t"]):
+                        cleared += 1
+                    break
+                message = dict(message, components=data.get("components") or [])
+
+    await asyncio.gather(*(worker(p, c) for p, c in zip(players, channels)))
+    return {"players": args.dungeon_players, "runs": args.dungeon_runs, "cleared": cleared}
+
+
+async def resync_guild(mock: MockDiscord):
+    # 시나리오마다 추가한 채널/멤버를 봇 캐시에 알려 준다
+    await mock.dispatch("GUILD_CREATE", mock.guild_payload())
+    await asyncio.sleep(0.2)
+
+
+# ================= 실행 =================
+def shard_groups(shards: int, processes: int):
+    # 샤드 0..shards-1 을 processes 개의 프로세스에 고르게 나눈 SHARD_IDS 목록
+    if not shards:
+        return [None]
+    processes = max(1, min(processes, shards))
+    return [",".join(str(s) for s in range(shards) if s % processes == i) for i in range(processes)]
+
+
+async def start_bot(mock: MockDiscord, args, workdir: str, http_port: int, shard_ids: str = None, log_path: str = None):
+    env = dict(os.environ, BOT_TOKEN="loadtest-token", DISCORD_API_BASE=mock.api_base,
+               DISCORD_GATEWAY_URL=mock.gateway_url, PORT=str(http_port), PYTHONUNBUFFERED="1")
+    keys = ["BOT_TOKEN", "DISCORD_API_BASE", "DISCORD_GATEWAY_URL", "PORT"]
+    if shard_ids is not None:
+        env.update(SHARD_COUNT=str(args.shards), SHARD_IDS=shard_ids)
+        keys += ["SHARD_COUNT", "SHARD_IDS"]
+    if args.attach:
+        print("다음 환경변수로 봇을 직접 실행하세요:")
+        for key in keys:
+            print(f"  {key}={env[key]}")
+        return None
+    log = open(log_path or args.bot_log, "w", encoding="utf-8")
+    return await asyncio.create_subprocess_exec(sys.executable, str(BOT_SCRIPT), cwd=workdir, env=env,
+                                                stdout=log, stderr=asyncio.subprocess.STDOUT)
+
+
+async def stop_bot(proc):
+    if proc is None or proc.returncode is not None:
+        return
+    proc.send_signal(signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), 15)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+
+
+async def fetch_health(http_port: int):
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{http_port}/health", timeout=aiohttp.ClientTimeout(total=3)) as r:
+                return await r.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+
+def report(name: str, info: dict, rec: Recorder, elapsed: float, events: int, rest: int, limited: int):
+    print(f"\n== {name} ({elapsed:.1f}s) ==")
+    print("  " + ", ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in info.items()))
+    print(f"  gateway events {events} ({events / elapsed:.1f}/s), bot REST calls {rest} ({rest / elapsed:.1f}/s), 429 {limited}")
+    for metric, values in sorted(rec.latency.items()):
+        print(f"  {metric:16} n={len(values):<6} p50={percentile(values, 0.5) * 1000:8.1f}ms "
+              f"p95={percentile(values, 0.95) * 1000:8.1f}ms p99={percentile(values, 0.99) * 1000:8.1f}ms"
+              + (f"  timeouts={rec.timeouts[metric]}" if rec.timeouts.get(metric) else ""))
+    for metric, n in rec.timeouts.items():
+        if metric not in rec.latency:
+            print(f"  {metric:16} timeouts={n}")
+
+
+async def main(args) -> int:
+    consts = read_constants("WELCOME_CHANNEL_ID", "LEAVE_CHANNEL_ID", "TYPING_TEXTS")
+    mock = MockDiscord(message_limit=None if args.no_rate_limit else (5, 5.0), rest_latency=args.rest_latency / 1000)
+    for name in ("WELCOME_CHANNEL_ID", "LEAVE_CHANNEL_ID"):
+        if name in consts:
+            mock.add_channel(name.lower(), consts[name])
+    for _ in range(args.members):
+        mock.add_member()
+    await mock.start()
+
+    # 여러 프로세스로 띄울 때도 작업 디렉터리(= DB 파일)는 하나를 같이 쓴다
+    workdir = tempfile.mkdtemp(prefix="bot-loadtest-")
+    groups = shard_groups(args.shards, args.processes)
+    bots = []
+    for i, shard_ids in enumerate(groups):
+        http_port = free_port()
+        log_path = args.bot_log if len(groups) == 1 else f"{args.bot_log}.{i}"
+        bots.append((await start_bot(mock, args, workdir, http_port, shard_ids, log_path), http_port))
+    status = 0
+    try:
+        await asyncio.wait_for(mock.ready.wait(), args.connect_timeout)
+        await asyncio.sleep(1.0)  # on_ready / 명령어 동기화가 끝날 시간
+        runners = {"joins": scenario_joins, "math": scenario_math, "typing": scenario_typing, "dungeon": scenario_dungeon}
+        for name in args.scenario or SCENARIOS:
+            rec = Recorder()
+            events0, rest0, limited0 = sum(mock.events_sent.values()), sum(mock.rest_calls.values()), mock.rate_limited
+            t0 = time.perf_counter()
+            info = await runners[name](mock, rec, args, consts)
+            report(name, info, rec, time.perf_counter() - t0, sum(mock.events_sent.values()) - events0,
+                   sum(mock.rest_calls.values()) - rest0, mock.rate_limited - limited0)
+            if any(rec.timeouts.values()):
+                status = 1
+        for i, (_, http_port) in enumerate(bots):
+            health = await fetch_health(http_port)
+            if health:
+                print(f"\n== bot /health{f' (프로세스 {i}, 샤드 {groups[i]})' if len(bots) > 1 else ''} ==")
+                print("  " + json.dumps({k: health.get(k) for k in ("loop_lag_max", "timers", "db", "loop_blocks", "shards")},
+                                        ensure_ascii=False))
+        print("\n== REST 호출 (상위 10) ==")
+        for route, n in mock.rest_calls.most_common(10):
+            print(f"  {n:8d}  {route}")
+    except asyncio.TimeoutError:
+        print(f"봇이 {args.connect_timeout}초 안에 게이트웨이에 붙지 않았습니다. 로그: {args.bot_log}")
+        status = 2
+    finally:
+        for proc, _ in bots:
+            await stop_bot(proc)
+        await mock.stop()
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 디스코드로 봇 부하 테스트")
+    parser.add_argument("-s", "--scenario", action="append", choices=SCENARIOS, help="실행할 시나리오 (여러 번 지정 가능)")
+    parser.add_argument("--members", type=int, default=200, help="처음부터 길드에 있는 멤버 수")
+    parser.add_argument("--joins", type=int, default=2000)
+    parser.add_argument("--join-rate", type=float, default=500.0, help="초당 입장 이벤트 수 (0 이면 최대한 빠르게)")
+    parser.add_argument("--quiet", type=float, default=7.0, help="환영 게시가 이 시간 동안 없으면 입장 시나리오 종료")
+    parser.add_argument("--math-channels", type=int, default=20)
+    parser.add_argument("--math-rounds", type=int, default=10)
+    parser.add_argument("--typing-pairs", type=int, default=10)
+    parser.add_argument("--typing-rounds", type=int, default=2)
+    parser.add_argument("--dungeon-players", type=int, default=10)
+    parser.add_argument("--dungeon-runs", type=int, default=2)
+    parser.add_argument("--no-rate-limit", action="store_true", help="채널 메시지 레이트 리밋(5회/5초)을 끈다")
+    parser.add_argument("--rest-latency", type=float, default=0.0, help="REST 응답마다 더할 지연 (ms)")
+    parser.add_argument("--shards", type=int, default=0, help="SHARD_COUNT (0 이면 샤딩 없이 commands.Bot)")
+    parser.add_argument("--processes", type=int, default=1, help="샤드를 나눠 맡을 봇 프로세스 수 (--shards 와 함께)")
+    parser.add_argument("--connect-timeout", type=float, default=30.0)
+    parser.add_argument("--bot-log", default=os.path.abspath("loadtest-bot.log"))
+    parser.add_argument("--attach", action="store_true", help="봇을 띄우지 않고 직접 붙기를 기다린다")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,5 @@
+# 저장소 루트의 core / cogs 를 불러올 수 있도록
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,60 @@
+# 던전 랭킹: 동점자는 같은 순위, 페이지가 동점 그룹 중간에서 시작해도 순위가 이어진다
+import sqlite3
+
+import pytest
+
+import core
+
+CLEARS = {"a": 10, "b": 8, "c": 8, "d": 8, "e": 5, "f": 5, "g": 1}
+EXPECTED = {"a": 1, "b": 2, "c": 2, "d": 2, "e": 5, "f": 5, "g": 7}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    core._m001_create_tables(conn)
+    conn.executemany("INSERT INTO dungeon_totals VALUES (?, ?, 0, ?)",
+                     [(uid, n, 100 - n) for uid, n in CLEARS.items()])
+    conn.executemany("INSERT INTO dungeon_stats VALUES (?, '숲', ?, 0, 0)", [(uid, n) for uid, n in CLEARS.items()])
+    conn.execute("INSERT INTO dungeon_stats VALUES ('z', '동굴', 99, 0, 0)")  # 다른 던전은 섞이지 않는다
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("dungeon", [None, "숲"])
+def test_full_page_uses_competition_ranks(conn, dungeon):
+    page, mine = core._dungeon_ranking(conn, dungeon, "clears", "e", 0, 10)
+    assert [(row[1], row[0]) for row in page] == sorted(EXPECTED.items(), key=lambda kv: kv[1])
+    assert [row[2] for row in page] == sorted(CLEARS.values(), reverse=True)
+    assert mine == (5, "e", 5, 0, 100 - 5 if dungeon is None else 0)
+
+
+@pytest.mark.parametrize("offset", range(0, 8))
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_page_starting_inside_a_tie_group(conn, offset, limit):
+    page, _ = core._dungeon_ranking(conn, None, "clears", "a", offset, limit)
+    ranks = sorted(EXPECTED.values())[offset:offset + limit]
+    assert [row[0] for row in page] == ranks
+    # 같은 순위로 나온 사람은 실제로 그 순위의 기록을 가진 사람이다
+    for rank, uid, clears, *_ in page:
+        assert EXPECTED[uid] == rank and CLEARS[uid] == clears
+
+
+def test_callers_rank_when_tied_and_off_page(conn):
+    page, mine = core._dungeon_ranking(conn, "숲", "clears", "d", 5, 2)
+    assert [row[0] for row in page] == [5, 7]
+    assert mine[:3] == (2, "d", 8)
+    page, mine = core._dungeon_ranking(conn, "숲", "clears", "nobody", 0, 3)
+    assert mine is None
+
+
+def test_order_by_coins(conn):
+    conn.execute("UPDATE dungeon_totals SET coins = 7 WHERE user_id IN ('a', 'g')")
+    conn.commit()
+    page, mine = core._dungeon_ranking(conn, None, "coins", "g", 0, 10)
+    by_uid = {row[1]: row[0] for row in page}
+    assert by_uid["e"] == by_uid["f"] == 1
+    assert by_uid["b"] == by_uid["c"] == by_uid["d"] == 3
+    assert by_uid["a"] == by_uid["g"] == 6
+    assert mine[0] == 6
@@ -0,0 +1,82 @@
+# 메모리 리더보드: 동점, 기록 갱신(좋아짐/나빠짐), 다시 읽기
+import asyncio
+
+import core
+
+
+def test_load_orders_and_skips_missing_values():
+    board = core.Leaderboard()
+    board.load([("c", 3.0), ("a", 1.5), ("b", 2.0), ("x", None)])
+    assert board.page() == [("a", 1.5), ("b", 2.0), ("c", 3.0)]
+    assert [board.rank(u) for u in "abc"] == [1, 2, 3]
+    assert board.rank("x") is None
+    assert board.value("x") is None
+    assert len(board) == 3
+
+
+def test_ties_are_ordered_by_user_id():
+    board = core.Leaderboard(descending=True)
+    board.load([("b", 10), ("c", 10), ("a", 10), ("d", 20)])
+    assert board.page() == [("d", 20), ("a", 10), ("b", 10), ("c", 10)]
+    assert [board.rank(u) for u in "dabc"] == [1, 2, 3, 4]
+    # 동점 그룹으로 들어와도 같은 규칙으로 자리를 잡는다
+    board.update("0", 10)
+    assert [uid for uid, _ in board.page()] == ["d", "0", "a", "b", "c"]
+
+
+def test_update_improved_and_worse():
+    board = core.Leaderboard()  # 작을수록 위
+    board.load([("a", 1.0), ("b", 2.0), ("c", 3.0)])
+    board.update("c", 0.5)
+    assert board.rank("c") == 1 and board.rank("a") == 2
+    board.update("c", 9.0)
+    assert board.rank("c") == 3 and board.value("c") == 9.0
+    assert board.page() == [("a", 1.0), ("b", 2.0), ("c", 9.0)]
+    board.update("d", 2.0)  # 처음 기록하는 유저
+    assert board.page(1, 2) == [("b", 2.0), ("d", 2.0)]
+    assert len(board) == 4
+
+
+def test_update_with_same_value_keeps_single_entry():
+    board = core.Leaderboard(descending=True)
+    board.load([("a", 5)])
+    board.update("a", 5)
+    board.update("a", 5)
+    assert board.page() == [("a", 5)]
+    assert board.value("a") == 5
+
+
+def test_reload_replaces_rows_and_keeps_updates_made_meanwhile():
+    board = core.Leaderboard(descending=True)
+    board.load([("a", 1), ("b", 2)])
+
+    async def fetch():
+        # 읽는 도중 이 프로세스에서 들어온 갱신은 새로 읽은 값보다 우선한다
+        board.update("a", 50)
+        await asyncio.sleep(0)
+        return [("a", 1), ("b", 30), ("c", 40)]  # b, c 는 다른 프로세스가 기록한 값
+
+    asyncio.run(board.reload(fetch))
+    assert board.page() == [("a", 50), ("c", 40), ("b", 30)]
+    assert board.rank("a") == 1
+
+    # 다시 읽기가 끝난 뒤의 갱신은 평소처럼 반영된다
+    board.update("b", 60)
+    assert board.rank("b") == 1
+    assert board._recent is None
+
+
+def test_reload_failure_keeps_previous_rows():
+    board = core.Leaderboard()
+    board.load([("a", 1.0)])
+
+    async def fetch():
+        raise RuntimeError("db down")
+
+    try:
+        asyncio.run(board.reload(fetch))
+    except RuntimeError:
+        pass
+    assert board.page() == [("a", 1.0)]
+    board.update("b", 0.5)
+    assert board.rank("b") == 1
@@ -0,0 +1,104 @@
+# 메시지 라우터: 등록/해제, 콜백 안에서 해제, 처리하지 않은 메시지는 명령어 처리로 넘어간다
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import core
+
+
+def _message(channel_id, author_id, content="1"):
+    return SimpleNamespace(channel=SimpleNamespace(id=channel_id), author=SimpleNamespace(id=author_id),
+                           content=content)
+
+
+def _listener(calls, tag, result):
+    async def listener(message):
+        calls.append(tag)
+        return result
+    return listener
+
+
+def test_add_and_remove():
+    router = core.MessageRouter()
+    calls = []
+    remove = router.add(1, 10, _listener(calls, "a", True))
+    assert len(router) == 1
+    assert asyncio.run(router.dispatch(_message(1, 10))) is True
+    assert asyncio.run(router.dispatch(_message(1, 11))) is False  # 다른 작성자
+    assert asyncio.run(router.dispatch(_message(2, 10))) is False  # 다른 채널
+    assert calls == ["a"]
+    remove()
+    remove()  # 두 번 불러도 된다
+    assert len(router) == 0 and router._routes == {}
+    assert asyncio.run(router.dispatch(_message(1, 10))) is False
+    assert calls == ["a"]
+
+
+def test_author_route_before_any_author_and_fall_through():
+    router = core.MessageRouter()
+    calls = []
+    router.add(1, core.ANY_AUTHOR, _listener(calls, "any", True))
+    router.add(1, 10, _listener(calls, "first", False))
+    router.add(1, 10, _listener(calls, "second", False))
+    assert asyncio.run(router.dispatch(_message(1, 10))) is True
+    assert calls == ["first", "second", "any"]
+    calls.clear()
+    assert asyncio.run(router.dispatch(_message(1, 99))) is True
+    assert calls == ["any"]
+
+
+def test_listener_unroutes_itself_during_dispatch():
+    router = core.MessageRouter()
+    calls = []
+    removes = {}
+
+    async def once(message):
+        calls.append("once")
+        removes["once"]()
+        return False
+
+    removes["once"] = router.add(1, 10, once)
+    router.add(1, 10, _listener(calls, "next", True))
+    assert asyncio.run(router.dispatch(_message(1, 10))) is True
+    assert calls == ["once", "next"]
+    calls.clear()
+    asyncio.run(router.dispatch(_message(1, 10)))
+    assert calls == ["next"]
+    assert len(router) == 1
+
+
+@pytest.fixture
+def on_message(monkeypatch):
+    # core.on_message 를 새 라우터와 가짜 process_commands 로 돌린다
+    router = core.MessageRouter()
+    processed = []
+
+    async def process_commands(message):
+        processed.append(message.content)
+
+    monkeypatch.setattr(core, "router", router)
+    monkeypatch.setattr(core.bot, "process_commands", process_commands)
+    return router, processed
+
+
+def test_unhandled_message_falls_through_to_commands(on_message):
+    router, processed = on_message
+    calls = []
+    router.add(1, 10, _listener(calls, "game", False))
+    asyncio.run(core.on_message(_message(1, 10, "!ping")))
+    assert calls == ["game"] and processed == ["!ping"]
+    # 접두사가 없는 일반 대화는 명령어 처리까지 가지 않는다
+    asyncio.run(core.on_message(_message(1, 10, "hello")))
+    assert processed == ["!ping"]
+
+
+def test_handled_message_skips_commands(on_message):
+    router, processed = on_message
+    calls = []
+    remove = router.add(1, 10, _listener(calls, "game", True))
+    asyncio.run(core.on_message(_message(1, 10, "!42")))
+    assert calls == ["game"] and processed == []
+    remove()
+    asyncio.run(core.on_message(_message(1, 10, "!42")))
+    assert processed == ["!42"]
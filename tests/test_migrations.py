@@ -0,0 +1,122 @@
+# 스키마 마이그레이션: 예전 DB 파일(예전 컬럼 구성) 가져오기, schema_version 기록, 두 번째 시작에는 DDL 없음
+import sqlite3
+
+import pytest
+
+import core
+
+
+def _legacy(path, *statements):
+    conn = sqlite3.connect(path)
+    for sql in statements:
+        conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+def _statements_of_second_start():
+    conn = sqlite3.connect(core.DB_FILE)
+    seen = []
+    conn.set_trace_callback(seen.append)
+    assert core._migrate(conn) == (len(core.MIGRATIONS), len(core.MIGRATIONS))
+    conn.close()
+    return seen
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # 예전 파일과 bot.db 는 작업 디렉터리 기준 경로다
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_fresh_start_creates_schema_and_second_start_runs_no_ddl(workdir):
+    conn = sqlite3.connect(core.DB_FILE)
+    assert core._migrate(conn) == (0, len(core.MIGRATIONS))
+    assert conn.execute("SELECT version FROM schema_version").fetchall() == [(len(core.MIGRATIONS),)]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert {"typing_records", "user_scores", "users", "inventory", "dungeon_totals", "bot_meta"} <= tables
+    conn.close()
+
+    seen = _statements_of_second_start()
+    assert seen and all(sql.lstrip().upper().startswith("SELECT") for sql in seen), seen
+
+
+def test_imports_legacy_files_with_old_column_sets(workdir):
+    # 예전 main 파일에는 guild_settings 테이블이 아예 없다
+    _legacy("bot_records.db",
+            "CREATE TABLE typing_records (user_id TEXT PRIMARY KEY, best_time REAL)",
+            "INSERT INTO typing_records VALUES ('u1', 12.5)",
+            "CREATE TABLE warnings (user_id TEXT PRIMARY KEY, count INTEGER)",
+            "INSERT INTO warnings VALUES ('u1', 2)")
+    # 예전 math 파일에는 math_difficulty 테이블이 없다
+    _legacy("math_scores.db",
+            "CREATE TABLE user_scores (user_id TEXT PRIMARY KEY, score INTEGER, correct_count INTEGER, "
+            "total_count INTEGER, max_consecutive INTEGER, consecutive INTEGER)",
+            "INSERT INTO user_scores VALUES ('u1', 40, 4, 5, 3, 1)")
+    # coins 컬럼이 없는 dungeon_stats, 아이템 1개당 1행인 inventory
+    _legacy("fishing_bot.db",
+            "CREATE TABLE users (user_id TEXT PRIMARY KEY, coins INTEGER, jji INTEGER, last_attendance TEXT)",
+            "INSERT INTO users VALUES ('u1', 700, 3, '2024-01-01')",
+            "CREATE TABLE dungeon_stats (user_id TEXT, dungeon_name TEXT, clears INTEGER, fails INTEGER, "
+            "PRIMARY KEY (user_id, dungeon_name))",
+            "INSERT INTO dungeon_stats VALUES ('u1', '숲', 3, 1)",
+            "INSERT INTO dungeon_stats VALUES ('u1', '동굴', 2, 0)",
+            "INSERT INTO dungeon_stats VALUES ('u2', '숲', 1, 4)",
+            "CREATE TABLE inventory (user_id TEXT, item TEXT)",
+            "INSERT INTO inventory VALUES ('u1', '나무 검')",
+            "INSERT INTO inventory VALUES ('u1', '나무 검')",
+            "INSERT INTO inventory VALUES ('u1', '철 검')")
+
+    conn = sqlite3.connect(core.DB_FILE)
+    assert core._migrate(conn) == (0, len(core.MIGRATIONS))
+    q = lambda sql: conn.execute(sql).fetchall()  # noqa: E731
+    assert q("SELECT * FROM typing_records") == [("u1", 12.5)]
+    assert q("SELECT * FROM warnings") == [("u1", 2)]
+    assert q("SELECT * FROM guild_settings") == []
+    assert q("SELECT * FROM math_difficulty") == []
+    assert q("SELECT * FROM user_scores") == [("u1", 40, 4, 5, 3, 1)]
+    assert q("SELECT * FROM users") == [("u1", 700, 3, "2024-01-01")]
+    assert sorted(q("SELECT * FROM dungeon_stats")) == [("u1", "동굴", 2, 0, 0), ("u1", "숲", 3, 1, 0), ("u2", "숲", 1, 4, 0)]
+    assert sorted(q("SELECT * FROM dungeon_totals")) == [("u1", 5, 1, 0), ("u2", 1, 4, 0)]
+    assert sorted(q("SELECT * FROM inventory")) == [("u1", "나무 검", 2), ("u1", "철 검", 1)]
+    assert q("SELECT * FROM user_power") == [("u1", 2 * 10 + 30)]
+    assert q("SELECT version FROM schema_version") == [(len(core.MIGRATIONS),)]
+    # 예전 파일은 가져온 뒤 떼어 낸다
+    assert [row[1] for row in q("PRAGMA database_list")] == ["main"]
+    conn.close()
+
+    # 예전 파일이 남아 있어도 두 번째 시작에는 붙이지도, 다시 가져오지도 않는다
+    seen = _statements_of_second_start()
+    assert all(sql.lstrip().upper().startswith("SELECT") for sql in seen), seen
+
+
+def test_imports_newer_legacy_inventory_with_quantities(workdir):
+    _legacy("fishing_bot.db",
+            "CREATE TABLE inventory (user_id TEXT, item TEXT, quantity INTEGER, PRIMARY KEY (user_id, item))",
+            "INSERT INTO inventory VALUES ('u1', '금 검', 3)")
+    conn = sqlite3.connect(core.DB_FILE)
+    core._migrate(conn)
+    assert conn.execute("SELECT * FROM inventory").fetchall() == [("u1", "금 검", 3)]
+    assert conn.execute("SELECT * FROM user_power").fetchall() == [("u1", 3 * 40)]
+    # 예전 파일에 없던 테이블은 건너뛴다
+    assert conn.execute("SELECT COUNT(*) FROM users").fetchone() == (0,)
+    conn.close()
+
+
+def test_failed_migration_rolls_back_and_detaches(workdir, monkeypatch):
+    _legacy("bot_records.db",
+            "CREATE TABLE typing_records (user_id TEXT PRIMARY KEY, best_time REAL)",
+            "INSERT INTO typing_records VALUES ('u1', 12.5)")
+
+    def broken(conn):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(core, "MIGRATIONS", core.MIGRATIONS + [broken])
+    conn = sqlite3.connect(core.DB_FILE)
+    with pytest.raises(RuntimeError):
+        core._migrate(conn)
+    assert core._schema_version(conn) == 0
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall() == []
+    assert [row[1] for row in conn.execute("PRAGMA database_list")] == ["main"]
+    conn.close()
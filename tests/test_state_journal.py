@@ -0,0 +1,185 @@
+# 상태 저널: 다시 열어 읽기, 삭제, 압축, 재시작 중에 마감이 지난 게임 복원
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import core
+from cogs import math_game, video_challenge
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _reopen(path):
+    journal = core.StateJournal(str(path))
+    journal.load()
+    return journal
+
+
+def test_put_delete_and_reopen(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = _reopen(path)
+    journal.put("math", 1, {"n": 1})
+    journal.put("math", 2, {"n": 2})
+    journal.put("math", 1, {"n": 3})  # 같은 키는 마지막 값이 이긴다
+    journal.put("video", 1, {"n": 4})  # 종류가 다르면 다른 항목
+    journal.delete("math", 2)
+    journal.delete("math", 99)  # 없는 키는 기록하지 않는다
+    assert journal.writes == 5
+    journal.close()
+
+    journal = _reopen(path)
+    assert journal.stats()["live"] == 2
+    assert journal.take("math") == {1: {"n": 3}}
+    assert journal.take("math") == {}  # 한 번만 받아 간다
+    assert journal.take("video") == {1: {"n": 4}}
+    # 읽으면서 산 항목만 남도록 다시 쓴다
+    assert sorted((rec["k"], rec["id"]) for rec in _lines(path)) == [("math", 1), ("video", 1)]
+    journal.close()
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = _reopen(path)
+    journal.put("math", 1, {"n": 1})
+    journal.put("math", 2, {"n": 2})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"k":"math","id":3,"v":{"n"')  # 쓰다 만 줄
+
+    journal = _reopen(path)
+    assert journal.take("math") == {1: {"n": 1}, 2: {"n": 2}}
+    journal.put("math", 4, {"n": 4})
+    journal.close()
+    assert [rec["id"] for rec in _lines(path)] == [1, 2, 4]
+
+
+def test_compaction_keeps_only_live_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "JOURNAL_COMPACT_MIN", 10)
+    path = tmp_path / "journal.jsonl"
+    journal = _reopen(path)
+    for i in range(30):
+        journal.put("math", i % 3, {"n": i})
+        if i % 3 == 2:
+            journal.delete("math", 1)
+    journal.close()
+
+    # 40번 기록했지만 파일은 압축 기준을 넘지 않는다
+    assert journal.writes == 40
+    assert len(_lines(path)) <= 10
+    journal = _reopen(path)
+    assert journal.take("math") == {0: {"n": 27}, 2: {"n": 29}}
+    assert len(_lines(path)) == 2
+    journal.close()
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content if content is not None else kwargs.get("embed"))
+
+
+class FakeBot:
+    def __init__(self):
+        self.channels = {}
+        self.views = []
+        self.tree = SimpleNamespace(add_command=lambda command: None)
+
+    def get_partial_messageable(self, channel_id):
+        return self.channels.setdefault(channel_id, FakeChannel(channel_id))
+
+    def add_command(self, command):
+        pass
+
+    def add_listener(self, func, name):
+        pass
+
+    def add_view(self, view, message_id=None):
+        self.views.append((view, message_id))
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    # 코그가 쓰는 저널/타이머/라우터를 테스트용으로 바꾼다
+    journal = core.StateJournal(str(tmp_path / "journal.jsonl"))
+    router = core.MessageRouter()
+    for module in (math_game, video_challenge):
+        monkeypatch.setattr(module, "state_journal", journal)
+        monkeypatch.setattr(module, "router", router)
+    yield journal
+    journal.close()
+
+
+def test_math_problem_past_its_deadline_times_out_on_restore(journal, monkeypatch):
+    problem = {"num1": 2, "num2": 3, "symbol": "+", "operation": "덧셈", "answer": 5}
+    journal.put("math", 111, {"problem": problem, "user_id": 7, "deadline": time.time() - 5})
+    journal.put("math", 222, {"problem": problem, "user_id": 8, "deadline": time.time() + 60})
+    journal.load()  # 재시작한 것처럼 파일에서 다시 읽는다
+
+    async def get_math_score(user_id):
+        return {"score": 0}
+
+    monkeypatch.setattr(math_game, "get_math_score", get_math_score)
+    bot = FakeBot()
+
+    async def scenario():
+        monkeypatch.setattr(math_game, "timers", core.TimerWheel(tick_len=0.01))
+        await math_game.setup(bot)
+        assert set(math_game.active_math_problems) == {111, 222}
+        await asyncio.sleep(0.05)
+        # 마감이 지난 문제만 곧바로 시간 초과로 끝나고, 남은 문제는 남은 시간만큼 이어진다
+        assert set(math_game.active_math_problems) == {222}
+        assert 55 < math_game.active_math_problems[222]["timeout"].remaining() <= 60
+
+    try:
+        asyncio.run(scenario())
+        assert "시간 초과" in bot.channels[111].sent[0]
+        assert bot.channels[222].sent == []
+    finally:
+        for channel_id in (111, 222):
+            data = math_game.active_math_problems.pop(channel_id, None)
+            if data:
+                data['timeout'].cancel()
+
+    journal.close()
+    assert _reopen(journal.path).take("math") == {222: {"problem": problem, "user_id": 8,
+                                                        "deadline": pytest.approx(time.time() + 60, abs=5)}}
+
+
+def test_video_question_past_its_deadline_fails_on_restore(journal, monkeypatch):
+    state = {
+        "user_id": 7, "video_file_path": "v.mp4", "completion_role_id": None,
+        "current_question": {"question": "1 + 2 = ?", "answer": 3},
+        "question_start_time": time.time() - 70,
+        "timer": "_question_deadline", "deadline": time.time() - 10,
+        "message_id": 555, "give_up_id": "give-up-1",
+    }
+    journal.put("video", 333, state)
+    bot = FakeBot()
+
+    async def scenario():
+        monkeypatch.setattr(video_challenge, "timers", core.TimerWheel(tick_len=0.01))
+        video_challenge.restore_challenge(bot, 333, state)
+        assert 333 in video_challenge.active_challenges
+        await asyncio.sleep(0.05)
+
+    try:
+        asyncio.run(scenario())
+        assert 333 not in video_challenge.active_challenges
+        assert "시간 초과" in bot.channels[333].sent[0].description
+        # 포기 버튼은 같은 custom_id 로 다시 붙는다
+        (view, message_id), = bot.views
+        assert message_id == 555 and view.give_up.custom_id == "give-up-1"
+    finally:
+        video_challenge.active_challenges.pop(333, None)
+
+    journal.close()
+    assert _reopen(journal.path).take("video") == {}
@@ -0,0 +1,127 @@
+# 타이머 휠: 슬롯 한 바퀴를 넘는 지연, 발화 뒤 취소, 지연 0, 대기 개수 관리
+import asyncio
+import time
+
+import core
+
+
+def _run(scenario):
+    asyncio.run(scenario())
+
+
+def test_delay_longer_than_one_turn_of_the_wheel():
+    # TIMER_SLOTS 개의 슬롯을 한 바퀴 넘게 도는 지연. 그 사이 슬롯을 훑어도 짧은 타이머만 먼저 울려야 한다
+    wheel = core.TimerWheel(tick_len=0.002)
+    slots = core.TIMER_SLOTS
+    fired = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        long = wheel.call_later(slots * 0.002 + 0.1, lambda: fired.append(("long", loop.time() - start)))
+        short = wheel.call_later(0.1, lambda: fired.append(("short", loop.time() - start)))
+        assert long.tick - short.tick >= slots  # 긴 타이머의 슬롯은 울리기 전에 한 바퀴 넘게 훑인다
+        await asyncio.sleep(0.5)
+        assert [name for name, _ in fired] == ["short"]
+        await asyncio.sleep(slots * 0.002 + 0.1 - 0.5 + 0.2)
+        assert [name for name, _ in fired] == ["short", "long"]
+        assert fired[1][1] >= slots * 0.002 + 0.1 - 0.002
+
+    _run(scenario)
+    assert wheel.stats() == {"pending": 0, "fired": 2, "cancelled": 0}
+
+
+def test_loop_stalled_longer_than_one_turn():
+    # 루프가 슬롯 한 바퀴보다 오래 막혀도 밀린 타이머는 한 번씩만 울린다
+    wheel = core.TimerWheel(tick_len=0.01, slots=8)
+    fired = []
+
+    async def scenario():
+        for i in range(5):
+            wheel.call_later(0.01 * (i + 1), fired.append, i)
+        await asyncio.sleep(0)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+
+    _run(scenario)
+    assert sorted(fired) == [0, 1, 2, 3, 4]
+    assert wheel.pending == 0
+
+
+def test_cancel_after_fire_does_not_touch_counts():
+    wheel = core.TimerWheel(tick_len=0.01)
+    fired = []
+
+    async def scenario():
+        handle = wheel.call_later(0.01, fired.append, 1)
+        await asyncio.sleep(0.05)
+        assert fired == [1]
+        handle.cancel()
+        handle.cancel()
+        assert handle.cancelled
+
+    _run(scenario)
+    assert wheel.stats() == {"pending": 0, "fired": 1, "cancelled": 0}
+
+
+def test_zero_delay_fires_on_the_next_tick_not_inline():
+    wheel = core.TimerWheel(tick_len=0.01)
+    fired = []
+
+    async def scenario():
+        wheel.call_later(0, fired.append, "now")
+        assert fired == []
+        assert wheel.pending == 1
+        await asyncio.sleep(0.03)
+        assert fired == ["now"]
+
+    _run(scenario)
+    assert wheel.stats() == {"pending": 0, "fired": 1, "cancelled": 0}
+
+
+def test_pending_bookkeeping_and_coroutine_callbacks():
+    wheel = core.TimerWheel(tick_len=0.01)
+    done = []
+
+    async def callback(tag):
+        await asyncio.sleep(0)
+        done.append(tag)
+
+    async def scenario():
+        a = wheel.call_later(0.02, callback, "a")
+        wheel.call_later(0.02, callback, "b")
+        c = wheel.call_later(1.0, callback, "c")
+        assert wheel.pending == 3
+        a.cancel()
+        a.cancel()  # 두 번 취소해도 한 번만 센다
+        assert wheel.stats() == {"pending": 2, "fired": 0, "cancelled": 1}
+        assert 0.9 < c.remaining() <= 1.01
+        await asyncio.sleep(0.06)
+        assert done == ["b"]
+        assert wheel.pending == 1
+        c.cancel()
+        assert wheel.stats() == {"pending": 0, "fired": 1, "cancelled": 2}
+        # 대기 중인 타이머가 없으면 다음 등록 때 다시 깨어난다
+        wheel.call_later(0.01, callback, "d")
+        await asyncio.sleep(0.05)
+        assert done == ["b", "d"]
+
+    _run(scenario)
+    assert wheel.stats() == {"pending": 0, "fired": 2, "cancelled": 2}
+
+
+def test_callback_error_does_not_stop_the_wheel(capsys):
+    wheel = core.TimerWheel(tick_len=0.01)
+    fired = []
+
+    def broken():
+        raise ValueError("boom")
+
+    async def scenario():
+        wheel.call_later(0.01, broken)
+        wheel.call_later(0.03, fired.append, "after")
+        await asyncio.sleep(0.08)
+
+    _run(scenario)
+    assert fired == ["after"]
+    assert "boom" in capsys.readouterr().out
@@ -0,0 +1,195 @@
+# 쓰기 지연 버퍼: 변경분 합치기/되돌려 넣기, 실패한 flush, 수학 점수의 연속 정답 합치기와 upsert
+import asyncio
+import random
+import sqlite3
+
+import core
+
+
+def _make_db(tmp_path):
+    db = core.Database(str(tmp_path / "t.db"))
+    db.run_sync(lambda conn: conn.execute("CREATE TABLE scores (user_id TEXT PRIMARY KEY, score INTEGER)"))
+    state = {"fail": True}
+
+    def write_scores(conn, items):
+        conn.executemany(
+            "INSERT INTO scores VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET score = score + excluded.score",
+            [(k, d["score"]) for k, d in items.items()])
+
+    def write_broken(conn, items):
+        if state["fail"]:
+            raise RuntimeError("boom")
+
+    first = core.WriteBehind(db, core._sum_merge, write_scores)
+    second = core.WriteBehind(db, core._sum_merge, write_broken)
+    return db, first, second, state
+
+
+def test_add_merges_per_key(tmp_path):
+    db, first, second, state = _make_db(tmp_path)
+    first.add("a", {"score": 1})
+    first.add("a", {"score": 2})
+    first.add("b", {"score": 5})
+    assert first.pending == {"a": {"score": 3}, "b": {"score": 5}}
+    assert db.pending_count() == 2
+    assert first.take() == {"a": {"score": 3}, "b": {"score": 5}}
+    assert first.pending == {}
+    db.close()
+
+
+def test_requeue_puts_old_delta_before_newer(tmp_path):
+    db = core.Database(str(tmp_path / "t.db"))
+    # 순서가 드러나는 merge 로 되돌려 넣은 변경분이 그 사이 쌓인 것보다 앞에 오는지 본다
+    buf = core.WriteBehind(db, lambda old, new: {"log": old["log"] + new["log"]}, lambda conn, items: None)
+    buf.add("a", {"log": "1"})
+    taken = buf.take()
+    buf.add("a", {"log": "2"})
+    buf.add("b", {"log": "x"})
+    buf.requeue(taken)
+    assert buf.pending == {"a": {"log": "12"}, "b": {"log": "x"}}
+    db.close()
+
+
+def test_failed_buffer_keeps_earlier_buffers_deltas(tmp_path):
+    db, first, second, state = _make_db(tmp_path)
+
+    async def scenario():
+        first.add("a", {"score": 10})
+        second.add("x", {"score": 1})
+        try:
+            await db.flush()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("flush should have failed")
+        # 롤백됐으므로 DB 에는 없고, 첫 번째 버퍼의 변경분은 메모리에 남아 있어야 한다
+        assert await db.fetchone("SELECT score FROM scores WHERE user_id='a'") is None
+        assert first.get("a") == {"score": 10}
+        assert second.get("x") == {"score": 1}
+
+        first.add("a", {"score": 5})
+        state["fail"] = False
+        await db.flush()
+        assert await db.fetchone("SELECT score FROM scores WHERE user_id='a'") == (15,)
+        assert db.pending_count() == 0
+
+    asyncio.run(scenario())
+    db.close()
+
+
+def test_full_buffer_does_not_abort_callers_transaction(tmp_path):
+    db, first, second, state = _make_db(tmp_path)
+
+    def op(conn, i):
+        conn.execute("INSERT INTO scores VALUES (?, ?)", (f"op{i}", i))
+        second.push(conn, i, {"score": 1})
+
+    async def scenario():
+        for i in range(core.FLUSH_MAX_PENDING):
+            await db.run(op, i)
+        # 가득 찬 버퍼의 기록은 호출한 작업이 커밋된 뒤 따로 하므로, 실패해도 작업은 남고 변경분도 버퍼에 남는다
+        row = await db.fetchone("SELECT COUNT(*) FROM scores")
+        assert row == (core.FLUSH_MAX_PENDING,)
+        assert len(second.pending) == core.FLUSH_MAX_PENDING
+
+    asyncio.run(scenario())
+    state["fail"] = False
+    db.close()
+
+
+def test_full_buffer_is_written_after_the_call(tmp_path):
+    db, first, second, state = _make_db(tmp_path)
+
+    def op(conn, i):
+        first.push(conn, f"u{i}", {"score": i})
+
+    async def scenario():
+        for i in range(core.FLUSH_MAX_PENDING - 1):
+            await db.run(op, i)
+        assert await db.fetchone("SELECT COUNT(*) FROM scores") == (0,)
+        await db.run(op, core.FLUSH_MAX_PENDING - 1)
+        assert await db.fetchone("SELECT COUNT(*) FROM scores") == (core.FLUSH_MAX_PENDING,)
+        assert db.pending_count() == 0
+
+    asyncio.run(scenario())
+    db.close()
+
+
+# ---- 수학 점수 ----
+def _score(consecutive=0, max_consecutive=0, score=0, correct_count=0, total_count=0):
+    return {'user_id': 'u', 'score': score, 'correct_count': correct_count, 'total_count': total_count,
+            'max_consecutive': max_consecutive, 'consecutive': consecutive}
+
+
+def _merged(answers):
+    d = None
+    for correct in answers:
+        delta = core._math_delta(10 if correct else 0, correct)
+        d = delta if d is None else core._merge_math(d, delta)
+    return d
+
+
+def _one_by_one(start, answers):
+    data = dict(start)
+    for correct in answers:
+        core._apply_math(data, core._math_delta(10 if correct else 0, correct))
+    return data
+
+
+def test_math_streak_examples():
+    data = _score(consecutive=3, max_consecutive=5)
+    core._apply_math(data, _merged([True, True, False, True]))
+    assert (data['consecutive'], data['max_consecutive']) == (1, 5)
+    assert (data['score'], data['correct_count'], data['total_count']) == (30, 3, 4)
+
+    data = _score(consecutive=4, max_consecutive=4)
+    core._apply_math(data, _merged([True, True, False]))
+    assert (data['consecutive'], data['max_consecutive']) == (0, 6)
+
+    data = _score(consecutive=1, max_consecutive=2)
+    core._apply_math(data, _merged([False, True, True, True, False, True]))
+    assert (data['consecutive'], data['max_consecutive']) == (1, 3)
+
+
+def test_math_merge_matches_one_by_one():
+    rng = random.Random(2)
+    for _ in range(2000):
+        answers = [rng.random() < 0.6 for _ in range(rng.randint(1, 12))]
+        consecutive = rng.randint(0, 6)
+        start = _score(consecutive=consecutive, max_consecutive=consecutive + rng.randint(0, 4))
+        expected = _one_by_one(start, answers)
+
+        data = dict(start)
+        core._apply_math(data, _merged(answers))
+        assert data == expected, answers
+
+        # 어디서 나눠 합쳐도 같아야 한다 (flush 사이에 쌓인 변경분끼리 합쳐지는 경우)
+        cut = rng.randint(1, len(answers))
+        if cut < len(answers):
+            data = dict(start)
+            core._apply_math(data, core._merge_math(_merged(answers[:cut]), _merged(answers[cut:])))
+            assert data == expected, (answers, cut)
+
+
+def test_write_math_scores_upsert_matches_apply_math():
+    conn = sqlite3.connect(":memory:")
+    core._m001_create_tables(conn)
+    rng = random.Random(3)
+    expected = {}
+    for n in range(300):
+        uid = f"u{n}"
+        answers = [rng.random() < 0.6 for _ in range(rng.randint(1, 10))]
+        if n % 3:
+            consecutive = rng.randint(0, 6)
+            start = _score(consecutive=consecutive, max_consecutive=consecutive + rng.randint(0, 4),
+                           score=rng.randint(0, 100), correct_count=5, total_count=9)
+            start['user_id'] = uid
+            conn.execute("INSERT INTO user_scores VALUES (:user_id, :score, :correct_count, :total_count, "
+                         ":max_consecutive, :consecutive)", start)
+        else:
+            start = dict(_score(), user_id=uid)  # 처음 기록하는 유저는 INSERT 쪽으로 들어간다
+        expected[uid] = _one_by_one(start, answers)
+        core._write_math_scores(conn, {uid: _merged(answers)})
+    for uid, data in expected.items():
+        assert core._load_math_score(conn, uid) == data, uid
+    conn.close()